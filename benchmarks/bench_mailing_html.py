@@ -0,0 +1,107 @@
+"""Assemblage du HTML d'un email marketing volumineux.
+
+Compare, sur des corps HTML générés de plusieurs centaines de kilo-octets,
+l'ancienne préparation de ``body_html`` (liens normalisés à chaque appel,
+motifs recompilés, une recherche et une substitution pour les liens puis de
+nouveau pour le lien de désinscription) à ``_build_mailing_vals``, qui place
+les deux fragments d'une seule recherche. Le script vérifie que les deux
+produisent le même HTML.
+
+Usage ::
+
+    python -m benchmarks.bench_mailing_html --paragraphs 5000 --runs 50
+"""
+
+import argparse
+import logging
+import re
+import timeit
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from config.odoo_metadata import OdooMetadataCache
+from config.odoo_transport import server_proxy
+from services import odoo_email_service
+from services.odoo_email_service import DEFAULT_LINKS, UNSUBSCRIBE_HTML
+from tests.odoo_stub_server import DB, PASSWORD, UID, OdooStubServer
+
+
+def _legacy_append(html: str, addition: str) -> str:
+    body_pattern = re.compile(r"</body>", re.IGNORECASE)
+    if body_pattern.search(html):
+        return body_pattern.sub(addition + "</body>", html, count=1)
+    div_pattern = re.compile(r"</div>\s*$", re.IGNORECASE)
+    if div_pattern.search(html):
+        return div_pattern.sub(addition + "</div>", html)
+    return html + addition
+
+
+def _legacy_body_html(body: str, links: list) -> str:
+    seen = set()
+    normalized = []
+    for name, url in links + DEFAULT_LINKS:
+        url = url.strip()
+        url = url if re.match(r"^https?://", url) else f"https://{url}"
+        if url not in seen:
+            normalized.append((name.strip(), url))
+            seen.add(url)
+    items = "".join(
+        f'<p>{name} : <a href="{url}" style="color:#1a0dab;">{url}</a></p>'
+        for name, url in normalized
+    )
+    html = _legacy_append(body, f"<div><p>Liens utiles :</p>{items}</div>")
+    return _legacy_append(html, UNSUBSCRIBE_HTML)
+
+
+def _bodies(paragraphs: int) -> dict[str, str]:
+    content = "".join(
+        f"<div class=\"bloc\"><p>Nouveauté n°{i} : pain au levain, légumes de "
+        f"saison et produits locaux à l'épicerie.</p></div>"
+        for i in range(paragraphs)
+    )
+    return {
+        "</body>": f"<html><body>{content}</body></html>",
+        "</div> final": f"<div>{content}</div>\n",
+        "sans fermeture": f"<section>{content}</section>",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    odoo_email_service.ODOO_EMAIL_FROM = "bench@example.com"
+    odoo_email_service.get_metadata_cache = lambda **kwargs: OdooMetadataCache(
+        None, "bench"
+    )
+    # Seul le constructeur interroge Odoo (modèle ``mailing.list``).
+    with OdooStubServer() as server:
+        models = server_proxy(server.url, "object")
+        service = odoo_email_service.OdooEmailService(
+            logging.getLogger("bench"), connection=(DB, UID, PASSWORD, models)
+        )
+    links = [("Boutique", "exemple.fr/boutique"), ("Agenda", "https://exemple.fr/agenda")]
+    send_at = datetime(2024, 5, 29, 8, 0, tzinfo=ZoneInfo("Europe/Paris"))
+
+    def build(body: str) -> str:
+        return service._build_mailing_vals(
+            "Newsletter", body, links, send_at, [2], already_html=True
+        )["body_html"]
+
+    print(f"{'corps':<16}{'taille':>10}{'ancien':>12}{'nouveau':>12}")
+    for label, body in _bodies(args.paragraphs).items():
+        if build(body) != _legacy_body_html(body, links):
+            raise SystemExit(f"HTML différent pour le corps « {label} »")
+        legacy = timeit.timeit(lambda: _legacy_body_html(body, links), number=args.runs)
+        current = timeit.timeit(lambda: build(body), number=args.runs)
+        print(
+            f"{label:<16}{len(body.encode('utf-8')):>10}"
+            f"{legacy / args.runs * 1000:>10.3f}ms{current / args.runs * 1000:>10.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
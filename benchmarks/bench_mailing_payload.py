@@ -0,0 +1,95 @@
+"""Taille sur le réseau de la programmation d'un email marketing.
+
+Compare, pour un email HTML de plusieurs kilo-octets, les octets envoyés et
+reçus par ``create`` + ``action_schedule`` selon que le corps est envoyé en
+trois exemplaires (``body_arch``, ``body_html`` et ``body_plaintext``, comme
+auparavant) ou en deux, et selon que la compression gzip des requêtes est
+active ou non. Les mesures sont faites contre le serveur de substitution
+local.
+
+Usage ::
+
+    python -m benchmarks.bench_mailing_payload --paragraphs 300 --protocol jsonrpc
+"""
+
+import argparse
+import logging
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from config.odoo_metadata import OdooMetadataCache
+from config.odoo_transport import exchange_size, reset_exchange
+from tests.odoo_stub_server import DB, PASSWORD, UID, OdooStubServer
+
+
+class _LegacyVals:
+    """Reproduit l'ancien payload qui dupliquait le HTML dans ``body_plaintext``."""
+
+    def __init__(self, build):
+        self._build = build
+
+    def __call__(self, subject, body, *args, **kwargs):
+        vals = self._build(subject, body, *args, **kwargs)
+        vals.setdefault("body_plaintext", body)
+        return vals
+
+
+def _measure(service, body: str, send_at: datetime, runs: int) -> tuple[int, int]:
+    sent = received = 0
+    for i in range(runs):
+        reset_exchange()
+        service.schedule_email(f"Newsletter {i}", body, [], send_at, [2], already_html=True)
+        request_bytes, response_bytes = exchange_size()
+        sent += request_bytes
+        received += response_bytes
+    return sent // runs, received // runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--gzip-threshold", type=int, default=1024)
+    parser.add_argument("--protocol", choices=("xmlrpc", "jsonrpc"), default="xmlrpc")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from config.odoo_transport import server_proxy
+    from services import odoo_email_service
+
+    odoo_email_service.ODOO_EMAIL_FROM = "bench@example.com"
+    odoo_email_service.get_metadata_cache = lambda **kwargs: OdooMetadataCache(
+        None, "bench"
+    )
+    body = (
+        "<html><body>"
+        + "".join(
+            f"<p>Nouveauté n°{i} : pain au levain, légumes de saison et "
+            f"produits locaux à l'épicerie.</p>"
+            for i in range(args.paragraphs)
+        )
+        + "</body></html>"
+    )
+    send_at = datetime.now(ZoneInfo("UTC")) + timedelta(days=1)
+
+    print(f"corps HTML : {len(body.encode('utf-8'))} octets")
+    print(f"{'variante':<28}{'envoyé':>12}{'reçu':>10}")
+    with OdooStubServer(gzip_threshold=args.gzip_threshold) as server:
+        for label, legacy, threshold in (
+            ("3 copies, sans gzip", True, None),
+            ("2 copies, sans gzip", False, None),
+            ("3 copies, gzip", True, args.gzip_threshold),
+            ("2 copies, gzip", False, args.gzip_threshold),
+        ):
+            models = server_proxy(server.url, "object", args.protocol, None, threshold)
+            service = odoo_email_service.OdooEmailService(
+                logging.getLogger("bench"), connection=(DB, UID, PASSWORD, models)
+            )
+            if legacy:
+                service._build_mailing_vals = _LegacyVals(service._build_mailing_vals)
+            sent, received = _measure(service, body, send_at, args.runs)
+            print(f"{label:<28}{sent:>12}{received:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Mesure de charge des workflows Odoo contre le serveur de substitution local.
+
+Le serveur ``tests.odoo_stub_server.OdooStubServer`` est démarré avec une
+latence et un volume de données configurables, puis on mesure le débit et la
+latence de ``update_pos_categories()`` et de ``schedule_email()`` ainsi que
+le nombre d'appels RPC émis par opération.
+
+Usage ::
+
+    python -m benchmarks.bench_odoo_load --latency-ms 20 --categories 500 \\
+        --runs 50 --concurrency 4 --protocol xmlrpc
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from tests.odoo_stub_server import DB, LOGIN, PASSWORD, OdooStubServer
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _run(label: str, operation, runs: int, concurrency: int, server) -> None:
+    calls_before = sum(server.calls.values())
+    latencies: list[float] = []
+
+    def timed(index: int) -> None:
+        start = time.perf_counter()
+        operation(index)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(runs)))
+    elapsed = time.perf_counter() - start
+    rpc_calls = sum(server.calls.values()) - calls_before
+
+    print(
+        f"{label:<24}{runs:>6}{runs / elapsed:>10.1f}"
+        f"{statistics.median(latencies) * 1000:>10.1f}"
+        f"{_percentile(latencies, 95) * 1000:>10.1f}"
+        f"{rpc_calls / runs:>10.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--pos-configs", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--protocol", choices=("xmlrpc", "jsonrpc"), default="xmlrpc")
+    args = parser.parse_args()
+
+    server = OdooStubServer(
+        latency=args.latency_ms / 1000,
+        categories=args.categories,
+        pos_configs=args.pos_configs,
+    ).start()
+    cache_dir = tempfile.TemporaryDirectory()
+    # La configuration est lue à l'import : on la fixe avant de charger les
+    # modules applicatifs.
+    os.environ.update(
+        {
+            "ODOO_URL": server.url,
+            "ODOO_DB": DB,
+            "ODOO_USER": LOGIN,
+            "ODOO_PASSWORD": PASSWORD,
+            "ODOO_PROTOCOL": args.protocol,
+            "ODOO_CACHE_DIR": cache_dir.name,
+            "ODOO_EMAIL_FROM": "bench@example.com",
+        }
+    )
+    logging.disable(logging.WARNING)
+
+    from pos_category_management.manage_pos_categories import update_pos_categories
+    from services.odoo_email_service import OdooEmailService
+
+    try:
+        email_service = OdooEmailService(logging.getLogger("bench"))
+        friday = datetime(2024, 9, 6, 7, 0)
+        send_at = datetime.now(ZoneInfo("UTC")) + timedelta(days=1)
+        body = "<html><body>" + "<p>Nouveautés de la semaine.</p>" * 200 + "</body></html>"
+
+        print(
+            f"{'opération':<24}{'runs':>6}{'ops/s':>10}{'p50 ms':>10}"
+            f"{'p95 ms':>10}{'RPC/op':>10}"
+        )
+        _run(
+            "update_pos_categories",
+            lambda i: update_pos_categories(friday + timedelta(days=2 * (i % 2))),
+            args.runs,
+            args.concurrency,
+            server,
+        )
+        _run(
+            "schedule_email",
+            lambda i: email_service.schedule_email(
+                f"Newsletter {i}", body, [], send_at, [2], already_html=True
+            ),
+            args.runs,
+            args.concurrency,
+            server,
+        )
+    finally:
+        server.stop()
+        cache_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare XML-RPC et JSON-RPC sur la taille et le décodage des réponses Odoo.
+
+Deux charges représentatives sont simulées hors-ligne :
+
+- un ``search_read`` volumineux (lignes ``pos.category`` / contacts) ;
+- un ``read`` de ``mailing.mailing`` contenant un ``body_html`` de plusieurs Ko.
+
+Usage ::
+
+    python -m benchmarks.bench_odoo_protocols --rows 5000 --repeat 20
+"""
+
+import argparse
+import json
+import timeit
+import xmlrpc.client
+
+
+def _search_read_rows(count: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "name": f"Catégorie {i}",
+            "available_in_pos": bool(i % 2),
+            "parent_id": [i // 10, f"Parent {i // 10}"] if i % 3 else False,
+            "sequence": i * 10,
+            "write_date": "2024-09-06 07:00:00",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _mailing_rows(count: int, body_kb: int) -> list[dict]:
+    paragraph = (
+        "<p style=\"margin:0 0 12px 0;\">Retrouvez nos produits locaux et nos "
+        "animations du week-end au comptoir de l'épicerie.</p>"
+    )
+    body = paragraph * max(1, (body_kb * 1024) // len(paragraph))
+    return [
+        {"id": i, "subject": f"Newsletter {i}", "body_html": body}
+        for i in range(1, count + 1)
+    ]
+
+
+def _measure(result, repeat: int) -> dict:
+    xml_payload = xmlrpc.client.dumps((result,), methodresponse=True, allow_none=True)
+    json_payload = json.dumps({"jsonrpc": "2.0", "id": 1, "result": result})
+    xml_time = min(
+        timeit.repeat(lambda: xmlrpc.client.loads(xml_payload), number=1, repeat=repeat)
+    )
+    json_time = min(
+        timeit.repeat(lambda: json.loads(json_payload), number=1, repeat=repeat)
+    )
+    return {
+        "xml_bytes": len(xml_payload.encode("utf-8")),
+        "json_bytes": len(json_payload.encode("utf-8")),
+        "xml_ms": xml_time * 1000,
+        "json_ms": json_time * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--mailings", type=int, default=20)
+    parser.add_argument("--body-kb", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = {
+        f"search_read x{args.rows}": _search_read_rows(args.rows),
+        f"mailing x{args.mailings} ({args.body_kb} Ko)": _mailing_rows(
+            args.mailings, args.body_kb
+        ),
+    }
+    print(f"{'charge':<28}{'XML (o)':>12}{'JSON (o)':>12}{'XML (ms)':>10}{'JSON (ms)':>11}")
+    for label, result in cases.items():
+        m = _measure(result, args.repeat)
+        print(
+            f"{label:<28}{m['xml_bytes']:>12}{m['json_bytes']:>12}"
+            f"{m['xml_ms']:>10.2f}{m['json_ms']:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compare le décodeur XML-RPC rapide à ``xmlrpc.client`` sur un gros ``search_read``.
+
+La réponse est découpée en blocs de ``--chunk`` octets, comme à la lecture
+du socket, puis décodée par l'``Unmarshaller`` standard et par
+``config.odoo_xmlrpc_decoder`` ; le script vérifie que les deux produisent
+les mêmes valeurs.
+
+Usage ::
+
+    python -m benchmarks.bench_xmlrpc_decoder --rows 5000 --repeat 20
+"""
+
+import argparse
+import timeit
+import xmlrpc.client
+
+from benchmarks.bench_odoo_protocols import _search_read_rows
+from config import odoo_xmlrpc_decoder
+
+
+def _decode(getparser, chunks: list[bytes]):
+    parser, unmarshaller = getparser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+    return unmarshaller.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--chunk", type=int, default=65536)
+    args = parser.parse_args()
+
+    payload = xmlrpc.client.dumps(
+        (_search_read_rows(args.rows),), methodresponse=True, allow_none=True
+    ).encode("utf-8")
+    chunks = [
+        payload[start : start + args.chunk]
+        for start in range(0, len(payload), args.chunk)
+    ]
+    decoders = (
+        ("xmlrpc.client", xmlrpc.client.getparser),
+        ("odoo_xmlrpc_decoder", odoo_xmlrpc_decoder.getparser),
+    )
+    if _decode(decoders[0][1], chunks) != _decode(decoders[1][1], chunks):
+        raise SystemExit("Les deux décodeurs ne produisent pas les mêmes valeurs.")
+
+    print(f"réponse : {len(payload)} octets, {args.rows} lignes")
+    print(f"{'décodeur':<24}{'ms':>10}{'lignes/s':>14}")
+    baseline = None
+    for label, getparser in decoders:
+        seconds = min(
+            timeit.repeat(
+                lambda: _decode(getparser, chunks), number=1, repeat=args.repeat
+            )
+        )
+        baseline = baseline or seconds
+        print(
+            f"{label:<24}{seconds * 1000:>10.1f}{args.rows / seconds:>14.0f}"
+            f"   x{baseline / seconds:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
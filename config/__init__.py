@@ -24,6 +24,36 @@ ODOO_URL = os.getenv("ODOO_URL", "")
 ODOO_DB = os.getenv("ODOO_DB", "")
 ODOO_USER = os.getenv("ODOO_USER", "")
 ODOO_PASSWORD = os.getenv("ODOO_PASSWORD", "")
+# Transport used to reach Odoo: ``xmlrpc`` (default) or ``jsonrpc``.
+ODOO_PROTOCOL = os.getenv("ODOO_PROTOCOL", "xmlrpc").strip().lower()
+# Per-request timeout in seconds for Odoo calls; ``0`` waits indefinitely.
+ODOO_TIMEOUT = float(os.getenv("ODOO_TIMEOUT", "30")) or None
+# Odoo requests larger than this many bytes are sent gzip-compressed. Leave
+# empty when the server (or its reverse proxy) cannot decode gzip bodies;
+# compressed responses are always accepted.
+ODOO_GZIP_THRESHOLD = int(os.getenv("ODOO_GZIP_THRESHOLD", "0")) or None
+# Set ``ODOO_FAST_DECODER=1`` to decode XML-RPC responses with the streaming
+# expat decoder of ``config.odoo_xmlrpc_decoder`` instead of ``xmlrpc.client``.
+ODOO_FAST_DECODER = os.getenv("ODOO_FAST_DECODER", "").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Directory holding the on-disk caches (authentication, metadata...).
+ODOO_CACHE_DIR = os.getenv(
+    "ODOO_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "odoo_automation"),
+)
+# Lifetime in seconds of a cached authentication (uid, server version) so that
+# cron-style runs can skip the login round trip. ``0`` disables the cache.
+ODOO_AUTH_CACHE_TTL = int(os.getenv("ODOO_AUTH_CACHE_TTL", "3600"))
+# Maximum number of Odoo records kept by the write_date-revalidated record
+# cache (least recently used records are evicted first).
+ODOO_RECORD_CACHE_SIZE = int(os.getenv("ODOO_RECORD_CACHE_SIZE", "5000"))
+# Set ``ODOO_METRICS=1`` to record per-(model, method) call statistics, logged
+# at exit and optionally written as JSON to ``ODOO_METRICS_FILE``.
+ODOO_METRICS = os.getenv("ODOO_METRICS", "").strip().lower() in ("1", "true", "yes")
+ODOO_METRICS_FILE = os.getenv("ODOO_METRICS_FILE", "")
 # Comma-separated list IDs of mailing lists targeted by default.
 # Falls back to mailing list ID ``2`` when unspecified.
 _list_ids = os.getenv("ODOO_MAILING_LIST_IDS", "2")
@@ -31,6 +61,36 @@ ODOO_MAILING_LIST_IDS = [
     int(_id.strip()) for _id in _list_ids.split(",") if _id.strip()
 ]
 
+# Comma-separated names of the Odoo databases (one per shop) targeted by the
+# multi-target mode. Each name ``SHOP`` is configured through
+# ``ODOO_SHOP_URL``, ``ODOO_SHOP_DB``, ``ODOO_SHOP_USER``, ``ODOO_SHOP_PASSWORD``
+# and optionally ``ODOO_SHOP_MAILING_LIST_IDS``; missing values fall back to
+# the single-database settings above.
+ODOO_TARGETS = [
+    name.strip() for name in os.getenv("ODOO_TARGETS", "").split(",") if name.strip()
+]
+# Maximum number of Odoo databases updated concurrently in multi-target mode.
+ODOO_TARGETS_CONCURRENCY = int(os.getenv("ODOO_TARGETS_CONCURRENCY", "4"))
+
+# Optional listener on Odoo's ``/longpolling`` bus: set ``ODOO_BUS=1`` to let
+# the running bot react to the notifications sent on ``ODOO_BUS_CHANNELS``
+# (comma-separated) within seconds instead of waiting for the next run.
+ODOO_BUS = os.getenv("ODOO_BUS", "").strip().lower() in ("1", "true", "yes")
+ODOO_BUS_CHANNELS = [
+    name.strip()
+    for name in os.getenv("ODOO_BUS_CHANNELS", "odoo_automation").split(",")
+    if name.strip()
+]
+# Seconds a long-poll request may stay open; Odoo answers after 50 s at most.
+ODOO_BUS_TIMEOUT = float(os.getenv("ODOO_BUS_TIMEOUT", "55"))
+
+# Timezone in which the POS category rules (Friday/Sunday from 6 AM) are
+# evaluated.
+POS_TIMEZONE = os.getenv("POS_TIMEZONE", "Europe/Paris")
+# Number of products read and written per call when the POS availability of
+# the products of a category follows the category.
+POS_PRODUCT_CHUNK_SIZE = int(os.getenv("POS_PRODUCT_CHUNK_SIZE", "1000"))
+
 # Default sender address for emails created via ``OdooEmailService``.
 # An empty value will trigger a runtime error when the service is initialised.
 ODOO_EMAIL_FROM = os.getenv("ODOO_EMAIL_FROM", "")
@@ -1,21 +1,92 @@
 # config/auth.py
 
 from config.log_config import setup_logger
-import xmlrpc.client
+from config.cache_store import get_store
+from config.odoo_transport import server_proxy
+import time
 
 
 logger = setup_logger(__name__)
 
 
-def authenticate_odoo(url, db, username, password):
-    """Authenticate against a real Odoo instance using XML-RPC."""
+def authenticate_odoo(url, db, username, password, protocol="xmlrpc", timeout=None):
+    """Authenticate against a real Odoo instance.
+
+    ``protocol`` selects the transport (``xmlrpc`` or ``jsonrpc``) and
+    ``timeout`` bounds the request in seconds.
+    """
     logger.info("Tentative d'authentification Odoo...")
-    common = xmlrpc.client.ServerProxy(
-        f"{url}/xmlrpc/2/common", allow_none=True
-    )
+    common = server_proxy(url, "common", protocol, timeout)
     uid = common.authenticate(db, username, password, {})
     if not uid:
         logger.error("Échec de l'authentification Odoo : identifiants invalides.")
         raise Exception("Échec de l'authentification Odoo.")
     logger.info(f"Authentification Odoo réussie (uid={uid}).")
     return uid
+
+
+class AuthCache:
+    """On-disk cache of Odoo authentications.
+
+    Entries are keyed by URL, database and login and hold the ``uid``, the
+    authentication timestamp and, once known, the server version. An entry
+    older than ``ttl`` seconds is ignored; ``ttl <= 0`` disables the cache.
+    """
+
+    def __init__(self, path: str, ttl: int) -> None:
+        self.store = get_store(path)
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(url: str, db: str, username: str) -> str:
+        return f"{url}|{db}|{username}"
+
+    def get(self, url: str, db: str, username: str) -> dict | None:
+        """Return the cached entry if it is still valid."""
+        if self.ttl <= 0:
+            return None
+        entry = self.store.get(self._key(url, db, username))
+        if not entry or time.time() - entry.get("authenticated_at", 0) >= self.ttl:
+            return None
+        return entry
+
+    def set(self, url: str, db: str, username: str, uid: int) -> None:
+        if self.ttl <= 0:
+            return
+        self.store.set(
+            self._key(url, db, username),
+            {"uid": uid, "authenticated_at": time.time()},
+        )
+
+    def set_server_version(
+        self, url: str, db: str, username: str, server_version: dict
+    ) -> None:
+        """Attach ``server_version`` to a still valid entry."""
+        entry = self.get(url, db, username)
+        if entry is not None:
+            entry["server_version"] = server_version
+            self.store.set(self._key(url, db, username), entry)
+
+    def invalidate(self, url: str, db: str, username: str) -> None:
+        self.store.pop(self._key(url, db, username))
+
+
+def authenticate_odoo_cached(
+    url,
+    db,
+    username,
+    password,
+    protocol="xmlrpc",
+    cache: AuthCache | None = None,
+    timeout=None,
+):
+    """Return a cached ``uid`` when available, authenticate otherwise."""
+    if cache is not None:
+        entry = cache.get(url, db, username)
+        if entry is not None:
+            logger.info(f"Authentification Odoo reprise du cache (uid={entry['uid']}).")
+            return entry["uid"]
+    uid = authenticate_odoo(url, db, username, password, protocol, timeout)
+    if cache is not None:
+        cache.set(url, db, username, uid)
+    return uid
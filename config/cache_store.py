@@ -0,0 +1,85 @@
+# config/cache_store.py
+
+"""Persistance des caches locaux dans de petits fichiers JSON.
+
+Plusieurs caches partagent un même fichier (un espace de noms par base
+Odoo dans ``metadata.json``, par exemple) : ``get_store(path)`` retourne pour
+un chemin donné toujours le même ``JsonFileStore``, dont le verrou sérialise
+alors les lectures-modifications-écritures de tous ces caches.
+"""
+
+import json
+import os
+import threading
+
+from config.log_config import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+class JsonFileStore:
+    """Dictionnaire persisté dans un fichier JSON.
+
+    L'écriture passe par un fichier temporaire renommé atomiquement, si bien
+    qu'un processus concurrent lit toujours un fichier complet. Un fichier
+    absent ou illisible est traité comme un cache vide.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        """Retourne le contenu du fichier, ou un dictionnaire vide."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            logger.warning("Cache illisible %s ignoré : %s", self.path, err)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def save(self, data: dict) -> None:
+        """Remplace le contenu du fichier par ``data``."""
+        directory = os.path.dirname(self.path)
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as err:
+            logger.warning("Impossible d'écrire le cache %s : %s", self.path, err)
+
+    def get(self, key: str, default=None):
+        return self.load().get(key, default)
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            data = self.load()
+            data[key] = value
+            self.save(data)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            data = self.load()
+            if data.pop(key, None) is not None:
+                self.save(data)
+
+
+_stores: dict[str, JsonFileStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: str) -> JsonFileStore:
+    """Retourne le ``JsonFileStore`` partagé par le processus pour ``path``."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = JsonFileStore(path)
+        return store
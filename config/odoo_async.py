@@ -0,0 +1,169 @@
+# config/odoo_async.py
+
+"""Client Odoo asynchrone utilisable depuis une boucle ``asyncio``.
+
+``AsyncOdooClient`` reprend la sémantique du proxy synchrone
+(``execute_kw(db, uid, password, model, method, args, kwargs)``, erreurs
+serveur levées en ``xmlrpc.client.Fault``, nouvelle authentification sur
+``Access Denied``) mais s'appuie sur ``httpx.AsyncClient`` : les appels Odoo
+peuvent ainsi être attendus à côté des appels Telegram ou OpenAI sans bloquer
+la boucle ni créer de thread. Le nombre de requêtes simultanées est borné par
+``max_concurrency`` et chaque requête par ``timeout`` (``ODOO_TIMEOUT`` par
+défaut), comme pour les transports synchrones : un serveur figé lève
+``config.odoo_transport.OdooTimeout`` au lieu de bloquer la coroutine.
+"""
+
+import asyncio
+import itertools
+import json
+import xmlrpc.client
+
+import httpx
+
+from config.log_config import setup_logger
+from config.auth import AuthCache
+from config.odoo_transport import PROTOCOLS, OdooTimeout, _fault_from_error
+from config.odoo_connect import _auth_cache, _is_access_denied
+from config import (
+    ODOO_URL,
+    ODOO_DB,
+    ODOO_USER,
+    ODOO_PASSWORD,
+    ODOO_PROTOCOL,
+    ODOO_TIMEOUT,
+)
+
+
+logger = setup_logger(__name__)
+
+
+class AsyncOdooClient:
+    """Client Odoo asynchrone à concurrence bornée."""
+
+    def __init__(
+        self,
+        url: str | None = None,
+        db: str | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        protocol: str | None = None,
+        max_concurrency: int = 4,
+        auth_cache: AuthCache | None = _auth_cache,
+        client: httpx.AsyncClient | None = None,
+        timeout: float | None = ODOO_TIMEOUT,
+    ) -> None:
+        self.url = url or ODOO_URL or "https://example.com"
+        self.db = db or ODOO_DB or "db"
+        self.username = username or ODOO_USER or "user"
+        self.password = password or ODOO_PASSWORD or "password"
+        self.protocol = protocol or ODOO_PROTOCOL or "xmlrpc"
+        if self.protocol not in PROTOCOLS:
+            raise ValueError(f"Protocole Odoo inconnu : {self.protocol}")
+        self.auth_cache = auth_cache
+        self.timeout = timeout
+        self._client = client or httpx.AsyncClient(timeout=timeout)
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._auth_lock = asyncio.Lock()
+        self._ids = itertools.count(1)
+        self._uid = None
+
+    async def _xmlrpc(self, service: str, method: str, args: tuple):
+        body = xmlrpc.client.dumps(args, method, allow_none=True)
+        response = await self._client.post(
+            f"{self.url}/xmlrpc/2/{service}",
+            content=body.encode("utf-8"),
+            headers={"Content-Type": "text/xml"},
+        )
+        response.raise_for_status()
+        # ``loads`` lève directement ``xmlrpc.client.Fault`` si besoin.
+        params, _ = xmlrpc.client.loads(response.content)
+        return params[0]
+
+    async def _jsonrpc(self, service: str, method: str, args: tuple):
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {"service": service, "method": method, "args": list(args)},
+            "id": next(self._ids),
+        }
+        response = await self._client.post(
+            f"{self.url}/jsonrpc",
+            content=json.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+        reply = response.json()
+        if reply.get("error"):
+            raise _fault_from_error(reply["error"])
+        return reply.get("result")
+
+    async def call(self, service: str, method: str, *args):
+        """Appelle ``service.method(*args)`` en respectant la concurrence."""
+        async with self._semaphore:
+            try:
+                if self.protocol == "jsonrpc":
+                    return await self._jsonrpc(service, method, args)
+                return await self._xmlrpc(service, method, args)
+            except httpx.TimeoutException as err:
+                raise OdooTimeout(
+                    f"Odoo n'a pas répondu en {self.timeout} s ({self.url})."
+                ) from err
+
+    async def authenticate(self, stale_uid: int | None = None) -> int:
+        """Authentifie le client si nécessaire et retourne l'UID."""
+        async with self._auth_lock:
+            if self._uid is not None and self._uid != stale_uid:
+                return self._uid
+            if stale_uid is None and self.auth_cache is not None:
+                entry = self.auth_cache.get(self.url, self.db, self.username)
+                if entry is not None:
+                    self._uid = entry["uid"]
+                    return self._uid
+            elif self.auth_cache is not None:
+                self.auth_cache.invalidate(self.url, self.db, self.username)
+
+            logger.info("Tentative d'authentification Odoo (asynchrone)...")
+            uid = await self.call(
+                "common", "authenticate", self.db, self.username, self.password, {}
+            )
+            if not uid:
+                logger.error("Échec de l'authentification Odoo : identifiants invalides.")
+                raise Exception("Échec de l'authentification Odoo.")
+            logger.info(f"Authentification Odoo réussie (uid={uid}).")
+            self._uid = uid
+            if self.auth_cache is not None:
+                self.auth_cache.set(self.url, self.db, self.username, uid)
+            return uid
+
+    async def execute_kw(self, db, uid, password, model, method, *args):
+        """Exécute ``model.method`` en renouvelant la session si elle a expiré."""
+        try:
+            return await self.call(
+                "object", "execute_kw", db, uid, password, model, method, *args
+            )
+        except xmlrpc.client.Fault as fault:
+            if not _is_access_denied(fault):
+                raise
+            logger.warning(
+                "Accès refusé par Odoo pour %s.%s, nouvelle authentification.",
+                model,
+                method,
+            )
+            uid = await self.authenticate(stale_uid=uid)
+            return await self.call(
+                "object", "execute_kw", db, uid, password, model, method, *args
+            )
+
+    async def connect(self):
+        """Retourne ``db, uid, password, client`` comme ``get_odoo_connection``."""
+        uid = await self.authenticate()
+        return self.db, uid, self.password, self
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncOdooClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
@@ -0,0 +1,208 @@
+# config/odoo_batch.py
+
+"""Regroupement des appels ``execute_kw`` pour limiter les allers-retours.
+
+``OdooBatch`` accumule des écritures et des appels indépendants puis les
+envoie lors de ``flush()`` :
+
+- un ``write`` est fusionné avec un ``write`` précédent du même modèle
+  portant des valeurs identiques, tant qu'aucune écriture mise en attente
+  entre les deux ne touche les mêmes IDs : le dernier ``write`` demandé
+  reste celui qui s'applique ;
+- les écritures qui touchent des IDs communs partent l'une après l'autre,
+  dans l'ordre où elles ont été demandées ; les autres opérations sont
+  envoyées en parallèle (pipeline) lorsque le proxy le permet, comme
+  ``OdooConnectionManager`` et ses proxies par thread. Elles passent par le
+  pool partagé ``config.odoo_connect.get_executor()``, dont les threads
+  conservent leur connexion d'un lot à l'autre.
+
+Chaque opération retourne un ``concurrent.futures.Future`` dont le résultat
+(ou l'exception) est disponible après ``flush()``.
+"""
+
+from concurrent.futures import Future
+
+from config.log_config import setup_logger
+from config.odoo_connect import get_executor, in_executor
+from config.odoo_transport import bind_deadline
+
+
+logger = setup_logger(__name__)
+
+
+def _freeze(value):
+    """Retourne une version hachable de ``value`` (dict, liste, tuple...)."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(val)) for key, val in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class OdooBatch:
+    """Lot d'opérations Odoo envoyé en un minimum d'allers-retours.
+
+    ``max_workers`` borne le nombre d'appels envoyés simultanément ; il doit
+    valoir ``1`` si ``models`` est un ``ServerProxy`` brut, qui n'est pas
+    utilisable depuis plusieurs threads.
+    """
+
+    def __init__(
+        self,
+        db,
+        uid,
+        password,
+        models,
+        max_workers: int = 4,
+        label: str = "Lot Odoo",
+    ) -> None:
+        self.db = db
+        self.uid = uid
+        self.password = password
+        self.models = models
+        self.max_workers = max(1, max_workers)
+        self.label = label
+        self.requested = 0
+        self.round_trips = 0
+        # Écritures dans l'ordre de leur demande : (modèle, ids, vals, clé, futures).
+        self._writes: list[tuple[str, list, dict, tuple, list[Future]]] = []
+        self._calls: list[tuple[str, str, list, dict | None, Future]] = []
+
+    @property
+    def saved(self) -> int:
+        """Nombre d'allers-retours économisés depuis la création du lot."""
+        return self.requested - self.round_trips
+
+    def write(self, model: str, ids: list[int], vals: dict) -> Future:
+        """Planifie ``model.write(ids, vals)`` et le fusionne si possible."""
+        future: Future = Future()
+        self.requested += 1
+        key = (model, _freeze(vals))
+        touched = set(ids)
+        for write in reversed(self._writes):
+            if write[3] == key:
+                group_ids, futures = write[1], write[4]
+                group_ids.extend(i for i in ids if i not in group_ids)
+                futures.append(future)
+                return future
+            if write[0] == model and touched.intersection(write[1]):
+                # Une écriture intermédiaire touche ces IDs : fusionner
+                # inverserait leur ordre.
+                break
+        self._writes.append((model, list(ids), vals, key, [future]))
+        return future
+
+    def call(
+        self,
+        model: str,
+        method: str,
+        args: list | None = None,
+        kwargs: dict | None = None,
+    ) -> Future:
+        """Planifie un appel indépendant, envoyé en parallèle des autres."""
+        future: Future = Future()
+        self.requested += 1
+        self._calls.append((model, method, args or [], kwargs, future))
+        return future
+
+    def _execute(self, model, method, args, kwargs):
+        call_args = [self.db, self.uid, self.password, model, method, args]
+        if kwargs is not None:
+            call_args.append(kwargs)
+        return self.models.execute_kw(*call_args)
+
+    def _run_all(self, jobs) -> None:
+        for job in jobs:
+            self._run(job)
+
+    def _lanes(self, jobs: list) -> list[list]:
+        """Répartit ``jobs`` en files exécutées chacune dans l'ordre.
+
+        Les écritures qui partagent des IDs d'un même modèle se retrouvent
+        dans la même file, dans l'ordre de leur demande ; les files sont
+        ensuite regroupées pour ne pas dépasser ``max_workers``.
+        """
+        parent = list(range(len(jobs)))
+
+        def root(position: int) -> int:
+            while parent[position] != position:
+                parent[position] = parent[parent[position]]
+                position = parent[position]
+            return position
+
+        last_writer: dict[tuple, int] = {}
+        for position, (model, method, args, _, _) in enumerate(jobs):
+            if method != "write":
+                continue
+            for record_id in args[0]:
+                key = (model, record_id)
+                if key in last_writer:
+                    parent[root(position)] = root(last_writer[key])
+                last_writer[key] = position
+
+        grouped: dict[int, list] = {}
+        for position, job in enumerate(jobs):
+            grouped.setdefault(root(position), []).append(job)
+        chains = list(grouped.values())
+        lanes: list[list] = [[] for _ in range(min(self.max_workers, len(chains)))]
+        for position, chain in enumerate(chains):
+            lanes[position % len(lanes)].extend(chain)
+        return lanes
+
+    def _run(self, job) -> None:
+        model, method, args, kwargs, futures = job
+        try:
+            result = self._execute(model, method, args, kwargs)
+        except Exception as err:
+            for future in futures:
+                future.set_exception(err)
+        else:
+            for future in futures:
+                future.set_result(result)
+
+    def flush(self) -> None:
+        """Envoie toutes les opérations en attente."""
+        jobs = [
+            (model, "write", [ids, vals], None, futures)
+            for model, ids, vals, _, futures in self._writes
+        ]
+        jobs.extend(
+            (model, method, args, kwargs, [future])
+            for model, method, args, kwargs, future in self._calls
+        )
+        self._writes = []
+        self._calls = []
+        if not jobs:
+            return
+
+        self.round_trips += len(jobs)
+        lanes = self._lanes(jobs)
+        if len(lanes) == 1 or in_executor():
+            for lane in lanes:
+                self._run_all(lane)
+        else:
+            # La première file part depuis le thread appelant, les autres sur
+            # le pool partagé dont les threads gardent leur connexion, sous
+            # l'échéance ``odoo_deadline`` de l'appelant.
+            executor = get_executor()
+            run_all = bind_deadline(self._run_all)
+            others = [executor.submit(run_all, lane) for lane in lanes[1:]]
+            self._run_all(lanes[0])
+            for other in others:
+                other.result()
+
+        logger.info(
+            "%s : %d appel(s) Odoo envoyé(s) en %d aller(s)-retour(s), "
+            "%d économisé(s).",
+            self.label,
+            self.requested,
+            self.round_trips,
+            self.saved,
+        )
+
+    def __enter__(self) -> "OdooBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,180 @@
+# config/odoo_bus.py
+
+"""Écoute du bus de notifications Odoo (``/longpolling/poll``).
+
+Plutôt que de relire périodiquement les catégories POS ou l'état des
+mailings, ``OdooBusListener`` garde une requête ``/longpolling/poll`` ouverte
+sur les canaux voulus : Odoo y répond dès qu'une notification est publiée
+(ou au bout de 50 s sans notification), et la requête suivante repart
+aussitôt avec le dernier ID reçu, si bien qu'aucune notification n'est
+perdue entre deux requêtes.
+
+Les notifications sont publiées côté Odoo, par exemple par une action
+automatisée ::
+
+    env["bus.bus"]._sendone("odoo_automation", "pos.category/write",
+                            {"ids": records.ids})
+
+Chaque notification de type ``pos.category/write`` est alors transmise aux
+fonctions abonnées avec ``on("pos.category/write", callback)``. Les
+notifications d'un même type reçues dans une même réponse sont regroupées en
+un seul appel : une modification en masse ne déclenche qu'une réaction.
+
+La session web (cookie) s'ouvre avec ``/web/session/authenticate`` et se
+renouvelle d'elle-même si Odoo la déclare expirée.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Callable
+
+import requests
+
+from config.log_config import setup_logger
+from config import (
+    ODOO_URL,
+    ODOO_DB,
+    ODOO_USER,
+    ODOO_PASSWORD,
+    ODOO_BUS_CHANNELS,
+    ODOO_BUS_TIMEOUT,
+)
+
+
+logger = setup_logger(__name__)
+
+
+class OdooBusError(RuntimeError):
+    """Erreur renvoyée par Odoo sur une route web du bus."""
+
+
+class OdooBusListener:
+    """Client long-polling du bus Odoo pour une base.
+
+    ``callback(payloads)`` reçoit la liste des ``payload`` des notifications
+    d'un type ; le type ``"*"`` reçoit toutes les notifications brutes.
+    """
+
+    def __init__(
+        self,
+        url: str = ODOO_URL,
+        db: str = ODOO_DB,
+        username: str = ODOO_USER,
+        password: str = ODOO_PASSWORD,
+        channels: list[str] | None = None,
+        timeout: float = ODOO_BUS_TIMEOUT,
+        retry_delay: float = 5.0,
+    ) -> None:
+        self.url = url.rstrip("/")
+        self.db = db
+        self.username = username
+        self.password = password
+        self.channels = list(ODOO_BUS_CHANNELS if channels is None else channels)
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self.last = 0
+        self._session = requests.Session()
+        self._authenticated = False
+        self._callbacks: dict[str, list[Callable]] = defaultdict(list)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def on(self, event_type: str, callback: Callable[[list], object]) -> None:
+        """Abonne ``callback`` aux notifications de type ``event_type``."""
+        self._callbacks[event_type].append(callback)
+
+    # -- Requêtes -----------------------------------------------------------
+
+    def _call(self, route: str, params: dict, timeout: float):
+        response = self._session.post(
+            f"{self.url}{route}",
+            json={"jsonrpc": "2.0", "method": "call", "params": params},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        reply = response.json()
+        if reply.get("error"):
+            error = reply["error"]
+            name = (error.get("data") or {}).get("name", "")
+            if "SessionExpired" in name:
+                self._authenticated = False
+            raise OdooBusError(
+                (error.get("data") or {}).get("message") or error.get("message")
+            )
+        return reply.get("result")
+
+    def authenticate(self) -> None:
+        """Ouvre la session web utilisée par le long-polling."""
+        result = self._call(
+            "/web/session/authenticate",
+            {"db": self.db, "login": self.username, "password": self.password},
+            timeout=30,
+        )
+        if not result or not result.get("uid"):
+            raise OdooBusError("Authentification refusée par le bus Odoo.")
+        self._authenticated = True
+
+    def poll_once(self) -> list[dict]:
+        """Attend les notifications suivantes, les distribue et les retourne."""
+        if not self._authenticated:
+            self.authenticate()
+        notifications = self._call(
+            "/longpolling/poll",
+            {"channels": self.channels, "last": self.last, "options": {}},
+            timeout=self.timeout,
+        ) or []
+        if notifications:
+            self.last = max(self.last, *(n.get("id", 0) for n in notifications))
+            self._dispatch(notifications)
+        return notifications
+
+    def _dispatch(self, notifications: list[dict]) -> None:
+        payloads = defaultdict(list)
+        for notification in notifications:
+            message = notification.get("message")
+            if isinstance(message, dict) and message.get("type"):
+                payloads[message["type"]].append(message.get("payload"))
+        batches = [("*", notifications)] + list(payloads.items())
+        for event_type, batch in batches:
+            for callback in self._callbacks.get(event_type, []):
+                try:
+                    callback(batch)
+                except Exception as err:
+                    logger.exception(
+                        "Réaction à l'événement Odoo %s en échec : %s", event_type, err
+                    )
+
+    # -- Boucle -------------------------------------------------------------
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """Écoute le bus jusqu'à ce que ``stop`` soit positionné."""
+        stop = stop or self._stop
+        logger.info("Écoute du bus Odoo %s sur %s.", self.url, ", ".join(self.channels))
+        while not stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as err:
+                logger.warning(
+                    "Bus Odoo indisponible (%s), nouvel essai dans %.0f s.",
+                    err,
+                    self.retry_delay,
+                )
+                stop.wait(self.retry_delay)
+
+    def start(self) -> "OdooBusListener":
+        """Lance ``run()`` dans un thread démon."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Demande l'arrêt de l'écoute.
+
+        La requête en cours n'est pas interrompue : le thread s'arrête au plus
+        tard à sa réponse.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
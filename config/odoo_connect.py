@@ -1,42 +1,289 @@
 # config/odoo_connect.py
 
 from config.log_config import setup_logger
-from config.auth import authenticate_odoo
-from config import ODOO_URL, ODOO_DB, ODOO_USER, ODOO_PASSWORD
+from config.auth import AuthCache, authenticate_odoo, authenticate_odoo_cached
+from config.odoo_metrics import instrument
+from config.odoo_transport import server_proxy
+from config import (
+    ODOO_URL,
+    ODOO_DB,
+    ODOO_USER,
+    ODOO_PASSWORD,
+    ODOO_PROTOCOL,
+    ODOO_CACHE_DIR,
+    ODOO_AUTH_CACHE_TTL,
+    ODOO_TIMEOUT,
+    ODOO_GZIP_THRESHOLD,
+    ODOO_FAST_DECODER,
+)
+import os
+import threading
 import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
 
 
 logger = setup_logger(__name__)
 
-def get_odoo_connection():
+# Marqueurs présents dans les erreurs renvoyées par Odoo lorsque les
+# identifiants ne sont plus acceptés (session expirée, mot de passe changé...).
+_ACCESS_DENIED_MARKERS = ("AccessDenied", "Access Denied", "Session expired")
+
+
+def _is_access_denied(fault: xmlrpc.client.Fault) -> bool:
+    """Indique si ``fault`` correspond à un refus d'authentification."""
+    message = str(getattr(fault, "faultString", ""))
+    return any(marker in message for marker in _ACCESS_DENIED_MARKERS)
+
+
+class OdooConnectionManager:
+    """Session Odoo authentifiée et partagée par tout le processus.
+
+    L'authentification n'est effectuée qu'une seule fois puis réutilisée.
+    Chaque thread obtient son propre proxy (XML-RPC ou JSON-RPC selon
+    ``protocol``) : le transport d'un proxy conserve sa connexion HTTP ouverte
+    (keep-alive) mais n'est pas partageable entre threads. Une nouvelle
+    authentification n'a lieu que lorsque le serveur refuse les identifiants
+    en cours.
+
+    ``timeout`` borne chaque requête et les requêtes plus grosses que
+    ``gzip_threshold`` octets sont compressées ; ``fast_decoder`` active le
+    décodeur XML-RPC rapide. ``config.odoo_transport.odoo_deadline`` permet en plus de fixer une
+    échéance globale à un ensemble d'appels.
+
+    Avec un ``auth_cache``, l'UID d'une exécution précédente est réutilisé
+    sans aller-retour ; l'entrée est invalidée dès qu'Odoo la refuse.
+
+    Le gestionnaire expose ``execute_kw`` et peut donc être utilisé partout où
+    un proxy sur le service ``object`` était attendu.
     """
-    Initialise la connexion à Odoo via l'API XML-RPC.
+
+    def __init__(
+        self,
+        url: str,
+        db: str,
+        username: str,
+        password: str,
+        protocol: str = "xmlrpc",
+        auth_cache: AuthCache | None = None,
+        timeout: float | None = None,
+        gzip_threshold: int | None = None,
+        fast_decoder: bool = False,
+    ) -> None:
+        self.url = url
+        self.db = db
+        self.username = username
+        self.password = password
+        self.protocol = protocol
+        self.auth_cache = auth_cache
+        self.timeout = timeout
+        self.gzip_threshold = gzip_threshold
+        self.fast_decoder = fast_decoder
+        self._uid = None
+        self._server_version = None
+        self._auth_lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def uid(self) -> int:
+        """UID de la session, authentifiée à la première utilisation."""
+        if self._uid is None:
+            self.authenticate()
+        return self._uid
+
+    def authenticate(self, stale_uid: int | None = None) -> int:
+        """Authentifie la session si nécessaire et retourne l'UID.
+
+        ``stale_uid`` désigne un UID refusé par le serveur : la session n'est
+        renouvelée que si elle utilise encore cet UID, ce qui évite que
+        plusieurs threads rejouent l'authentification en même temps.
+        """
+        with self._auth_lock:
+            if self._uid is not None and self._uid == stale_uid:
+                if self.auth_cache is not None:
+                    self.auth_cache.invalidate(self.url, self.db, self.username)
+                self._uid = authenticate_odoo(
+                    self.url,
+                    self.db,
+                    self.username,
+                    self.password,
+                    self.protocol,
+                    self.timeout,
+                )
+                if self.auth_cache is not None:
+                    self.auth_cache.set(self.url, self.db, self.username, self._uid)
+            elif self._uid is None:
+                self._uid = authenticate_odoo_cached(
+                    self.url,
+                    self.db,
+                    self.username,
+                    self.password,
+                    self.protocol,
+                    self.auth_cache,
+                    self.timeout,
+                )
+            return self._uid
+
+    def server_version(self) -> dict:
+        """Retourne ``common.version()``, mémorisé avec l'authentification."""
+        if self._server_version is None:
+            entry = None
+            if self.auth_cache is not None:
+                entry = self.auth_cache.get(self.url, self.db, self.username)
+            if entry and entry.get("server_version"):
+                self._server_version = entry["server_version"]
+            else:
+                common = server_proxy(self.url, "common", self.protocol, self.timeout)
+                version = common.version()
+                self._server_version = version
+                if self.auth_cache is not None and isinstance(version, dict):
+                    self.auth_cache.set_server_version(
+                        self.url, self.db, self.username, version
+                    )
+        return self._server_version
+
+    def object_proxy(self):
+        """Retourne le proxy du service ``object`` propre au thread courant."""
+        proxy = getattr(self._local, "models", None)
+        if proxy is None:
+            proxy = server_proxy(
+                self.url,
+                "object",
+                self.protocol,
+                self.timeout,
+                self.gzip_threshold,
+                self.fast_decoder,
+            )
+            self._local.models = proxy
+        return proxy
+
+    def execute_kw(self, db, uid, password, model, method, *args):
+        """Exécute ``model.method`` en renouvelant la session si elle a expiré."""
+        try:
+            return self.object_proxy().execute_kw(
+                db, uid, password, model, method, *args
+            )
+        except xmlrpc.client.Fault as fault:
+            if not _is_access_denied(fault):
+                raise
+            logger.warning(
+                "Accès refusé par Odoo pour %s.%s, nouvelle authentification.",
+                model,
+                method,
+            )
+            uid = self.authenticate(stale_uid=uid)
+            return self.object_proxy().execute_kw(
+                db, uid, password, model, method, *args
+            )
+
+
+_managers: dict[tuple, OdooConnectionManager] = {}
+_managers_lock = threading.Lock()
+_auth_cache = AuthCache(os.path.join(ODOO_CACHE_DIR, "auth.json"), ODOO_AUTH_CACHE_TTL)
+
+
+def get_connection_manager(
+    url: str | None = None,
+    db: str | None = None,
+    username: str | None = None,
+    password: str | None = None,
+    protocol: str | None = None,
+) -> OdooConnectionManager:
+    """Retourne le gestionnaire de connexion partagé pour ces identifiants.
+
+    Les paramètres absents sont lus depuis la configuration centrale.
+    """
+    url = url or ODOO_URL or "https://example.com"
+    db = db or ODOO_DB or "db"
+    username = username or ODOO_USER or "user"
+    password = password or ODOO_PASSWORD or "password"
+    protocol = protocol or ODOO_PROTOCOL or "xmlrpc"
+
+    key = (url, db, username, password, protocol)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = OdooConnectionManager(
+                url,
+                db,
+                username,
+                password,
+                protocol,
+                _auth_cache,
+                ODOO_TIMEOUT,
+                ODOO_GZIP_THRESHOLD,
+                ODOO_FAST_DECODER,
+            )
+            _managers[key] = manager
+        return manager
+
+
+# Pool commun aux envois en parallèle (``OdooBatch``) et au préchargement des
+# pages (``iter_pages``). Ses threads vivent aussi longtemps que le processus :
+# le proxy que chacun obtient d'``object_proxy`` garde sa connexion ouverte
+# d'un lot à l'autre au lieu d'en rouvrir une par nouveau thread.
+EXECUTOR_WORKERS = 8
+_EXECUTOR_PREFIX = "odoo-pool"
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Retourne le pool de threads partagé pour les appels Odoo."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=EXECUTOR_WORKERS, thread_name_prefix=_EXECUTOR_PREFIX
+            )
+        return _executor
+
+
+def in_executor() -> bool:
+    """Indique si le thread courant appartient au pool partagé.
+
+    Un travail du pool qui attendrait un autre travail du même pool pourrait
+    l'attendre indéfiniment : il exécute alors ses appels lui-même.
+    """
+    return threading.current_thread().name.startswith(_EXECUTOR_PREFIX)
+
+
+def reset_connections() -> None:
+    """Oublie toutes les sessions ouvertes (tests, changement de config)."""
+    with _managers_lock:
+        _managers.clear()
+
+
+def get_odoo_connection(
+    url: str | None = None,
+    db: str | None = None,
+    username: str | None = None,
+    password: str | None = None,
+):
+    """
+    Initialise la connexion à Odoo via l'API XML-RPC (ou JSON-RPC selon
+    ``ODOO_PROTOCOL``). Les paramètres absents sont lus depuis la
+    configuration centrale ; les renseigner permet de viser une autre base.
     Utilise la fonction authenticate_odoo pour gérer l'authentification.
+    La session est mise en commun à l'échelle du processus : seuls le premier
+    appel et les sessions expirées déclenchent une authentification.
+    Avec ``ODOO_METRICS``, le proxy retourné mesure chaque appel.
     Retourne : db, uid, password, models (proxy pour manipuler les objets Odoo)
     """
     logger.info("Démarrage de l'initialisation de la connexion à Odoo.")
 
     try:
-        # Retrieve connection settings from the central config
-        url = ODOO_URL or "https://example.com"
-        db = ODOO_DB or "db"
-        username = ODOO_USER or "user"
-        password = ODOO_PASSWORD or "password"
+        manager = get_connection_manager(url, db, username, password)
 
         logger.debug(
-            f"Variables d'environnement récupérées : URL={url}, DB={db}, USER={username}"
+            f"Variables d'environnement récupérées : URL={manager.url}, "
+            f"DB={manager.db}, USER={manager.username}, "
+            f"PROTOCOLE={manager.protocol}"
         )
 
-        # Authentification réelle
-        uid = authenticate_odoo(url, db, username, password)
-
-        # Proxy XML-RPC pour les objets Odoo
-        models = xmlrpc.client.ServerProxy(
-            f"{url}/xmlrpc/2/object", allow_none=True
-        )
+        uid = manager.uid
         logger.info("Connexion à Odoo établie.")
 
-        return db, uid, password, models
+        return manager.db, uid, manager.password, instrument(manager)
 
     except Exception as conn_error:
         logger.exception(f"Erreur lors de la connexion à Odoo : {conn_error}")
@@ -0,0 +1,164 @@
+# config/odoo_metadata.py
+
+"""Cache des métadonnées Odoo qui ne changent presque jamais.
+
+Les identifiants ``ir.model``, les résultats de ``fields_get`` et les
+capacités détectées (quelle API appeler) sont conservés en mémoire pour la
+durée du processus et persistés dans ``ODOO_CACHE_DIR/metadata.json`` pour
+les exécutions suivantes. Après une mise à jour de modules Odoo,
+``invalidate()`` force leur relecture. La version du serveur est gardée avec
+l'authentification (``OdooConnectionManager.server_version()``).
+"""
+
+import os
+import threading
+
+from config.cache_store import get_store
+from config.log_config import setup_logger
+from config import ODOO_URL, ODOO_DB, ODOO_CACHE_DIR
+
+
+logger = setup_logger(__name__)
+
+
+class OdooMetadataCache:
+    """Métadonnées d'une base Odoo, en mémoire et sur disque.
+
+    ``namespace`` identifie la base (URL et nom) dans le fichier partagé ;
+    sans ``path``, le cache reste purement en mémoire.
+    """
+
+    def __init__(self, path: str | None, namespace: str) -> None:
+        self.store = get_store(path) if path else None
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._data: dict | None = None
+
+    def _entries(self) -> dict:
+        if self._data is None:
+            data = self.store.get(self.namespace) if self.store else None
+            self._data = data or {}
+            self._data.setdefault("model_ids", {})
+            self._data.setdefault("fields", {})
+            self._data.setdefault("capabilities", {})
+        return self._data
+
+    def _persist(self) -> None:
+        if self.store is not None:
+            self.store.set(self.namespace, self._data)
+
+    def model_id(self, models, db, uid, password, model_name: str) -> int | None:
+        """Retourne l'ID ``ir.model`` de ``model_name``."""
+        with self._lock:
+            cached = self._entries()["model_ids"].get(model_name)
+        if cached is not None:
+            return cached
+
+        model_ids = models.execute_kw(
+            db,
+            uid,
+            password,
+            "ir.model",
+            "search",
+            [[("model", "=", model_name)]],
+            {"limit": 1},
+        )
+        model_id = model_ids[0] if model_ids else None
+        if model_id is not None:
+            with self._lock:
+                self._entries()["model_ids"][model_name] = model_id
+                self._persist()
+        return model_id
+
+    def fields_get(
+        self,
+        models,
+        db,
+        uid,
+        password,
+        model_name: str,
+        attributes: tuple[str, ...] = ("type",),
+        server_version: str = "",
+    ) -> dict:
+        """Retourne ``model_name.fields_get`` limité à ``attributes``.
+
+        Avec ``server_version``, l'entrée est propre à cette version : une
+        mise à jour d'Odoo provoque une nouvelle lecture.
+        """
+        key = f"{model_name}:{','.join(sorted(attributes))}"
+        if server_version:
+            key = f"{key}@{server_version}"
+        with self._lock:
+            cached = self._entries()["fields"].get(key)
+        if cached is not None:
+            return cached
+
+        fields = models.execute_kw(
+            db,
+            uid,
+            password,
+            model_name,
+            "fields_get",
+            [],
+            {"attributes": list(attributes)},
+        )
+        with self._lock:
+            self._entries()["fields"][key] = fields
+            self._persist()
+        return fields
+
+    def capability(self, key: str, detect):
+        """Retourne la capacité ``key``, détectée une fois via ``detect()``.
+
+        Incluez la version du serveur dans ``key`` : une mise à jour d'Odoo
+        déclenche alors une nouvelle détection.
+        """
+        with self._lock:
+            cached = self._entries()["capabilities"].get(key)
+        if cached is not None:
+            return cached
+
+        value = detect()
+        with self._lock:
+            self._entries()["capabilities"][key] = value
+            self._persist()
+        return value
+
+    def invalidate(self, model_name: str | None = None) -> None:
+        """Oublie les métadonnées de ``model_name``, ou de toute la base."""
+        with self._lock:
+            entries = self._entries()
+            if model_name is None:
+                self._data = {"model_ids": {}, "fields": {}, "capabilities": {}}
+            else:
+                entries["model_ids"].pop(model_name, None)
+                entries["fields"] = {
+                    key: value
+                    for key, value in entries["fields"].items()
+                    if key.split(":", 1)[0] != model_name
+                }
+            self._persist()
+        logger.info(
+            "Cache des métadonnées Odoo invalidé : %s", model_name or "toute la base"
+        )
+
+
+_caches: dict[str, OdooMetadataCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_metadata_cache(
+    url: str | None = None, db: str | None = None
+) -> OdooMetadataCache:
+    """Retourne le cache de métadonnées partagé pour la base ``url``/``db``."""
+    url = url or ODOO_URL or "https://example.com"
+    db = db or ODOO_DB or "db"
+    namespace = f"{url}|{db}"
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = OdooMetadataCache(
+                os.path.join(ODOO_CACHE_DIR, "metadata.json"), namespace
+            )
+            _caches[namespace] = cache
+        return cache
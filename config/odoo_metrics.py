@@ -0,0 +1,207 @@
+# config/odoo_metrics.py
+
+"""Mesure des appels Odoo par ``(modèle, méthode)``.
+
+Lorsque ``ODOO_METRICS`` est activé, ``get_odoo_connection()`` retourne un
+``InstrumentedProxy`` qui enregistre pour chaque couple ``(model, method)`` :
+le nombre d'appels, un histogramme des latences, la durée des phases de
+connexion, d'envoi et de réception, les octets envoyés et reçus et le nombre
+d'erreurs. Les statistiques se consultent à tout moment via
+``get_metrics().snapshot()`` et sont écrites dans le journal (et dans
+``ODOO_METRICS_FILE`` si défini) à la fin du processus.
+"""
+
+import atexit
+import bisect
+import json
+import threading
+import time
+import xmlrpc.client
+
+from config.log_config import setup_logger
+from config.odoo_transport import exchange_size, exchange_timings, reset_exchange
+from config import ODOO_METRICS, ODOO_METRICS_FILE
+
+
+logger = setup_logger(__name__)
+
+# Bornes supérieures (en ms) des classes de l'histogramme de latence ; la
+# dernière classe regroupe les appels plus lents que la dernière borne.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class CallStats:
+    """Statistiques cumulées d'un couple ``(model, method)``."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.faults = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.phase_seconds = {"connect": 0.0, "send": 0.0, "receive": 0.0}
+
+    def add(
+        self, elapsed, request_bytes, response_bytes, outcome, timings=None
+    ) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed * 1000)] += 1
+        for phase, seconds in (timings or {}).items():
+            self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+        if outcome == "fault":
+            self.faults += 1
+        elif outcome == "error":
+            self.errors += 1
+
+    def to_dict(self) -> dict:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS]
+        labels.append(f">{LATENCY_BUCKETS_MS[-1]}ms")
+        return {
+            "count": self.count,
+            "faults": self.faults,
+            "errors": self.errors,
+            "fault_rate": (self.faults + self.errors) / self.count if self.count else 0.0,
+            "avg_ms": self.total_seconds * 1000 / self.count if self.count else 0.0,
+            "max_ms": self.max_seconds * 1000,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "latency_histogram": dict(zip(labels, self.histogram)),
+            "phases_ms": {
+                phase: seconds * 1000 for phase, seconds in self.phase_seconds.items()
+            },
+        }
+
+
+class OdooMetrics:
+    """Registre thread-safe des statistiques d'appels Odoo."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, str], CallStats] = {}
+
+    def record(
+        self,
+        model: str,
+        method: str,
+        elapsed: float,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+        outcome: str = "ok",
+        timings: dict[str, float] | None = None,
+    ) -> None:
+        """Enregistre un appel ; ``outcome`` vaut ``ok``, ``fault`` ou ``error``.
+
+        ``timings`` détaille la durée des phases ``connect``/``send``/``receive``.
+        """
+        with self._lock:
+            stats = self._stats.setdefault((model, method), CallStats())
+            stats.add(elapsed, request_bytes, response_bytes, outcome, timings)
+
+    def snapshot(self) -> dict[str, dict]:
+        """Retourne les statistiques courantes, indexées par ``model.method``."""
+        with self._lock:
+            return {
+                f"{model}.{method}": stats.to_dict()
+                for (model, method), stats in sorted(self._stats.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def report(self) -> str:
+        """Retourne un tableau lisible, trié par temps cumulé décroissant."""
+        with self._lock:
+            rows = sorted(
+                self._stats.items(), key=lambda item: item[1].total_seconds, reverse=True
+            )
+            lines = [
+                f"{'appel':<40}{'n':>7}{'total ms':>11}{'moy ms':>9}"
+                f"{'max ms':>9}{'envoyé':>10}{'reçu':>10}{'erreurs':>9}"
+            ]
+            for (model, method), s in rows:
+                lines.append(
+                    f"{model + '.' + method:<40}{s.count:>7}"
+                    f"{s.total_seconds * 1000:>11.1f}"
+                    f"{s.total_seconds * 1000 / s.count:>9.1f}"
+                    f"{s.max_seconds * 1000:>9.1f}{s.request_bytes:>10}"
+                    f"{s.response_bytes:>10}{s.faults + s.errors:>9}"
+                )
+        return "\n".join(lines)
+
+    def dump(self, path: str | None = None) -> None:
+        """Écrit le rapport dans le journal et, si ``path``, en JSON."""
+        if not self._stats:
+            return
+        logger.info("Statistiques des appels Odoo :\n%s", self.report())
+        if path:
+            try:
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(self.snapshot(), f, indent=2)
+            except OSError as err:
+                logger.warning("Impossible d'écrire %s : %s", path, err)
+
+
+class InstrumentedProxy:
+    """Proxy Odoo mesurant chaque ``execute_kw`` dans ``metrics``.
+
+    Les autres attributs sont délégués au proxy enveloppé.
+    """
+
+    def __init__(self, models, metrics: OdooMetrics) -> None:
+        self._models = models
+        self._metrics = metrics
+
+    def execute_kw(self, db, uid, password, model, method, *args):
+        reset_exchange()
+        outcome = "ok"
+        start = time.perf_counter()
+        try:
+            return self._models.execute_kw(db, uid, password, model, method, *args)
+        except xmlrpc.client.Fault:
+            outcome = "fault"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            request_bytes, response_bytes = exchange_size()
+            self._metrics.record(
+                model,
+                method,
+                elapsed,
+                request_bytes,
+                response_bytes,
+                outcome,
+                exchange_timings(),
+            )
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+_metrics = OdooMetrics()
+
+
+def get_metrics() -> OdooMetrics:
+    """Retourne le registre de statistiques du processus."""
+    return _metrics
+
+
+def instrument(models):
+    """Enveloppe ``models`` si la mesure des appels est activée."""
+    if not ODOO_METRICS or isinstance(models, InstrumentedProxy):
+        return models
+    return InstrumentedProxy(models, _metrics)
+
+
+if ODOO_METRICS:
+    atexit.register(lambda: _metrics.dump(ODOO_METRICS_FILE or None))
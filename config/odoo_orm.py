@@ -0,0 +1,272 @@
+# config/odoo_orm.py
+
+"""Couche d'enregistrements légère au-dessus de ``execute_kw``.
+
+Plutôt que de construire à la main les listes d'arguments de ``execute_kw``,
+le code manipule des ``RecordSet`` obtenus depuis un ``OdooEnv`` ::
+
+    env = OdooEnv(db, uid, password, models)
+    categories = env["pos.category"].search([("id", "in", ids)])
+    for category in categories:
+        logger.info(category.name)       # un seul ``read`` pour tout le lot
+    categories.write({"available_in_pos": True})
+    env.flush()                          # écritures envoyées groupées
+
+Comme dans l'ORM Odoo, lire un champ sur un enregistrement d'un lot lit ce
+champ pour tous les enregistrements du lot en un seul ``read`` (pas de
+requêtes N+1), et ``read(champs)`` lit tous les champs manquants en un seul
+appel. Les écritures sont mises en attente dans un ``OdooBatch`` et
+envoyées par ``flush()`` (ou à la sortie du bloc ``with``) : celles qui
+portent les mêmes valeurs sur un même modèle partent en un seul ``write``.
+Une lecture d'un champ en attente d'écriture envoie d'abord le lot.
+"""
+
+from concurrent.futures import Future
+
+from config.odoo_batch import OdooBatch
+from config.log_config import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+class OdooEnv:
+    """Point d'entrée de la couche d'enregistrements pour une connexion."""
+
+    def __init__(
+        self,
+        db,
+        uid,
+        password,
+        models,
+        max_workers: int = 4,
+        label: str = "Écritures Odoo",
+    ) -> None:
+        self.db = db
+        self.uid = uid
+        self.password = password
+        self.models = models
+        self.max_workers = max_workers
+        self.label = label
+        # Valeurs lues, par modèle puis par ID.
+        self._cache: dict[str, dict[int, dict]] = {}
+        self._batch = self._new_batch()
+        self._pending: list[tuple[str, list[int], set, Future]] = []
+
+    def _new_batch(self) -> OdooBatch:
+        return OdooBatch(
+            self.db,
+            self.uid,
+            self.password,
+            self.models,
+            max_workers=self.max_workers,
+            label=self.label,
+        )
+
+    def __getitem__(self, model: str) -> "RecordSet":
+        return RecordSet(self, model, [])
+
+    def execute(self, model: str, method: str, args=None, kwargs=None):
+        """Appelle ``model.method`` immédiatement."""
+        call_args = [self.db, self.uid, self.password, model, method, args or []]
+        if kwargs:
+            call_args.append(kwargs)
+        return self.models.execute_kw(*call_args)
+
+    # -- Lectures -----------------------------------------------------------
+
+    def _store(self, model: str, rows: list[dict]) -> None:
+        records = self._cache.setdefault(model, {})
+        for row in rows:
+            records.setdefault(row["id"], {}).update(row)
+
+    def _prefetch(self, model: str, ids: list[int], fields: list[str]) -> None:
+        """Lit en un seul appel les ``fields`` manquants des ``ids``.
+
+        Seuls les champs absents d'au moins un enregistrement sont demandés,
+        pour les seuls enregistrements auxquels l'un d'eux manque.
+        """
+        wanted = set(fields)
+        if any(m == model and wanted & written for m, _, written, _ in self._pending):
+            self.flush()
+        records = self._cache.setdefault(model, {})
+        missing_fields = [
+            field
+            for field in dict.fromkeys(fields)
+            if any(field not in records.get(i, {}) for i in ids)
+        ]
+        if not missing_fields:
+            return
+        missing = [
+            i for i in ids if any(f not in records.get(i, {}) for f in missing_fields)
+        ]
+        self._store(
+            model, self.execute(model, "read", [missing], {"fields": missing_fields})
+        )
+
+    def _value(self, model: str, record_id: int, field: str):
+        return self._cache.get(model, {}).get(record_id, {}).get(field)
+
+    def invalidate(self, model: str | None = None) -> None:
+        """Oublie les valeurs lues pour ``model``, ou pour tous les modèles."""
+        if model is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(model, None)
+
+    # -- Écritures ----------------------------------------------------------
+
+    def _write(self, model: str, ids: list[int], vals: dict) -> Future:
+        future = self._batch.write(model, ids, vals)
+        self._pending.append((model, list(ids), set(vals), future))
+        # Les valeurs écrites (commandes x2many comprises) seront relues.
+        for record_id in ids:
+            record = self._cache.get(model, {}).get(record_id)
+            if record is not None:
+                for field in vals:
+                    record.pop(field, None)
+        return future
+
+    def flush(self, raise_on_error: bool = True) -> None:
+        """Envoie les écritures en attente.
+
+        Par défaut, la première erreur d'écriture est relevée ; avec
+        ``raise_on_error=False``, chaque ``Future`` retourné par ``write``
+        porte son propre résultat.
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        batch, self._batch = self._batch, self._new_batch()
+        batch.flush()
+        if raise_on_error:
+            for _, _, _, future in pending:
+                if future.exception() is not None:
+                    raise future.exception()
+
+    def __enter__(self) -> "OdooEnv":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+
+class RecordSet:
+    """Ensemble ordonné d'enregistrements d'un modèle Odoo.
+
+    Les champs se lisent comme des attributs sur un enregistrement unique
+    (``category.name``) ou en liste avec ``mapped``. Les enregistrements
+    obtenus en itérant partagent le lot d'origine pour le préchargement.
+    """
+
+    def __init__(
+        self, env: OdooEnv, model: str, ids: list[int], prefetch_ids=None
+    ) -> None:
+        self.env = env
+        self.model = model
+        self.ids = list(ids)
+        self._prefetch_ids = prefetch_ids if prefetch_ids is not None else self.ids
+
+    def __repr__(self) -> str:
+        return f"{self.model}{tuple(self.ids)!r}"
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __bool__(self) -> bool:
+        return bool(self.ids)
+
+    def __iter__(self):
+        for record_id in self.ids:
+            yield RecordSet(self.env, self.model, [record_id], self._prefetch_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordSet(self.env, self.model, self.ids[index], self._prefetch_ids)
+        return RecordSet(self.env, self.model, [self.ids[index]], self._prefetch_ids)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, RecordSet)
+            and (self.model, self.ids) == (other.model, other.ids)
+        )
+
+    @property
+    def id(self) -> int | bool:
+        if len(self.ids) > 1:
+            raise ValueError(f"Un seul enregistrement attendu : {self!r}")
+        return self.ids[0] if self.ids else False
+
+    def __getattr__(self, field: str):
+        if field.startswith("_"):
+            raise AttributeError(field)
+        if len(self.ids) != 1:
+            raise ValueError(f"Un seul enregistrement attendu pour {field} : {self!r}")
+        self.env._prefetch(self.model, self._prefetch_ids, [field])
+        return self.env._value(self.model, self.ids[0], field)
+
+    # -- Recherche et lecture -----------------------------------------------
+
+    def browse(self, ids) -> "RecordSet":
+        ids = [ids] if isinstance(ids, int) else list(ids)
+        return RecordSet(self.env, self.model, ids)
+
+    def search(
+        self,
+        domain: list | None = None,
+        limit: int | None = None,
+        order: str | None = None,
+        fields: list[str] | None = None,
+    ) -> "RecordSet":
+        """Recherche des enregistrements.
+
+        Avec ``fields``, la recherche passe par ``search_read`` et ces champs
+        sont disponibles sans appel supplémentaire.
+        """
+        kwargs = {}
+        if limit:
+            kwargs["limit"] = limit
+        if order:
+            kwargs["order"] = order
+        if fields:
+            kwargs["fields"] = list(fields)
+            rows = self.env.execute(self.model, "search_read", [domain or []], kwargs)
+            self.env._store(self.model, rows)
+            return self.browse([row["id"] for row in rows])
+        return self.browse(
+            self.env.execute(self.model, "search", [domain or []], kwargs)
+        )
+
+    def mapped(self, field: str) -> list:
+        """Retourne ``field`` pour chaque enregistrement, en un seul ``read``."""
+        self.env._prefetch(self.model, self._prefetch_ids, [field])
+        return [self.env._value(self.model, i, field) for i in self.ids]
+
+    def read(self, fields: list[str]) -> list[dict]:
+        """Retourne les ``fields`` de chaque enregistrement sous forme de dict.
+
+        Tous les champs manquants sont lus en un seul ``read`` pour le lot.
+        """
+        self.env._prefetch(self.model, self._prefetch_ids, list(fields))
+        return [
+            {"id": i, **{field: self.env._value(self.model, i, field) for field in fields}}
+            for i in self.ids
+        ]
+
+    # -- Modifications ------------------------------------------------------
+
+    def write(self, vals: dict) -> Future:
+        """Met ``write(vals)`` en attente jusqu'au prochain ``flush()``."""
+        return self.env._write(self.model, self.ids, vals)
+
+    def create(self, vals: dict | list[dict]) -> "RecordSet":
+        """Crée un ou plusieurs enregistrements immédiatement."""
+        self.env.flush()
+        created = self.env.execute(self.model, "create", [vals])
+        return self.browse(created)
+
+    def call(self, method: str, *args, **kwargs):
+        """Appelle ``method`` sur ces enregistrements, immédiatement."""
+        self.env.flush()
+        return self.env.execute(self.model, method, [self.ids, *args], kwargs or None)
@@ -0,0 +1,149 @@
+# config/odoo_paging.py
+
+"""Lecture paginée des gros modèles Odoo.
+
+Un ``search_read`` sans limite charge tout le modèle en une réponse : c'est
+acceptable pour quelques dizaines de catégories POS, pas pour des contacts
+de mailing ou un catalogue produits. ``iter_search_read`` parcourt le modèle
+page par page et ne lit que les champs demandés ; pendant que l'appelant
+traite une page, la suivante est déjà demandée à Odoo dans un thread.
+
+Deux modes de pagination sont proposés :
+
+- ``cursor="id"`` (par défaut) : chaque page reprend après le dernier ID lu
+  (``id > dernier``, tri par ID). Le parcours reste exact même si des
+  enregistrements sont créés ou supprimés pendant la lecture ;
+- ``cursor="offset"`` : ``limit``/``offset`` classiques, nécessaires pour
+  respecter un ``order`` arbitraire.
+
+Le préchargement utilise le proxy depuis un thread du pool partagé
+(``config.odoo_connect.get_executor()``) : il convient aux gestionnaires de
+``get_odoo_connection()`` (un proxy par thread, dont la connexion reste
+ouverte d'un parcours à l'autre), sous l'échéance ``odoo_deadline`` active
+au moment où la page est demandée. Avec un ``xmlrpc.client.ServerProxy`` brut,
+passez ``prefetch=False``.
+"""
+
+from typing import Iterator
+
+from config.log_config import setup_logger
+from config.odoo_connect import get_executor, in_executor
+from config.odoo_transport import bind_deadline
+
+
+logger = setup_logger(__name__)
+
+CURSORS = ("id", "offset")
+
+
+def iter_pages(
+    models,
+    db,
+    uid,
+    password,
+    model: str,
+    domain: list | None = None,
+    fields: list[str] | None = None,
+    page_size: int = 500,
+    order: str | None = None,
+    cursor: str = "id",
+    prefetch: bool = True,
+    context: dict | None = None,
+) -> Iterator[list[dict]]:
+    """Génère les pages de ``model.search_read(domain, fields)``.
+
+    Avec ``cursor="id"``, ``id`` est ajouté aux champs lus s'il n'y figure
+    pas et ``order`` est ignoré (tri par ID croissant).
+    """
+    if cursor not in CURSORS:
+        raise ValueError(
+            f"Pagination inconnue : {cursor} (attendu : {', '.join(CURSORS)})"
+        )
+    if page_size <= 0:
+        raise ValueError("page_size doit être strictement positif.")
+    domain = list(domain or [])
+    fields = list(fields or [])
+    if cursor == "id":
+        if fields and "id" not in fields:
+            fields.append("id")
+        order = "id asc"
+
+    def fetch(position):
+        page_domain = domain
+        kwargs = {"fields": fields, "limit": page_size}
+        if order:
+            kwargs["order"] = order
+        if context:
+            kwargs["context"] = context
+        if cursor == "id":
+            if position is not None:
+                page_domain = [("id", ">", position)] + domain
+        else:
+            kwargs["offset"] = position or 0
+        return models.execute_kw(
+            db, uid, password, model, "search_read", [page_domain], kwargs
+        )
+
+    def next_position(position, page):
+        if cursor == "id":
+            return page[-1]["id"]
+        return (position or 0) + len(page)
+
+    executor = get_executor() if prefetch and not in_executor() else None
+    pending = None
+    try:
+        position = None
+        page = fetch(position)
+        pages = 0
+        while page:
+            pages += 1
+            if len(page) < page_size:
+                yield page
+                break
+            position = next_position(position, page)
+            if executor is not None:
+                pending = executor.submit(bind_deadline(fetch), position)
+            yield page
+            if pending is not None:
+                page, pending = pending.result(), None
+            else:
+                page = fetch(position)
+        logger.debug("%s : %d page(s) lue(s).", model, pages)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def iter_search_read(
+    models,
+    db,
+    uid,
+    password,
+    model: str,
+    domain: list | None = None,
+    fields: list[str] | None = None,
+    page_size: int = 500,
+    order: str | None = None,
+    cursor: str = "id",
+    prefetch: bool = True,
+    context: dict | None = None,
+) -> Iterator[dict]:
+    """Génère un à un les enregistrements de ``model.search_read``.
+
+    Voir ``iter_pages`` pour les paramètres.
+    """
+    for page in iter_pages(
+        models,
+        db,
+        uid,
+        password,
+        model,
+        domain,
+        fields,
+        page_size,
+        order,
+        cursor,
+        prefetch,
+        context,
+    ):
+        yield from page
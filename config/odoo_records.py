@@ -0,0 +1,243 @@
+# config/odoo_records.py
+
+"""Cache d'enregistrements Odoo revalidé par ``write_date``.
+
+Les mêmes enregistrements (catégories POS, listes de diffusion, lignes
+``pos.config``) sont relus à chaque exécution. ``OdooRecordCache`` conserve
+leurs valeurs par ``(modèle, id, champs)`` et, plutôt que de tout relire,
+demande à Odoo le seul ``write_date`` des IDs déjà connus, en un appel pour
+tout le lot : seuls les enregistrements modifiés (ou inconnus) sont relus
+intégralement, en un second appel.
+
+``write_date`` n'est stocké par Odoo qu'à la seconde : une écriture faite
+dans la seconde même où un enregistrement a été lu ne le change pas. Une
+valeur lue moins d'une seconde après son ``write_date`` (horloges locale et
+serveur en UTC) n'est donc pas considérée comme confirmée et sera relue à la
+revalidation suivante.
+
+Le cache est borné à ``max_records`` entrées (les moins récemment utilisées
+sont évincées) et compte ses succès, échecs et évictions. Les valeurs lues
+doivent être sérialisables en JSON pour être persistées entre deux
+exécutions dans ``ODOO_CACHE_DIR/records.json``.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from config.cache_store import get_store
+from config.log_config import setup_logger
+from config import ODOO_URL, ODOO_DB, ODOO_CACHE_DIR, ODOO_RECORD_CACHE_SIZE
+
+
+logger = setup_logger(__name__)
+
+# Résolution de ``write_date`` dans Odoo, en secondes.
+WRITE_DATE_RESOLUTION = 1.0
+
+
+def _confirmed_write_date(write_date, fetched_at: float):
+    """Retourne ``write_date`` si la lecture est postérieure à sa seconde.
+
+    Sinon, une écriture de la même seconde a pu suivre la lecture sans
+    changer ``write_date`` : ``None`` force la relecture de l'enregistrement.
+    """
+    try:
+        written_at = (
+            datetime.strptime(write_date, "%Y-%m-%d %H:%M:%S")
+            .replace(tzinfo=timezone.utc)
+            .timestamp()
+        )
+    except (TypeError, ValueError):
+        return None
+    if fetched_at - written_at < WRITE_DATE_RESOLUTION:
+        return None
+    return write_date
+
+
+class OdooRecordCache:
+    """Enregistrements Odoo en mémoire (LRU) et, avec ``path``, sur disque.
+
+    ``namespace`` identifie la base (URL et nom) dans le fichier partagé.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        namespace: str = "",
+        max_records: int = 5000,
+        clock=time.time,
+    ) -> None:
+        self.clock = clock
+        self.store = get_store(path) if path else None
+        self.namespace = namespace
+        self.max_records = max(1, max_records)
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict | None = None
+
+    @staticmethod
+    def _key(model: str, record_id: int, fields) -> tuple:
+        return model, record_id, tuple(sorted(fields))
+
+    def _load(self) -> OrderedDict:
+        if self._entries is None:
+            self._entries = OrderedDict()
+            rows = self.store.get(self.namespace) if self.store else None
+            for model, record_id, fields, write_date, values in rows or []:
+                self._entries[self._key(model, record_id, fields)] = (
+                    write_date,
+                    values,
+                )
+        return self._entries
+
+    def _persist(self) -> None:
+        if self.store is None:
+            return
+        rows = [
+            [model, record_id, list(fields), write_date, values]
+            for (model, record_id, fields), (write_date, values) in self._entries.items()
+        ]
+        try:
+            self.store.set(self.namespace, rows)
+        except (TypeError, ValueError) as err:
+            logger.warning("Cache d'enregistrements Odoo non persisté : %s", err)
+
+    def _put(self, key: tuple, write_date, values: dict) -> None:
+        entries = self._entries
+        entries[key] = (write_date, values)
+        entries.move_to_end(key)
+        while len(entries) > self.max_records:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def read(
+        self, models, db, uid, password, model: str, ids: list[int], fields: list[str]
+    ) -> list[dict]:
+        """Retourne ``model.read(ids, fields)`` en ne relisant que le nécessaire.
+
+        Les enregistrements supprimés dans Odoo sont absents du résultat et
+        retirés du cache ; l'ordre de ``ids`` est conservé.
+        """
+        fields = [field for field in fields if field not in ("id", "write_date")]
+        with self._lock:
+            entries = self._load()
+            cached = {
+                record_id: entries[key][0]
+                for record_id in ids
+                if (key := self._key(model, record_id, fields)) in entries
+            }
+
+        # Un seul appel pour revalider tous les IDs connus.
+        current = {}
+        if cached:
+            current = {
+                row["id"]: row["write_date"]
+                for row in models.execute_kw(
+                    db,
+                    uid,
+                    password,
+                    model,
+                    "read",
+                    [list(cached)],
+                    {"fields": ["write_date"]},
+                )
+            }
+        deleted = [record_id for record_id in cached if record_id not in current]
+        stale = {
+            record_id
+            for record_id in cached
+            if record_id in current and current[record_id] != cached[record_id]
+        }
+        to_fetch = [
+            record_id
+            for record_id in dict.fromkeys(ids)
+            if record_id not in cached or record_id in stale
+        ]
+        rows = []
+        fetched_at = self.clock()
+        if to_fetch:
+            rows = models.execute_kw(
+                db,
+                uid,
+                password,
+                model,
+                "read",
+                [to_fetch],
+                {"fields": fields + ["write_date"]},
+            )
+
+        with self._lock:
+            entries = self._load()
+            values_by_id = {}
+            for record_id in deleted:
+                entries.pop(self._key(model, record_id, fields), None)
+            for record_id in cached:
+                key = self._key(model, record_id, fields)
+                if record_id in current and record_id not in stale and key in entries:
+                    entries.move_to_end(key)
+                    values_by_id[record_id] = entries[key][1]
+            self.hits += len(cached) - len(deleted) - len(stale)
+            self.stale += len(stale)
+            self.misses += len(set(ids)) - len(cached)
+            for row in rows:
+                values = {field: row.get(field, False) for field in fields}
+                values["id"] = row["id"]
+                self._put(
+                    self._key(model, row["id"], fields),
+                    _confirmed_write_date(row["write_date"], fetched_at),
+                    values,
+                )
+                values_by_id[row["id"]] = values
+            if rows or deleted:
+                self._persist()
+        return [
+            dict(values_by_id[record_id]) for record_id in ids if record_id in values_by_id
+        ]
+
+    def invalidate(self, model: str | None = None) -> None:
+        """Oublie les enregistrements de ``model``, ou tout le cache."""
+        with self._lock:
+            entries = self._load()
+            for key in [key for key in entries if model in (None, key[0])]:
+                del entries[key]
+            self._persist()
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du cache."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.stale
+            return {
+                "size": len(self._load()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_caches: dict[str, OdooRecordCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_record_cache(url: str | None = None, db: str | None = None) -> OdooRecordCache:
+    """Retourne le cache d'enregistrements partagé pour la base ``url``/``db``."""
+    url = url or ODOO_URL or "https://example.com"
+    db = db or ODOO_DB or "db"
+    namespace = f"{url}|{db}"
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = OdooRecordCache(
+                os.path.join(ODOO_CACHE_DIR, "records.json"),
+                namespace,
+                ODOO_RECORD_CACHE_SIZE,
+            )
+            _caches[namespace] = cache
+        return cache
@@ -0,0 +1,158 @@
+# config/odoo_targets.py
+
+"""Exécution d'une même opération sur plusieurs bases Odoo.
+
+Chaque boutique dispose de sa propre base Odoo. Les noms listés dans
+``ODOO_TARGETS`` décrivent ces bases (``ODOO_<NOM>_URL``, ``ODOO_<NOM>_DB``,
+etc.) ; ``fan_out`` applique une opération à toutes en parallèle, avec au plus
+``max_workers`` bases traitées à la fois, et retourne pour chacune la durée,
+le résultat ou l'erreur. L'échec d'une base n'interrompt pas les autres.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from config.log_config import setup_logger
+from config.odoo_connect import get_odoo_connection
+from config.odoo_transport import odoo_deadline
+from config import (
+    ODOO_URL,
+    ODOO_DB,
+    ODOO_USER,
+    ODOO_PASSWORD,
+    ODOO_MAILING_LIST_IDS,
+    ODOO_TARGETS,
+    ODOO_TARGETS_CONCURRENCY,
+)
+
+
+logger = setup_logger(__name__)
+
+
+class OdooTarget:
+    """Une base Odoo cible et ses identifiants."""
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        db: str,
+        username: str,
+        password: str,
+        mailing_list_ids: list[int] | None = None,
+    ) -> None:
+        self.name = name
+        self.url = url
+        self.db = db
+        self.username = username
+        self.password = password
+        self.mailing_list_ids = list(mailing_list_ids or [])
+
+    def __repr__(self) -> str:
+        return f"OdooTarget({self.name!r}, {self.url!r}, {self.db!r})"
+
+    def connect(self):
+        """Retourne ``db, uid, password, models`` pour cette base."""
+        return get_odoo_connection(self.url, self.db, self.username, self.password)
+
+
+def load_targets(names: list[str] | None = None) -> list[OdooTarget]:
+    """Construit les cibles depuis l'environnement.
+
+    Sans ``names``, ``ODOO_TARGETS`` est utilisé ; s'il est vide, la base
+    unique de la configuration centrale est l'unique cible (``default``).
+    """
+    names = ODOO_TARGETS if names is None else names
+    if not names:
+        return [
+            OdooTarget(
+                "default",
+                ODOO_URL,
+                ODOO_DB,
+                ODOO_USER,
+                ODOO_PASSWORD,
+                ODOO_MAILING_LIST_IDS,
+            )
+        ]
+
+    targets = []
+    for name in names:
+        prefix = f"ODOO_{name.upper()}_"
+        list_ids = os.getenv(f"{prefix}MAILING_LIST_IDS")
+        targets.append(
+            OdooTarget(
+                name,
+                os.getenv(f"{prefix}URL", ODOO_URL),
+                os.getenv(f"{prefix}DB", ODOO_DB),
+                os.getenv(f"{prefix}USER", ODOO_USER),
+                os.getenv(f"{prefix}PASSWORD", ODOO_PASSWORD),
+                [int(i) for i in list_ids.split(",") if i.strip()]
+                if list_ids is not None
+                else ODOO_MAILING_LIST_IDS,
+            )
+        )
+    return targets
+
+
+class TargetResult:
+    """Résultat de l'opération sur une cible."""
+
+    def __init__(self, target: OdooTarget, seconds: float, result=None, error=None):
+        self.target = target
+        self.seconds = seconds
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def fan_out(
+    operation: Callable[[OdooTarget], object],
+    targets: list[OdooTarget] | None = None,
+    max_workers: int = ODOO_TARGETS_CONCURRENCY,
+    deadline: float | None = None,
+    label: str = "Opération Odoo",
+) -> list[TargetResult]:
+    """Applique ``operation(target)`` à chaque cible, en parallèle.
+
+    ``deadline`` borne en secondes l'ensemble des appels Odoo de chaque
+    cible. Les résultats sont retournés dans l'ordre des cibles et le
+    rapport est écrit dans le journal.
+    """
+    targets = load_targets() if targets is None else targets
+
+    def run(target: OdooTarget) -> TargetResult:
+        start = time.perf_counter()
+        try:
+            with odoo_deadline(deadline):
+                result = operation(target)
+        except Exception as err:
+            logger.exception("%s : échec sur %s : %s", label, target.name, err)
+            return TargetResult(target, time.perf_counter() - start, error=err)
+        return TargetResult(target, time.perf_counter() - start, result=result)
+
+    if not targets:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets)))) as executor:
+        results = list(executor.map(run, targets))
+    logger.info("%s :\n%s", label, format_report(results))
+    return results
+
+
+def format_report(results: list[TargetResult]) -> str:
+    """Retourne un tableau lisible des résultats par cible."""
+    lines = [f"{'cible':<20}{'durée s':>9}  résultat"]
+    for entry in results:
+        outcome = (
+            repr(entry.result)
+            if entry.ok
+            else f"ERREUR {type(entry.error).__name__}: {entry.error}"
+        )
+        lines.append(f"{entry.target.name:<20}{entry.seconds:>9.2f}  {outcome}")
+    failed = sum(not entry.ok for entry in results)
+    lines.append(f"{len(results) - failed} cible(s) réussie(s), {failed} en échec.")
+    return "\n".join(lines)
@@ -0,0 +1,444 @@
+# config/odoo_transport.py
+
+"""Transports utilisés pour dialoguer avec Odoo.
+
+Deux protocoles sont disponibles derrière la même interface que
+``xmlrpc.client.ServerProxy`` (``proxy.authenticate(...)``,
+``proxy.execute_kw(...)``) :
+
+- ``xmlrpc`` : points d'entrée historiques ``/xmlrpc/2/common`` et
+  ``/xmlrpc/2/object`` ;
+- ``jsonrpc`` : point d'entrée ``/jsonrpc``, plus compact et plus rapide à
+  décoder pour les gros ``search_read`` ou les corps HTML volumineux.
+"""
+
+import functools
+import gzip
+import itertools
+import json
+import threading
+import time
+import xmlrpc.client
+from contextlib import contextmanager
+
+import requests
+
+from config.log_config import setup_logger
+from config import odoo_xmlrpc_decoder
+
+
+logger = setup_logger(__name__)
+
+
+PROTOCOLS = ("xmlrpc", "jsonrpc")
+
+# Réponses indiquant qu'un serveur n'accepte pas les requêtes compressées.
+_GZIP_REFUSED_STATUS = (400, 411, 415, 501)
+_GZIP_REFUSED_MARKERS = ("not well-formed", "ExpatError", "Invalid JSON")
+
+
+class OdooTimeout(TimeoutError):
+    """Un appel Odoo a dépassé son délai."""
+
+
+class OdooDeadlineExceeded(OdooTimeout):
+    """L'échéance globale fixée par ``odoo_deadline`` est dépassée."""
+
+
+# Échéances (horloge monotone) posées par ``odoo_deadline`` dans ce thread.
+_deadlines = threading.local()
+
+
+@contextmanager
+def odoo_deadline(seconds: float | None):
+    """Borne la durée totale des appels Odoo émis dans le bloc.
+
+    Chaque requête reçoit le plus petit délai entre ``ODOO_TIMEOUT`` et le
+    temps restant avant l'échéance ; une fois l'échéance atteinte, les appels
+    suivants lèvent ``OdooDeadlineExceeded`` sans solliciter le serveur. Les
+    blocs imbriqués conservent l'échéance la plus proche. ``None`` ne pose
+    aucune échéance.
+    """
+    stack = _deadlines.__dict__.setdefault("stack", [])
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    if stack:
+        deadline = min(deadline, stack[-1])
+    stack.append(deadline)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+
+def bind_deadline(func):
+    """Retourne ``func`` soumise à l'échéance active dans le thread appelant.
+
+    Les échéances sont propres à chaque thread : un travail confié à un
+    autre thread (pool de ``OdooBatch``, préchargement d'``iter_pages``)
+    doit être lié au moment où il est soumis pour rester borné.
+    """
+    stack = getattr(_deadlines, "stack", None)
+    if not stack:
+        return func
+    deadline = stack[-1]
+
+    @functools.wraps(func)
+    def bound(*args, **kwargs):
+        with odoo_deadline(deadline - time.monotonic()):
+            return func(*args, **kwargs)
+
+    return bound
+
+
+def _call_timeout(timeout: float | None) -> tuple[float | None, bool]:
+    """Retourne le délai de la prochaine requête et s'il vient de l'échéance."""
+    stack = getattr(_deadlines, "stack", None)
+    if not stack:
+        return timeout, False
+    remaining = stack[-1] - time.monotonic()
+    if remaining <= 0:
+        raise OdooDeadlineExceeded("Échéance des appels Odoo dépassée.")
+    if timeout is None or remaining < timeout:
+        return remaining, True
+    return timeout, False
+
+
+# Octets et durées échangés par le thread courant depuis ``reset_exchange``.
+_exchange = threading.local()
+
+
+def reset_exchange() -> None:
+    """Remet à zéro les compteurs d'octets et de durées du thread courant."""
+    _exchange.request_bytes = 0
+    _exchange.response_bytes = 0
+    _exchange.timings = {"connect": 0.0, "send": 0.0, "receive": 0.0}
+
+
+def exchange_size() -> tuple[int, int]:
+    """Retourne les octets ``(envoyés, reçus)`` depuis ``reset_exchange``."""
+    return (
+        getattr(_exchange, "request_bytes", 0),
+        getattr(_exchange, "response_bytes", 0),
+    )
+
+
+def exchange_timings() -> dict[str, float]:
+    """Retourne les durées ``connect``/``send``/``receive`` (en secondes).
+
+    Pour JSON-RPC, ``connect`` n'est pas isolé : ``send`` couvre l'envoi et
+    l'attente des en-têtes de réponse, ``receive`` la lecture du corps.
+    """
+    return dict(
+        getattr(_exchange, "timings", {"connect": 0.0, "send": 0.0, "receive": 0.0})
+    )
+
+
+def _count_exchange(request_bytes: int = 0, response_bytes: int = 0) -> None:
+    _exchange.request_bytes = getattr(_exchange, "request_bytes", 0) + request_bytes
+    _exchange.response_bytes = (
+        getattr(_exchange, "response_bytes", 0) + response_bytes
+    )
+
+
+def _count_timing(phase: str, seconds: float) -> None:
+    if not hasattr(_exchange, "timings"):
+        _exchange.timings = {"connect": 0.0, "send": 0.0, "receive": 0.0}
+    _exchange.timings[phase] += seconds
+
+
+class _CountingResponse:
+    """Enveloppe une réponse HTTP en comptant les octets lus."""
+
+    def __init__(self, response) -> None:
+        self._response = response
+
+    def read(self, *args):
+        data = self._response.read(*args)
+        _count_exchange(response_bytes=len(data))
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+class _OdooTransportMixin:
+    """Transport XML-RPC avec délais et comptabilité des échanges.
+
+    Chaque requête est bornée par ``timeout`` et par l'échéance éventuelle de
+    ``odoo_deadline`` ; les octets réellement envoyés et reçus ainsi que les
+    durées de connexion, d'envoi et de réception sont comptabilisés pour le
+    thread courant.
+
+    Les réponses compressées (gzip) sont toujours acceptées. Les requêtes
+    plus grosses que ``gzip_threshold`` octets sont compressées ; si le
+    serveur les refuse, la compression est désactivée pour ce transport et la
+    requête est renvoyée en clair.
+
+    Avec ``fast_decoder``, les réponses sont décodées par
+    ``config.odoo_xmlrpc_decoder`` au fil de la lecture, par blocs de
+    ``_READ_SIZE`` octets.
+    """
+
+    _READ_SIZE = 65536
+
+    def __init__(
+        self,
+        *args,
+        timeout: float | None = None,
+        gzip_threshold: int | None = None,
+        fast_decoder: bool = False,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.timeout = timeout
+        self.encode_threshold = gzip_threshold
+        self.fast_decoder = fast_decoder
+        self._sent_at = None
+        self._gzipped = False
+
+    def request(self, host, handler, request_body, verbose=False):
+        self._gzipped = False
+        try:
+            return super().request(host, handler, request_body, verbose)
+        except xmlrpc.client.ProtocolError as err:
+            if not (self._gzipped and err.errcode in _GZIP_REFUSED_STATUS):
+                raise
+        except xmlrpc.client.Fault as fault:
+            if not (
+                self._gzipped
+                and any(m in fault.faultString for m in _GZIP_REFUSED_MARKERS)
+            ):
+                raise
+        logger.warning(
+            "Requêtes compressées refusées par %s, envoi sans compression.", host
+        )
+        self.encode_threshold = None
+        return super().request(host, handler, request_body, verbose)
+
+    def single_request(self, host, handler, request_body, verbose=False):
+        timeout, from_deadline = _call_timeout(self.timeout)
+        connection = self.make_connection(host)
+        connection.timeout = timeout
+        start = time.perf_counter()
+        try:
+            if connection.sock is None:
+                connection.connect()
+                _count_timing("connect", time.perf_counter() - start)
+            else:
+                connection.sock.settimeout(timeout)
+            self._sent_at = None
+            result = super().single_request(host, handler, request_body, verbose)
+        except TimeoutError as err:
+            self.close()
+            if from_deadline:
+                raise OdooDeadlineExceeded(
+                    "Échéance des appels Odoo dépassée."
+                ) from err
+            raise OdooTimeout(
+                f"Odoo n'a pas répondu en {timeout} s ({host}{handler})."
+            ) from err
+        except OSError:
+            self.close()
+            raise
+        if self._sent_at is not None:
+            _count_timing("receive", time.perf_counter() - self._sent_at)
+        return result
+
+    def send_request(self, host, handler, request_body, debug):
+        start = time.perf_counter()
+        connection = super().send_request(host, handler, request_body, debug)
+        self._sent_at = time.perf_counter()
+        _count_timing("send", self._sent_at - start)
+        return connection
+
+    def send_content(self, connection, request_body):
+        if (
+            self.encode_threshold is not None
+            and self.encode_threshold < len(request_body)
+        ):
+            connection.putheader("Content-Encoding", "gzip")
+            request_body = xmlrpc.client.gzip_encode(request_body)
+            self._gzipped = True
+        _count_exchange(request_bytes=len(request_body))
+        connection.putheader("Content-Length", str(len(request_body)))
+        connection.endheaders(request_body)
+
+    def getparser(self):
+        if not self.fast_decoder:
+            return super().getparser()
+        return odoo_xmlrpc_decoder.getparser(
+            use_datetime=self._use_datetime,
+            use_builtin_types=self._use_builtin_types,
+        )
+
+    def parse_response(self, response):
+        response = _CountingResponse(response)
+        if not self.fast_decoder:
+            return super().parse_response(response)
+        stream = response
+        if response.getheader("Content-Encoding", "") == "gzip":
+            stream = xmlrpc.client.GzipDecodedResponse(response)
+        parser, unmarshaller = self.getparser()
+        while True:
+            data = stream.read(self._READ_SIZE)
+            if not data:
+                break
+            parser.feed(data)
+        if stream is not response:
+            stream.close()
+        parser.close()
+        return unmarshaller.close()
+
+
+class OdooTransport(_OdooTransportMixin, xmlrpc.client.Transport):
+    """Transport XML-RPC (HTTP) utilisé pour Odoo."""
+
+
+class OdooSafeTransport(_OdooTransportMixin, xmlrpc.client.SafeTransport):
+    """Transport XML-RPC (HTTPS) utilisé pour Odoo."""
+
+
+def _fault_from_error(error: dict) -> xmlrpc.client.Fault:
+    """Convertit une erreur JSON-RPC d'Odoo en ``xmlrpc.client.Fault``.
+
+    Les appelants n'ont ainsi qu'un seul type d'erreur serveur à gérer, quel
+    que soit le protocole choisi.
+    """
+    data = error.get("data") or {}
+    message = data.get("message") or error.get("message") or "Odoo Server Error"
+    name = data.get("name")
+    if name:
+        message = f"{name}: {message}"
+    return xmlrpc.client.Fault(error.get("code", 1), message)
+
+
+class JsonRpcServerProxy:
+    """Équivalent de ``xmlrpc.client.ServerProxy`` pour ``/jsonrpc``.
+
+    ``service`` correspond au service Odoo ciblé (``common`` ou ``object``).
+    La session ``requests`` conserve la connexion HTTP ouverte entre deux
+    appels ; comme pour ``ServerProxy``, une instance ne doit pas être
+    partagée entre threads. La compression suit les mêmes règles que les
+    transports XML-RPC.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        service: str,
+        timeout: float | None = None,
+        gzip_threshold: int | None = None,
+    ) -> None:
+        self._endpoint = f"{url}/jsonrpc"
+        self._service = service
+        self._timeout = timeout
+        self._gzip_threshold = gzip_threshold
+        self._session = requests.Session()
+        self._ids = itertools.count(1)
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def _call(*args):
+            return self._request(method, args)
+
+        return _call
+
+    def _request(self, method: str, args: tuple):
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {
+                "service": self._service,
+                "method": method,
+                "args": list(args),
+            },
+            "id": next(self._ids),
+        }
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self._gzip_threshold is not None and len(body) > self._gzip_threshold:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        response, content = self._post(body, headers)
+        if (
+            "Content-Encoding" in headers
+            and response.status_code in _GZIP_REFUSED_STATUS
+        ):
+            logger.warning(
+                "Requêtes compressées refusées par %s, envoi sans compression.",
+                self._endpoint,
+            )
+            self._gzip_threshold = None
+            body = gzip.decompress(body)
+            del headers["Content-Encoding"]
+            response, content = self._post(body, headers)
+        response.raise_for_status()
+        # Taille sur le réseau : le corps reçu est déjà décompressé.
+        length = response.headers.get("Content-Length")
+        wire_length = int(length) if str(length).isdigit() else len(content)
+        _count_exchange(len(body), wire_length)
+        reply = response.json()
+        if reply.get("error"):
+            raise _fault_from_error(reply["error"])
+        return reply.get("result")
+
+    def _post(self, body: bytes, headers: dict):
+        timeout, from_deadline = _call_timeout(self._timeout)
+        start = time.perf_counter()
+        try:
+            response = self._session.post(
+                self._endpoint,
+                data=body,
+                headers=headers,
+                timeout=timeout,
+            )
+            headers_at = time.perf_counter()
+            content = response.content
+        except requests.Timeout as err:
+            if from_deadline:
+                raise OdooDeadlineExceeded(
+                    "Échéance des appels Odoo dépassée."
+                ) from err
+            raise OdooTimeout(
+                f"Odoo n'a pas répondu en {timeout} s ({self._endpoint})."
+            ) from err
+        _count_timing("send", headers_at - start)
+        _count_timing("receive", time.perf_counter() - headers_at)
+        return response, content
+
+
+def server_proxy(
+    url: str,
+    service: str,
+    protocol: str = "xmlrpc",
+    timeout: float | None = None,
+    gzip_threshold: int | None = None,
+    fast_decoder: bool = False,
+):
+    """Construit un proxy vers le service Odoo ``service`` selon ``protocol``.
+
+    ``timeout`` borne chaque requête (en secondes, ``None`` : pas de limite) ;
+    les requêtes dépassant ``gzip_threshold`` octets sont compressées.
+    ``fast_decoder`` active le décodeur XML-RPC rapide (sans effet en
+    JSON-RPC).
+    """
+    if protocol == "xmlrpc":
+        transport_class = (
+            OdooSafeTransport if url.startswith("https:") else OdooTransport
+        )
+        transport = transport_class(
+            timeout=timeout, gzip_threshold=gzip_threshold, fast_decoder=fast_decoder
+        )
+        return xmlrpc.client.ServerProxy(
+            f"{url}/xmlrpc/2/{service}", transport=transport, allow_none=True
+        )
+    if protocol == "jsonrpc":
+        return JsonRpcServerProxy(url, service, timeout, gzip_threshold)
+    raise ValueError(
+        f"Protocole Odoo inconnu : {protocol} (attendu : {', '.join(PROTOCOLS)})"
+    )
@@ -4,7 +4,9 @@ from services.openai_service import OpenAIService
 from services.telegram_service import TelegramService
 from services.facebook_service import FacebookService
 from services.odoo_email_service import OdooEmailService
+from services.odoo_event_service import OdooEventService
 from config.log_config import setup_logger, log_execution
+from config import ODOO_BUS
 
 from audio_post_workflow import run_workflow as run_audio_workflow
 from odoo_email_workflow import run_workflow as run_email_workflow
@@ -17,6 +19,11 @@ def main() -> None:
     openai_service = OpenAIService(logger)
     telegram_service = TelegramService(logger, openai_service)
     telegram_service.start()
+    # Réactions immédiates aux notifications du bus Odoo (ODOO_BUS=1).
+    event_service = None
+    if ODOO_BUS:
+        event_service = OdooEventService(logger, telegram_service)
+        event_service.start()
     timeout = 600
 
     try:
@@ -67,6 +74,8 @@ def main() -> None:
     except KeyboardInterrupt:
         logger.info("Arrêt manuel du programme")
     finally:
+        if event_service is not None:
+            event_service.stop()
         telegram_service.stop()
 
 
@@ -13,6 +13,11 @@ from config.log_config import setup_logger, log_execution
 from config import ODOO_MAILING_LIST_IDS
 
 
+# Durée maximale (secondes) accordée à Odoo pour programmer un email avant de
+# rendre la main à la conversation Telegram.
+SCHEDULE_DEADLINE = 120
+
+
 @log_execution
 def run_workflow(
     logger,
@@ -118,9 +123,10 @@ def run_workflow(
                         target_utc,
                         ODOO_MAILING_LIST_IDS,
                         already_html=True,
+                        deadline=SCHEDULE_DEADLINE,
                     )
                     telegram_service.send_message("Email programmé.")
-                except xmlrpc.client.Fault as err:
+                except (xmlrpc.client.Fault, TimeoutError) as err:
                     logger.exception(f"Erreur lors de la programmation : {err}")
                     telegram_service.send_message(
                         f"Erreur lors de la programmation : {err}"
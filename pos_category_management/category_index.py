@@ -0,0 +1,156 @@
+"""Cached name to ID index of the POS categories.
+
+Category rules are written with category names, which are stable across
+databases, while Odoo writes need IDs. ``CategoryIndex`` resolves names
+through an index persisted in ``ODOO_CACHE_DIR/pos_categories.json``: the
+full category list is only read again when a requested name is unknown, or
+after ``discard()`` dropped IDs that Odoo no longer knows (a category deleted
+or recreated). A name still unknown after a refresh, such as a rule naming a
+category that does not exist, is remembered for ``UNKNOWN_NAME_TTL`` seconds
+so that it does not trigger a full read on every run.
+"""
+
+import os
+import threading
+import time
+from typing import Callable
+
+from config.cache_store import get_store
+from config.log_config import setup_logger
+from config import ODOO_URL, ODOO_DB, ODOO_CACHE_DIR
+
+logger = setup_logger(__name__)
+
+# Delay before a name missing from Odoo triggers a new full read.
+UNKNOWN_NAME_TTL = 24 * 3600
+
+
+class CategoryIndex:
+    """Name to ID index of the POS categories of one database.
+
+    ``namespace`` identifies the database (URL and name) in the shared file;
+    without ``path`` the index only lives in memory. Names missing from Odoo
+    are not looked up again before ``unknown_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str | None,
+        namespace: str,
+        unknown_ttl: float = UNKNOWN_NAME_TTL,
+        clock=time.time,
+    ) -> None:
+        self.store = get_store(path) if path else None
+        self.namespace = namespace
+        self.unknown_ttl = unknown_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._ids: dict[str, int] | None = None
+        self._unknown: dict[str, float] | None = None
+
+    def _entries(self) -> dict[str, int]:
+        if self._ids is None:
+            data = self.store.get(self.namespace) if self.store else None
+            self._ids = dict(data or {})
+        return self._ids
+
+    def _unknown_names(self) -> dict[str, float]:
+        # ``{name: instant}`` of the names missing from the last refresh.
+        if self._unknown is None:
+            data = self.store.get(f"{self.namespace}|unknown") if self.store else None
+            self._unknown = dict(data or {})
+        return self._unknown
+
+    def _save_unknown(self) -> None:
+        if self.store is not None:
+            self.store.set(f"{self.namespace}|unknown", self._unknown)
+
+    def refresh(self, fetch: Callable[[], list[dict]]) -> None:
+        """Rebuild the index from ``fetch()``, a list of ``{"id", "name"}``.
+
+        When several categories share a name, the oldest one (lowest ID)
+        wins.
+        """
+        ids = {}
+        for category in sorted(fetch(), key=lambda category: category["id"]):
+            ids.setdefault(category["name"], category["id"])
+        with self._lock:
+            self._ids = ids
+            if self.store is not None:
+                self.store.set(self.namespace, ids)
+        logger.info("Index des catégories POS reconstruit : %d catégories.", len(ids))
+
+    def discard(self, category_ids) -> None:
+        """Drop the entries pointing to ``category_ids``.
+
+        Used when Odoo no longer returns these IDs: their names are then
+        resolved again from a fresh category list.
+        """
+        stale = set(category_ids)
+        with self._lock:
+            entries = self._entries()
+            names = [name for name, found in entries.items() if found in stale]
+            if not names:
+                return
+            for name in names:
+                del entries[name]
+            if self.store is not None:
+                self.store.set(self.namespace, entries)
+            # The category list changed: unknown names may exist now.
+            if self._unknown_names():
+                self._unknown = {}
+                self._save_unknown()
+        logger.info("Catégories POS %s absentes d'Odoo, index à reconstruire.", names)
+
+    def resolve(
+        self, names: list[str], fetch: Callable[[], list[dict]]
+    ) -> dict[str, int]:
+        """Return ``{name: id}`` for ``names``.
+
+        The index is refreshed with ``fetch()`` only when a name is missing;
+        names still unknown afterwards are logged once, left out and not
+        looked up again before ``unknown_ttl`` seconds.
+        """
+        now = self.clock()
+        with self._lock:
+            entries = self._entries()
+            unknown = self._unknown_names()
+            missing = [
+                name
+                for name in names
+                if name not in entries
+                and (name not in unknown or now - unknown[name] >= self.unknown_ttl)
+            ]
+        if missing:
+            self.refresh(fetch)
+            with self._lock:
+                entries = self._entries()
+                unknown = self._unknown_names()
+                for name in list(unknown):
+                    if name in entries:
+                        del unknown[name]
+                for name in missing:
+                    if name not in entries:
+                        unknown[name] = now
+                        logger.warning("Catégorie POS %s introuvable dans Odoo.", name)
+                self._save_unknown()
+        return {name: entries[name] for name in names if name in entries}
+
+
+_indexes: dict[str, CategoryIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_category_index(url: str | None = None, db: str | None = None) -> CategoryIndex:
+    """Return the shared category index for the ``url``/``db`` database."""
+    url = url or ODOO_URL or "https://example.com"
+    db = db or ODOO_DB or "db"
+    namespace = f"{url}|{db}"
+    with _indexes_lock:
+        index = _indexes.get(namespace)
+        if index is None:
+            index = CategoryIndex(
+                os.path.join(ODOO_CACHE_DIR, "pos_categories.json"), namespace
+            )
+            _indexes[namespace] = index
+        return index
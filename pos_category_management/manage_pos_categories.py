@@ -1,153 +1,449 @@
 from datetime import datetime
+from zoneinfo import ZoneInfo
 
+from config.odoo_batch import OdooBatch
 from config.odoo_connect import get_odoo_connection
+from config.odoo_metadata import get_metadata_cache
+from config.odoo_orm import OdooEnv
+from config.odoo_paging import iter_pages, iter_search_read
+from config.odoo_targets import OdooTarget, TargetResult, fan_out
+from config import ODOO_TARGETS_CONCURRENCY, POS_PRODUCT_CHUNK_SIZE, POS_TIMEZONE
 from config.log_config import setup_logger, log_execution
+from pos_category_management.category_index import get_category_index
 
 logger = setup_logger(__name__)
 
-# Category identifiers used for automatic activation/deactivation.
-# These values come from the Odoo database and therefore are integers
-# rather than category names.
-FRIDAY_CATEGORY_IDS = [79, 72, 53]
-SUNDAY_CATEGORY_IDS = [79, 72, 53, 58]
+# Categories managed automatically, by name. Names are resolved to Odoo IDs
+# through the cached category index of each database.
+FRIDAY_CATEGORIES = ["BUVETTE", "EPICERIE", "BUREAU"]
+SUNDAY_CATEGORIES = FRIDAY_CATEGORIES + ["FOURNIL"]
 
+# APIs toggling a category: ``available_in_pos`` on the category itself, or
+# the category list of each POS configuration on older servers.
+CATEGORY_API = "pos.category"
+CONFIG_API = "pos.config"
 
-def _ensure_category_active(models, db, uid, password, category_id):
-    """Ensure the given category is available in the POS."""
-    try:
-        models.execute_kw(
-            db,
-            uid,
-            password,
-            "pos.category",
-            "write",
-            [[category_id], {"available_in_pos": True}],
-        )
-    except Exception:
-        # Fallback for older versions where categories are controlled
-        # through the POS configuration record.
-        config_ids = models.execute_kw(
-            db, uid, password, "pos.config", "search", [[]], {"limit": 1}
+
+def _connection_url(models) -> str | None:
+    # Connection managers expose their URL, which keeps the cache entries of
+    # several databases apart.
+    url = getattr(models, "url", None)
+    return url if isinstance(url, str) else None
+
+
+def _server_capability(env, name: str, detect):
+    """Return ``detect(fields_get)``, memoized per server version.
+
+    ``fields_get(model)`` returns the field types of ``model`` through the
+    metadata cache of the database. An Odoo upgrade changes the cache keys
+    and therefore triggers a new detection.
+    """
+    url = _connection_url(env.models)
+    version = ""
+    if url is not None:
+        server_version = env.models.server_version()
+        if isinstance(server_version, dict):
+            version = server_version.get("server_version", "")
+    metadata = get_metadata_cache(url=url, db=env.db)
+
+    def fields_get(model):
+        return metadata.fields_get(
+            env.models, env.db, env.uid, env.password, model, server_version=version
         )
-        if config_ids:
-            models.execute_kw(
-                db,
-                uid,
-                password,
-                "pos.config",
-                "write",
-                [[config_ids[0]], {"iface_available_categ_ids": [(4, category_id)]}],
+
+    def detect_and_log():
+        value = detect(fields_get)
+        logger.info("%s (Odoo %s) : %s", name, version or "?", value)
+        return value
+
+    return metadata.capability(f"{name}@{version}", detect_and_log)
+
+
+def _category_api(env) -> str:
+    """Return the API this server uses to toggle POS categories."""
+
+    def detect(fields_get):
+        fields = fields_get("pos.category")
+        return CATEGORY_API if "available_in_pos" in fields else CONFIG_API
+
+    return _server_capability(env, "pos_category_api", detect)
+
+
+def product_category_field(env) -> str:
+    """Return the ``product.template`` field linking products to POS categories.
+
+    ``pos_categ_ids`` (many2many) since Odoo 17, ``pos_categ_id`` before.
+    """
+
+    def detect(fields_get):
+        fields = fields_get("product.template")
+        return "pos_categ_ids" if "pos_categ_ids" in fields else "pos_categ_id"
+
+    return _server_capability(env, "pos_product_category_field", detect)
+
+
+def _update_pos_config_category(
+    env, commands, max_workers: int = 4, config_ids: list[int] | None = None
+):
+    """Apply category commands on every POS configuration record.
+
+    Fallback for older versions where categories are controlled through the
+    POS configuration records. ``commands`` is a list of x2many commands
+    such as ``(4, category_id)`` or ``(3, category_id)``. Each register gets
+    all commands in a single write; registers are written concurrently and a
+    failure on one of them does not prevent the others from being updated.
+    Returns the IDs of the configurations updated. ``config_ids`` spares the
+    search when the caller already knows the registers.
+    """
+    if config_ids is None:
+        config_ids = env["pos.config"].search([]).ids
+    if not config_ids:
+        return []
+    batch = OdooBatch(
+        env.db,
+        env.uid,
+        env.password,
+        env.models,
+        max_workers=max_workers,
+        label="Catégories des points de vente",
+    )
+    vals = {"iface_available_categ_ids": list(commands)}
+    writes = [
+        (config_id, batch.call("pos.config", "write", [[config_id], vals]))
+        for config_id in config_ids
+    ]
+    batch.flush()
+
+    updated = []
+    for config_id, written in writes:
+        if written.exception() is not None:
+            logger.error(
+                "Point de vente %s non mis à jour : %s", config_id, written.exception()
             )
+        else:
+            updated.append(config_id)
+    if not updated:
+        raise RuntimeError("Aucun point de vente n'a pu être mis à jour.")
+    return updated
+
 
 @log_execution
 def fetch_all_categories(models, db, uid, password):
     """Return all POS categories with their IDs."""
-    return models.execute_kw(
-        db,
-        uid,
-        password,
-        'pos.category',
-        'search_read',
-        [[], ['id', 'name']],
+    return list(
+        iter_search_read(
+            models, db, uid, password, "pos.category", fields=["id", "name"]
+        )
     )
-  
-def _deactivate_category(models, db, uid, password, category_id):
-    """Make the given category unavailable in the POS."""
-    try:
-        models.execute_kw(
-            db,
-            uid,
-            password,
-            "pos.category",
-            "write",
-            [[category_id], {"available_in_pos": False}],
+
+
+def _set_products_available(
+    env,
+    category_ids,
+    available: bool,
+    keep_category_ids=(),
+    chunk_size: int = POS_PRODUCT_CHUNK_SIZE,
+) -> int:
+    """Set ``available_in_pos`` on the products of ``category_ids``.
+
+    Only products whose flag differs are fetched, page by page with an ID
+    cursor, and each page is written in one bulk ``write`` while the next
+    page is being read. Products also belonging to ``keep_category_ids``
+    are left untouched. Returns the number of products updated.
+    """
+    if not category_ids:
+        return 0
+    field = product_category_field(env)
+    domain = [
+        (field, "in", list(category_ids)),
+        ("available_in_pos", "!=", available),
+    ]
+    if keep_category_ids:
+        domain.append((field, "not in", list(keep_category_ids)))
+    updated = 0
+    for page in iter_pages(
+        env.models,
+        env.db,
+        env.uid,
+        env.password,
+        "product.template",
+        domain,
+        ["id"],
+        page_size=chunk_size,
+    ):
+        product_ids = [row["id"] for row in page]
+        env.execute(
+            "product.template", "write", [product_ids, {"available_in_pos": available}]
         )
-    except Exception:
-        config_ids = models.execute_kw(
-            db, uid, password, "pos.config", "search", [[]], {"limit": 1}
+        updated += len(product_ids)
+    return updated
+
+
+def _read_category_state(env, category_ids):
+    """Return ``{id: (name, available_in_pos)}`` for ``category_ids``.
+
+    One ``search_read`` covers all categories. Returns ``None`` when the
+    server cannot report ``available_in_pos``.
+    """
+    try:
+        categories = env["pos.category"].search(
+            [("id", "in", list(category_ids))], fields=["name", "available_in_pos"]
         )
-        if config_ids:
-            models.execute_kw(
-                db,
-                uid,
-                password,
-                "pos.config",
-                "write",
-                [[config_ids[0]], {"iface_available_categ_ids": [(3, category_id)]}],
-            )
+    except Exception as err:
+        logger.warning("État des catégories POS illisible : %s", err)
+        return None
+    return {
+        category.id: (category.name, category.available_in_pos)
+        for category in categories
+    }
+
+
+def _read_config_state(env, category_ids):
+    """Return ``(config_ids, {id: ("", available)})`` from the POS configurations.
+
+    A category is available when every register offers it, unavailable when
+    none does, and ``None`` (unknown) otherwise. One ``search_read`` covers
+    all registers; categories that no longer exist in Odoo are left out,
+    since registers may still list their IDs.
+    """
+    configs = env["pos.config"].search([], fields=["iface_available_categ_ids"])
+    offered = [set(config.iface_available_categ_ids or []) for config in configs]
+    existing = set(
+        env["pos.category"].search([("id", "in", list(category_ids))]).ids
+    )
+    state = {}
+    for category_id in category_ids:
+        if category_id not in existing:
+            continue
+        count = sum(category_id in categ_ids for categ_ids in offered)
+        available = None if 0 < count < len(offered) else count > 0
+        state[category_id] = ("", available)
+    return configs.ids, state
 
 
 @log_execution
 def compute_category_actions(
     current_dt: datetime,
-) -> tuple[list[int], list[int]]:
-    """Return category IDs to activate and deactivate for given datetime."""
+) -> tuple[list[str], list[str]]:
+    """Return category names to activate and deactivate for given datetime."""
     weekday = current_dt.weekday()
     hour = current_dt.hour
 
     if weekday == 4 and hour >= 6:  # Friday from 6 AM
-        # Activate Friday categories and deactivate the Sunday-only one.
-        return FRIDAY_CATEGORY_IDS.copy(), [58]
+        # Activate Friday categories and deactivate the Sunday-only ones.
+        return FRIDAY_CATEGORIES.copy(), [
+            name for name in SUNDAY_CATEGORIES if name not in FRIDAY_CATEGORIES
+        ]
     if weekday == 6 and hour >= 6:  # Sunday from 6 AM
-        return SUNDAY_CATEGORY_IDS.copy(), []
+        return SUNDAY_CATEGORIES.copy(), []
     # Other days: no category activated, deactivate all
-    return [], SUNDAY_CATEGORY_IDS.copy()
+    return [], SUNDAY_CATEGORIES.copy()
 
 
-@log_execution
-def update_pos_categories(current_dt: datetime | None = None):
-    """Update POS categories according to the current day and time."""
-    if current_dt is None:
-        current_dt = datetime.now()
-    db, uid, password, models = get_odoo_connection()
+def resolve_category_ids(models, db, uid, password, names: list[str]) -> dict[str, int]:
+    """Return ``{name: id}`` for the POS categories called ``names``.
 
-    try:
-        categories = fetch_all_categories(models, db, uid, password)
-        logger.info("Catégories POS existantes : %s", categories)
-    except Exception as err:
-        logger.exception("Impossible de récupérer les catégories POS : %s", err)
+    Served by the persisted category index; all categories are only read
+    again when one of ``names`` is not indexed yet.
+    """
+    index = get_category_index(url=_connection_url(models), db=db)
+    return index.resolve(
+        names, lambda: fetch_all_categories(models, db, uid, password)
+    )
 
-    to_activate, to_deactivate = compute_category_actions(current_dt)
 
-    for category_id in to_activate:
+def _write_category_changes(env, api, activate, deactivate, names, config_ids=None):
+    """Write ``available_in_pos`` on the categories to (de)activate.
+
+    ``names`` maps each category ID to its rule name, for the logs. Returns ``{"activated": [...], "deactivated": [...]}`` with the category
+    IDs actually written.
+    """
+    changes = [
+        (key, category_ids, available)
+        for key, category_ids, available in (
+            ("activated", activate, True),
+            ("deactivated", deactivate, False),
+        )
+        if category_ids
+    ]
+    if api == CONFIG_API:
+        writes = [(*change, None) for change in changes]
+        refused = writes
+    else:
+        # One bulk write per target value, both sent together.
+        categories = env["pos.category"]
+        writes = [
+            (key, category_ids, available, categories.browse(category_ids).write(
+                {"available_in_pos": available}
+            ))
+            for key, category_ids, available in changes
+        ]
+        env.flush(raise_on_error=False)
+        refused = [entry for entry in writes if entry[3].exception() is not None]
+
+    # Servers without ``available_in_pos`` and refused writes go through the
+    # POS configurations, with all commands sent in a single write per
+    # register.
+    fallback_error = None
+    if refused:
+        commands = [
+            (4 if available else 3, category_id)
+            for _, category_ids, available, _ in refused
+            for category_id in category_ids
+        ]
         try:
-            name = ""
-            _ensure_category_active(models, db, uid, password, category_id)
-            if category_id == 79:
-                name = "BUVETTE"
-            elif category_id == 72:
-                name = "EPICERIE"
-            elif category_id == 53:
-                name = "MEMBRES"
-            elif category_id == 58:
-                name = "FOURNIL"
-            logger.info("Catégorie POS activée : %s", f"{category_id} {name}")
+            _update_pos_config_category(env, commands, config_ids=config_ids)
         except Exception as err:
+            fallback_error = err
             logger.exception(
-                "Erreur lors de l'activation de la catégorie %s : %s",
-                category_id,
+                "Erreur lors de la mise à jour des catégories %s : %s",
+                [category_id for _, category_id in commands],
                 err,
             )
 
-    for category_id in to_deactivate:
+    done = {"activated": [], "deactivated": []}
+    for key, category_ids, available, written in writes:
+        if fallback_error is not None and (
+            written is None or written.exception() is not None
+        ):
+            continue
+        done[key] = category_ids
+        for category_id in category_ids:
+            logger.info(
+                "Catégorie POS %s : %s (%s)",
+                "activée" if available else "désactivée",
+                names[category_id],
+                category_id,
+            )
+    return done
+
+
+@log_execution
+def update_pos_categories(
+    current_dt: datetime | None = None,
+    connection: tuple | None = None,
+    reconcile_products: bool = False,
+) -> dict[str, list[int]]:
+    """Update POS categories according to the current day and time.
+
+    ``current_dt`` defaults to the current time in ``POS_TIMEZONE``.
+    ``connection`` is a ``(db, uid, password, models)`` tuple; the shared
+    ``get_odoo_connection()`` session is used by default. The products of
+    the categories changed get the same ``available_in_pos`` flag; with
+    ``reconcile_products``, the products of every managed category are
+    checked, even when no category changed. Returns the category IDs
+    actually activated and deactivated.
+    """
+    if current_dt is None:
+        current_dt = datetime.now(ZoneInfo(POS_TIMEZONE))
+    db, uid, password, models = connection or get_odoo_connection()
+    env = OdooEnv(db, uid, password, models, label="Mise à jour des catégories POS")
+
+    add_names, remove_names = compute_category_actions(current_dt)
+    names = list(dict.fromkeys(add_names + remove_names))
+    api = _category_api(env)
+    for attempt in range(2):
+        category_ids = resolve_category_ids(models, db, uid, password, names)
+        to_activate = [category_ids[name] for name in add_names if name in category_ids]
+        to_deactivate = [
+            category_ids[name] for name in remove_names if name in category_ids
+        ]
+        managed = list(dict.fromkeys(to_activate + to_deactivate))
+        config_ids = None
+        if api == CONFIG_API:
+            config_ids, state = _read_config_state(env, managed)
+        else:
+            state = _read_category_state(env, managed)
+        if state is None:
+            # Unknown current state: apply every rule.
+            state = {category_id: ("", None) for category_id in managed}
+        missing = [category_id for category_id in managed if category_id not in state]
+        if not missing or attempt:
+            break
+        # Categories deleted or recreated in Odoo: their indexed IDs are
+        # stale, so the names are resolved once more from a fresh list.
+        get_category_index(url=_connection_url(models), db=db).discard(missing)
+    rule_names = {category_id: name for name, category_id in category_ids.items()}
+    for category_id in missing:
+        logger.warning(
+            "Catégorie POS %s (%s) introuvable dans Odoo.",
+            rule_names[category_id],
+            category_id,
+        )
+
+    activate = [i for i in to_activate if i in state and state[i][1] is not True]
+    deactivate = [i for i in to_deactivate if i in state and state[i][1] is not False]
+    if activate or deactivate:
+        done = _write_category_changes(
+            env, api, activate, deactivate, rule_names, config_ids=config_ids
+        )
+    else:
+        logger.info("Catégories POS déjà à jour, aucune écriture.")
+        done = {"activated": [], "deactivated": []}
+
+    # Products follow the categories switched by this run, so that products
+    # hidden on purpose inside an active category stay hidden; a product
+    # shared with a category that stays active remains available. The full
+    # pass also covers categories already up to date, except those whose
+    # write failed.
+    reconcile = done
+    if reconcile_products:
+        reconcile = {
+            "activated": [
+                i for i in to_activate
+                if i in state and (i not in activate or i in done["activated"])
+            ],
+            "deactivated": [
+                i for i in to_deactivate
+                if i in state and (i not in deactivate or i in done["deactivated"])
+            ],
+        }
+    for key, available in (("activated", True), ("deactivated", False)):
         try:
-            name = ""
-            _deactivate_category(models, db, uid, password, category_id)
-            if category_id == 79:
-                name = "BUVETTE"
-            elif category_id == 72:
-                name = "EPICERIE"
-            elif category_id == 53:
-                name = "MEMBRES"
-            elif category_id == 58:
-                name = "FOURNIL"
-            logger.info("Catégorie POS désactivée : %s", f"{category_id} {name}")
+            count = _set_products_available(
+                env,
+                reconcile[key],
+                available,
+                keep_category_ids=[] if available else to_activate,
+            )
         except Exception as err:
             logger.exception(
-                "Erreur lors de la désactivation de la catégorie %s : %s",
-                category_id,
+                "Erreur lors de la mise à jour des produits des catégories %s : %s",
+                reconcile[key],
                 err,
             )
+            continue
+        if count:
+            logger.info(
+                "%d produit(s) POS %s.", count, "activé(s)" if available else "désactivé(s)"
+            )
+    return done
+
+
+@log_execution
+def update_pos_categories_on_targets(
+    current_dt: datetime | None = None,
+    targets: list[OdooTarget] | None = None,
+    max_workers: int = ODOO_TARGETS_CONCURRENCY,
+    deadline: float | None = None,
+    reconcile_products: bool = False,
+) -> list[TargetResult]:
+    """Update POS categories on every configured Odoo database concurrently.
+
+    All targets are evaluated against the same ``current_dt``. Returns one
+    ``TargetResult`` per target, in order, with its timing and outcome.
+    """
+    if current_dt is None:
+        current_dt = datetime.now(ZoneInfo(POS_TIMEZONE))
+    return fan_out(
+        lambda target: update_pos_categories(
+            current_dt, target.connect(), reconcile_products=reconcile_products
+        ),
+        targets,
+        max_workers=max_workers,
+        deadline=deadline,
+        label="Mise à jour des catégories POS multi-bases",
+    )
 
 
 if __name__ == "__main__":
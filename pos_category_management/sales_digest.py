@@ -0,0 +1,166 @@
+"""Daily POS sales digest per category, sent through Telegram.
+
+Sales are aggregated by Odoo itself: one ``read_group`` on ``pos.order.line``
+returns the quantity and amount sold per product for the day, and only those
+grouped rows travel over the network. Products are then mapped to their POS
+category with a single ``read``.
+
+Totals of a closed day never change, so they are kept in
+``ODOO_CACHE_DIR/sales_digest.json`` and a later digest for the same day does
+not query Odoo again. The current day is always read from Odoo.
+"""
+
+import argparse
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from config.cache_store import JsonFileStore, get_store
+from config.odoo_connect import get_odoo_connection
+from config.odoo_orm import OdooEnv
+from config import ODOO_CACHE_DIR, ODOO_DB, ODOO_URL, POS_TIMEZONE
+from config.log_config import setup_logger, log_execution
+from pos_category_management.manage_pos_categories import product_category_field
+from services.telegram_service import TelegramService
+
+logger = setup_logger(__name__)
+
+# Orders counted in the digest (cancelled and draft orders are left out).
+SOLD_STATES = ["paid", "done", "invoiced"]
+UNCATEGORIZED = "Sans catégorie"
+
+
+def _utc(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _category_ids(value) -> list[int]:
+    # ``pos_categ_ids`` is a list of IDs, ``pos_categ_id`` a ``[id, name]``
+    # pair or ``False``.
+    if not value:
+        return []
+    if len(value) == 2 and isinstance(value[1], str):
+        return [value[0]]
+    return list(value)
+
+
+def _read_sales(env: OdooEnv, start: datetime, end: datetime) -> dict[str, dict]:
+    rows = env.execute(
+        "pos.order.line",
+        "read_group",
+        [
+            [
+                ("order_id.date_order", ">=", _utc(start)),
+                ("order_id.date_order", "<", _utc(end)),
+                ("order_id.state", "in", SOLD_STATES),
+            ],
+            ["qty:sum", "price_subtotal_incl:sum"],
+            ["product_id"],
+        ],
+        {"lazy": False},
+    )
+    product_ids = [row["product_id"][0] for row in rows if row.get("product_id")]
+    field = product_category_field(env)
+    products = env["product.product"].browse(product_ids)
+    categories_by_product = {
+        product.id: _category_ids(getattr(product, field)) for product in products
+    }
+    category_ids = sorted({ids[0] for ids in categories_by_product.values() if ids})
+    names = dict(
+        zip(category_ids, env["pos.category"].browse(category_ids).mapped("name"))
+    )
+
+    totals: dict[str, dict] = {}
+    for row in rows:
+        product = row.get("product_id")
+        # A product listed in several categories counts in the first one.
+        categ_ids = categories_by_product.get(product[0], []) if product else []
+        name = names.get(categ_ids[0], UNCATEGORIZED) if categ_ids else UNCATEGORIZED
+        entry = totals.setdefault(name, {"qty": 0.0, "amount": 0.0})
+        entry["qty"] += row.get("qty") or 0.0
+        entry["amount"] += row.get("price_subtotal_incl") or 0.0
+    return totals
+
+
+@log_execution
+def daily_category_sales(
+    day: date | None = None,
+    connection: tuple | None = None,
+    store: JsonFileStore | None = None,
+    now: datetime | None = None,
+) -> dict[str, dict]:
+    """Return ``{category: {"qty", "amount"}}`` for the POS sales of ``day``.
+
+    ``day`` is a date in ``POS_TIMEZONE`` (today by default). Totals of a day
+    already over are served from ``store`` (``ODOO_CACHE_DIR/sales_digest.json``
+    by default) once computed.
+    """
+    tz = ZoneInfo(POS_TIMEZONE)
+    now = now or datetime.now(tz)
+    day = day or now.astimezone(tz).date()
+    start = datetime.combine(day, time(), tzinfo=tz)
+    end = datetime.combine(day + timedelta(days=1), time(), tzinfo=tz)
+    closed = end <= now
+
+    db, uid, password, models = connection or get_odoo_connection()
+    url = getattr(models, "url", None)
+    key = f"{url if isinstance(url, str) else ODOO_URL}|{db or ODOO_DB}|{day.isoformat()}"
+    if store is None:
+        store = get_store(os.path.join(ODOO_CACHE_DIR, "sales_digest.json"))
+    if closed:
+        cached = store.get(key)
+        if cached is not None:
+            return cached
+
+    totals = _read_sales(OdooEnv(db, uid, password, models), start, end)
+    if closed:
+        store.set(key, totals)
+    return totals
+
+
+def format_digest(day: date, totals: dict[str, dict]) -> str:
+    """Return the digest text, categories sorted by decreasing amount."""
+    if not totals:
+        return f"Ventes POS du {day:%d/%m/%Y} : aucune vente."
+    lines = [f"Ventes POS du {day:%d/%m/%Y} :"]
+    for name, entry in sorted(totals.items(), key=lambda item: -item[1]["amount"]):
+        qty = entry["qty"]
+        lines.append(
+            f"- {name} : {entry['amount']:.2f} € ({qty:g} article{'s' if qty > 1 else ''})"
+        )
+    total = sum(entry["amount"] for entry in totals.values())
+    lines.append(f"Total : {total:.2f} €")
+    return "\n".join(lines)
+
+
+@log_execution
+def send_sales_digest(
+    telegram, day: date | None = None, connection: tuple | None = None
+) -> str:
+    """Send the sales digest of ``day`` with ``telegram.send_message``."""
+    day = day or datetime.now(ZoneInfo(POS_TIMEZONE)).date()
+    text = format_digest(day, daily_category_sales(day, connection))
+    telegram.send_message(text)
+    return text
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Send the POS sales digest of a day through the Telegram bot."""
+    parser = argparse.ArgumentParser(description="Send the POS sales digest.")
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        help="Day to report, as YYYY-MM-DD (defaults to today).",
+    )
+    args = parser.parse_args(argv)
+
+    telegram = TelegramService(logger)
+    telegram.start()
+    try:
+        send_sales_digest(telegram, args.date)
+    finally:
+        telegram.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Resident POS category scheduler.
+
+Instead of an external scheduler starting ``update_categories.py`` (Python
+startup, imports and Odoo authentication on every run), ``run_scheduler``
+stays resident: it precomputes the instants at which
+``compute_category_actions()`` changes, sleeps until the next one and applies
+the update over the already-open Odoo connection.
+
+Rules are evaluated in ``POS_TIMEZONE`` (``Europe/Paris`` by default) so that
+"Friday from 6 AM" means the shop's local time whatever the host timezone.
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+from zoneinfo import ZoneInfo
+
+from config.log_config import setup_logger
+from config import POS_TIMEZONE
+from pos_category_management.manage_pos_categories import (
+    compute_category_actions,
+    update_pos_categories,
+)
+
+logger = setup_logger(__name__)
+
+# Rules only depend on the weekday and the hour: scanning hour starts over a
+# week finds every transition.
+HORIZON = timedelta(days=7)
+# Delay before retrying a transition whose update failed.
+RETRY_DELAY = timedelta(minutes=5)
+
+
+def _actions(current_dt: datetime) -> tuple[frozenset, frozenset]:
+    # The undecorated rule avoids one log line per scanned hour.
+    add, remove = compute_category_actions.__wrapped__(current_dt)
+    return frozenset(add), frozenset(remove)
+
+
+def transition_timeline(
+    start: datetime, tz: ZoneInfo | None = None, horizon: timedelta = HORIZON
+) -> list[tuple[datetime, list[str], list[str]]]:
+    """Return the rule changes strictly after ``start`` within ``horizon``.
+
+    Each entry is ``(instant, to_activate, to_deactivate)`` with ``instant``
+    expressed in ``tz`` (``POS_TIMEZONE`` by default). Hours are walked in
+    UTC so that daylight saving changes neither skip nor repeat an hour.
+    """
+    tz = tz or ZoneInfo(POS_TIMEZONE)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=tz)
+    utc_hour = start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    current = _actions(start.astimezone(tz))
+    timeline = []
+    end = start + horizon
+    instant = utc_hour + timedelta(hours=1)
+    while instant <= end:
+        local = instant.astimezone(tz)
+        actions = _actions(local)
+        if actions != current:
+            add, remove = compute_category_actions.__wrapped__(local)
+            timeline.append((local, add, remove))
+            current = actions
+        instant += timedelta(hours=1)
+    return timeline
+
+
+def run_scheduler(
+    apply: Callable[[datetime], object] = update_pos_categories,
+    tz: ZoneInfo | None = None,
+    stop: threading.Event | None = None,
+    now: Callable[[ZoneInfo], datetime] = datetime.now,
+) -> None:
+    """Keep POS categories in sync until ``stop`` is set.
+
+    The current state is reconciled at startup, then ``apply(instant)`` runs
+    at each transition of the timeline. A failed update is retried after
+    ``RETRY_DELAY``.
+    """
+    tz = tz or ZoneInfo(POS_TIMEZONE)
+    stop = stop or threading.Event()
+    pending = now(tz)
+    while not stop.is_set():
+        try:
+            apply(pending)
+        except Exception as err:
+            logger.exception("Échec de la mise à jour des catégories POS : %s", err)
+            stop.wait(RETRY_DELAY.total_seconds())
+            pending = now(tz)
+            continue
+
+        timeline = transition_timeline(pending, tz)
+        if not timeline:
+            logger.warning("Aucune transition POS prévue dans les %s à venir.", HORIZON)
+            stop.wait(HORIZON.total_seconds())
+            pending = now(tz)
+            continue
+        pending = timeline[0][0]
+        delay = (pending - now(tz)).total_seconds()
+        logger.info(
+            "Prochaine transition POS le %s (dans %.0f s).",
+            pending.isoformat(),
+            max(0.0, delay),
+        )
+        if delay > 0:
+            stop.wait(delay)
@@ -1,11 +1,90 @@
 """Trigger manual POS category update."""
 
-from pos_category_management.manage_pos_categories import update_pos_categories
+import argparse
+import signal
+import threading
 
+from pos_category_management.manage_pos_categories import (
+    update_pos_categories,
+    update_pos_categories_on_targets,
+)
+from pos_category_management.scheduler import run_scheduler
+from config.odoo_bus import OdooBusListener
+from config.odoo_targets import load_targets
+from config import ODOO_TARGETS
 
-def main() -> None:
-    """Run the category update process."""
-    update_pos_categories()
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the category update process.
+
+    With ``ODOO_TARGETS`` (or ``--targets``), every listed Odoo database is
+    updated concurrently; otherwise the single configured database is. With
+    ``--daemon``, the process stays resident and applies each transition
+    when it is due; ``--listen`` additionally re-applies the rules as soon as
+    Odoo's bus reports a manual category edit. ``--reconcile-products``
+    also checks the products of categories already up to date, for an
+    occasional full pass.
+    """
+    parser = argparse.ArgumentParser(description="Update POS categories.")
+    parser.add_argument(
+        "--targets",
+        help="Comma-separated target names (defaults to ODOO_TARGETS).",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Stay resident and apply each Friday/Sunday transition when due.",
+    )
+    parser.add_argument(
+        "--listen",
+        action="store_true",
+        help="With --daemon, also re-sync on pos.category/write bus notifications.",
+    )
+    parser.add_argument(
+        "--reconcile-products",
+        action="store_true",
+        help="Also reset the products of categories already up to date.",
+    )
+    args = parser.parse_args(argv)
+
+    names = (
+        [name.strip() for name in args.targets.split(",") if name.strip()]
+        if args.targets
+        else ODOO_TARGETS
+    )
+    if names:
+        targets = load_targets(names)
+
+        def apply(current_dt=None):
+            return update_pos_categories_on_targets(
+                current_dt, targets, reconcile_products=args.reconcile_products
+            )
+
+    else:
+
+        def apply(current_dt=None):
+            return update_pos_categories(
+                current_dt, reconcile_products=args.reconcile_products
+            )
+
+    if not args.daemon:
+        apply()
+        return
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    listener = None
+    if args.listen:
+        listener = OdooBusListener()
+        listener.on("pos.category/write", lambda payloads: apply())
+        listener.start()
+    try:
+        run_scheduler(apply, stop=stop)
+    except KeyboardInterrupt:
+        stop.set()
+    finally:
+        if listener is not None:
+            listener.stop(timeout=1)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Optional, Tuple
 from zoneinfo import ZoneInfo
 import xmlrpc.client
@@ -6,7 +7,11 @@ import re
 
 from config.log_config import log_execution
 from config.odoo_connect import get_odoo_connection
-from config import ODOO_MAILING_LIST_IDS, ODOO_EMAIL_FROM
+from config.odoo_metadata import get_metadata_cache
+from config.odoo_orm import OdooEnv
+from config.odoo_transport import odoo_deadline
+from config.odoo_targets import OdooTarget, TargetResult, fan_out
+from config import ODOO_MAILING_LIST_IDS, ODOO_EMAIL_FROM, ODOO_TARGETS_CONCURRENCY
 
 
 # Links par défaut pour les emails marketing.
@@ -17,58 +22,113 @@ DEFAULT_LINKS: List[Tuple[str, str]] = [
 ]
 
 
+UNSUBSCRIBE_HTML = (
+    '<p><a href="/unsubscribe_from_list" style="color:#1a0dab;">Se désabonner</a></p>'
+)
+
+# Motifs compilés une fois : détection d'un corps HTML, schéma d'URL et
+# balise fermante principale. ``</div>`` final ne peut être trouvé qu'en fin
+# de document, si bien que la première correspondance est ``</body>`` dès
+# qu'il existe : une seule recherche suffit.
+_TAG_RE = re.compile(r"<[^>]+>")
+_SCHEME_RE = re.compile(r"^https?://")
+_CLOSING_RE = re.compile(r"</body>|</div>\s*$", re.IGNORECASE)
+
+
+def _ensure_scheme(url: str) -> str:
+    return url if _SCHEME_RE.match(url) else f"https://{url}"
+
+
+def _links_key(links) -> tuple:
+    # Clé hashable pour les caches : les paires peuvent arriver en listes.
+    return tuple((name, url) for name, url in links)
+
+
+@lru_cache(maxsize=256)
+def _normalize_links(links: tuple) -> tuple:
+    """Nettoie les URLs et noms de ``links`` et supprime les doublons."""
+    seen = set()
+    result = []
+    for name, url in links:
+        clean_name = name.strip()
+        norm_url = _ensure_scheme(url.strip())
+        if norm_url and norm_url not in seen:
+            result.append((clean_name, norm_url))
+            seen.add(norm_url)
+    return tuple(result)
+
+
+@lru_cache(maxsize=256)
+def _render_links(links: tuple, tail: str = "") -> str:
+    """Section HTML des liens ``links`` déjà normalisés, suivie de ``tail``.
+
+    Sans lien, seul ``tail`` est retourné.
+    """
+    if not links:
+        return tail
+    items = "".join(
+        f'<p>{name} : <a href="{url}" style="color:#1a0dab;">{url}</a></p>'
+        for name, url in links
+    )
+    return f"<div><p>Liens utiles :</p>{items}{tail}</div>"
+
+
+def _insert_before_closing(html: str, addition: str, fallback: str) -> str:
+    """Insère ``addition`` avant ``</body>`` ou le ``</div>`` final.
+
+    Sans balise fermante, ``fallback`` est ajouté à la fin de ``html``.
+    """
+    match = _CLOSING_RE.search(html)
+    if match is None:
+        return html + fallback
+    if match.group(0).lower() == "</body>":
+        return f"{html[:match.start()]}{addition}{html[match.start():]}"
+    # Comme auparavant, les blancs après le ``</div>`` final disparaissent.
+    return f"{html[:match.start()]}{addition}</div>"
+
+
 class OdooEmailService:
     """Service pour créer et planifier des emails marketing via Odoo."""
 
     @log_execution
-    def __init__(self, logger) -> None:
+    def __init__(self, logger, connection: Optional[tuple] = None) -> None:
+        """Initialise le service.
+
+        ``connection`` est un tuple ``(db, uid, password, models)`` déjà
+        ouvert ; par défaut, la connexion partagée ``get_odoo_connection()``
+        est utilisée.
+        """
         self.logger = logger
-        self.db, self.uid, self.password, self.models = get_odoo_connection()
+        self.db, self.uid, self.password, self.models = (
+            connection or get_odoo_connection()
+        )
         if not ODOO_EMAIL_FROM:
             raise RuntimeError("ODOO_EMAIL_FROM is not configured")
         self.email_from = ODOO_EMAIL_FROM
-        # Retrieve model id for mailing.list once
-        model_ids = self.models.execute_kw(
-            self.db,
-            self.uid,
-            self.password,
-            "ir.model",
-            "search",
-            [[("model", "=", "mailing.list")]],
-            {"limit": 1},
-        )
-        self.mailing_model_id = model_ids[0] if model_ids else None
+        # The mailing.list model id never changes: it is served by the
+        # metadata cache instead of an ir.model search per instantiation.
+        # Connection managers expose their URL, which keeps the cache entries
+        # of several databases apart.
+        url = getattr(self.models, "url", None)
+        self.mailing_model_id = get_metadata_cache(
+            url=url if isinstance(url, str) else None, db=self.db
+        ).model_id(self.models, self.db, self.uid, self.password, "mailing.list")
 
     def _ensure_scheme(self, url: str) -> str:
         """Ajoute ``https://`` si le schéma est manquant."""
-        return url if re.match(r"^https?://", url) else f"https://{url}"
+        return _ensure_scheme(url)
 
     def _normalize_links(self, links: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
         """Nettoie les URLs, noms et supprime les doublons."""
-        seen = set()
-        result: List[Tuple[str, str]] = []
-        for name, url in links:
-            clean_name = name.strip()
-            norm_url = self._ensure_scheme(url.strip())
-            if norm_url and norm_url not in seen:
-                result.append((clean_name, norm_url))
-                seen.add(norm_url)
-        return result
+        return list(_normalize_links(_links_key(links)))
 
     def _build_links_section(self, links: List[Tuple[str, str]]) -> str:
         """Construit la section HTML des liens utiles."""
-        links = self._normalize_links(links)
-        if not links:
-            return ""
-        items = "".join(
-            f'<p>{name} : <a href="{url}" style="color:#1a0dab;">{url}</a></p>'
-            for name, url in links
-        )
-        return f'<div><p>Liens utiles :</p>{items}</div>'
+        return _render_links(_normalize_links(_links_key(links)))
 
     def format_links_preview(self, links: List[Tuple[str, str]]) -> str:
         """Retourne une représentation texte des liens."""
-        links = self._normalize_links(links)
+        links = _normalize_links(_links_key(links))
         if not links:
             return ""
         lines = "\n".join(f"{name} : {url}" for name, url in links)
@@ -78,15 +138,7 @@ class OdooEmailService:
         """Insère ``addition`` avant la balise de fermeture principale."""
         if not addition:
             return html
-        body_pattern = re.compile(r"</body>", re.IGNORECASE)
-        if body_pattern.search(html):
-            return body_pattern.sub(addition + "</body>", html, count=1)
-
-        div_pattern = re.compile(r"</div>\s*$", re.IGNORECASE)
-        if div_pattern.search(html):
-            return div_pattern.sub(addition + "</div>", html)
-
-        return html + addition
+        return _insert_before_closing(html, addition, addition)
 
     def _format_body(self, body: str, links: List[Tuple[str, str]]) -> str:
         """Génère un contenu HTML simple et lisible pour l'email.
@@ -104,28 +156,71 @@ class OdooEmailService:
             HTML complet prêt à être envoyé.
         """
 
-        links_html = self._build_links_section(links)
-        unsubscribe_html = (
-            '<p><a href="/unsubscribe_from_list" '
-            'style="color:#1a0dab;">Se désabonner</a></p>'
-        )
         return (
             "<div style=\"font-family:Arial,sans-serif;line-height:1.6;\""
             "color:#333;max-width:600px;margin:auto;\">"
             f"<p>{body}</p>"
-            f"{links_html}"
-            f"{unsubscribe_html}"
+            f"{self._build_links_section(links)}"
+            f"{UNSUBSCRIBE_HTML}"
             "</div>"
         )
 
-    def _append_unsubscribe_link(self, html: str) -> str:
-        """Ajoute le lien de désinscription avant la balise de fermeture."""
+    def _assemble_html(self, html: str, links: List[Tuple[str, str]]) -> str:
+        """Insère les liens utiles et le lien de désinscription dans ``html``.
 
-        unsubscribe_html = (
-            '<p><a href="/unsubscribe_from_list" '
-            'style="color:#1a0dab;">Se désabonner</a></p>'
-        )
-        return self._append_before_closing(html, unsubscribe_html)
+        Une seule recherche de la balise fermante principale (``</body>``,
+        sinon le ``</div>`` final) place les deux fragments d'un coup. Sans
+        balise fermante, la désinscription rejoint la fin du bloc des liens.
+        """
+        links = _normalize_links(_links_key(links))
+        footer = _render_links(links) + UNSUBSCRIBE_HTML
+        return _insert_before_closing(html, footer, _render_links(links, UNSUBSCRIBE_HTML))
+
+    def _build_mailing_vals(
+        self,
+        subject: str,
+        body: str,
+        links: List[Tuple[str, str]],
+        send_datetime: datetime,
+        list_ids: Optional[List[int]] = None,
+        already_html: bool = False,
+    ) -> dict:
+        """Prépare les valeurs de création d'un ``mailing.mailing``.
+
+        Le HTML final est envoyé dans ``body_arch`` et ``body_html``, les deux
+        champs attendus par l'éditeur Odoo. ``body_plaintext`` n'est renseigné
+        que pour un corps en texte brut : pour un corps HTML, il ne ferait que
+        renvoyer une troisième fois la même source volumineuse.
+        """
+        if list_ids is None:
+            list_ids = ODOO_MAILING_LIST_IDS
+        links = list(_normalize_links(_links_key(list(links) + DEFAULT_LINKS)))
+
+        is_html = already_html or bool(_TAG_RE.search(body))
+        if is_html:
+            body_html = self._assemble_html(body, links)
+        else:
+            body_html = self._format_body(body, links)
+
+        create_vals = {
+            "name": subject,
+            "subject": subject,
+            "body_arch": body_html,
+            "body_html": body_html,
+            "mailing_type": "mail",
+            "schedule_type": "scheduled",
+            "email_from": self.email_from,
+            "schedule_date": send_datetime.astimezone(ZoneInfo("UTC")).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+        }
+        if not is_html:
+            create_vals["body_plaintext"] = body
+        if self.mailing_model_id:
+            create_vals["mailing_model_id"] = self.mailing_model_id
+        if list_ids:
+            create_vals["contact_list_ids"] = [(6, 0, list_ids)]
+        return create_vals
 
     @log_execution
     def schedule_email(
@@ -136,6 +231,7 @@ class OdooEmailService:
         send_datetime: datetime,
         list_ids: Optional[List[int]] = None,
         already_html: bool = False,
+        deadline: Optional[float] = None,
     ) -> int:
         """Crée et programme un email marketing.
 
@@ -153,6 +249,9 @@ class OdooEmailService:
         already_html: bool, optional
             Indique si ``body`` est déjà un contenu HTML complet. Lorsque vrai,
             le corps est utilisé tel quel sans passer par ``_format_body``.
+        deadline: float, optional
+            Durée maximale en secondes pour l'ensemble des appels Odoo. Au-delà,
+            ``config.odoo_transport.OdooDeadlineExceeded`` est levée.
 
         Returns
         -------
@@ -160,53 +259,69 @@ class OdooEmailService:
             L'identifiant de l'email créé.
         """
 
-        if list_ids is None:
-            list_ids = ODOO_MAILING_LIST_IDS
-        links = self._normalize_links(list(links) + DEFAULT_LINKS)
+        create_vals = self._build_mailing_vals(
+            subject, body, links, send_datetime, list_ids, already_html
+        )
 
-        is_html = already_html or bool(re.search(r"<[^>]+>", body))
-        if is_html:
-            body_html = self._append_before_closing(body, self._build_links_section(links))
-            body_html = self._append_unsubscribe_link(body_html)
-        else:
-            body_html = self._format_body(body, links)
+        mailings = OdooEnv(self.db, self.uid, self.password, self.models)[
+            "mailing.mailing"
+        ]
+        with odoo_deadline(deadline):
+            mailing = mailings.create(create_vals)
+            self._call_schedule(mailing, "action_schedule")
+        mailing_id = mailing.id
+        return mailing_id
 
-        create_vals = {
-            "name": subject,
-            "subject": subject,
-            "body_arch": body_html,
-            "body_html": body_html,
-            "body_plaintext": body,
-            "mailing_type": "mail",
-            "schedule_type": "scheduled",
-            "email_from": self.email_from,
-            "schedule_date": send_datetime.astimezone(ZoneInfo("UTC")).strftime(
-                "%Y-%m-%d %H:%M:%S"
-            ),
-        }
-        if self.mailing_model_id:
-            create_vals["mailing_model_id"] = self.mailing_model_id
-        if list_ids:
-            create_vals["contact_list_ids"] = [(6, 0, list_ids)]
+    @log_execution
+    def schedule_emails(
+        self,
+        drafts: List[tuple],
+        already_html: bool = False,
+        deadline: Optional[float] = None,
+    ) -> List[int]:
+        """Crée et programme plusieurs emails marketing en deux appels Odoo.
 
-        mailing_id = self.models.execute_kw(
-            self.db,
-            self.uid,
-            self.password,
-            "mailing.mailing",
-            "create",
-            [create_vals],
-        )
+        Parameters
+        ----------
+        drafts: List[tuple]
+            Brouillons ``(subject, body, links, send_datetime, list_ids)``,
+            avec les mêmes significations que pour ``schedule_email``.
+        already_html: bool, optional
+            Indique si les corps sont déjà des contenus HTML complets.
+        deadline: float, optional
+            Durée maximale en secondes pour l'ensemble des appels Odoo.
 
-        try:
-            self.models.execute_kw(
-                self.db,
-                self.uid,
-                self.password,
-                "mailing.mailing",
-                "action_schedule",
-                [[mailing_id]],
+        Returns
+        -------
+        List[int]
+            Les identifiants des emails créés, dans l'ordre des brouillons.
+
+        Tous les ``mailing.mailing`` sont créés par un seul ``create`` avec la
+        liste des valeurs, puis mis en file d'attente ensemble par un seul
+        ``action_put_in_queue`` : ``action_schedule`` n'accepte qu'un
+        enregistrement à la fois, et pour une date d'envoi renseignée il se
+        contente d'appeler ``action_put_in_queue``.
+        """
+        if not drafts:
+            return []
+        vals_list = [
+            self._build_mailing_vals(
+                subject, body, links, send_datetime, list_ids, already_html
             )
+            for subject, body, links, send_datetime, list_ids in drafts
+        ]
+        mailings = OdooEnv(self.db, self.uid, self.password, self.models)[
+            "mailing.mailing"
+        ]
+        with odoo_deadline(deadline):
+            created = mailings.create(vals_list)
+            self._call_schedule(created, "action_put_in_queue")
+        return created.ids
+
+    def _call_schedule(self, mailings, method: str) -> None:
+        """Appelle ``method`` en tolérant la valeur ``None`` renvoyée par Odoo."""
+        try:
+            mailings.call(method)
         except xmlrpc.client.Fault as err:
             if "cannot marshal None" in err.faultString:
                 self.logger.warning(
@@ -215,4 +330,42 @@ class OdooEmailService:
                 )
             else:
                 raise
-        return mailing_id
+
+
+def schedule_email_on_targets(
+    logger,
+    subject: str,
+    body: str,
+    links: List[Tuple[str, str]],
+    send_datetime: datetime,
+    targets: Optional[List[OdooTarget]] = None,
+    already_html: bool = False,
+    max_workers: int = ODOO_TARGETS_CONCURRENCY,
+    deadline: Optional[float] = None,
+) -> List[TargetResult]:
+    """Programme le même email sur plusieurs bases Odoo en parallèle.
+
+    Chaque cible utilise ses propres listes de diffusion
+    (``ODOO_<NOM>_MAILING_LIST_IDS``). ``deadline`` borne la durée des appels
+    Odoo de chaque cible. Retourne un ``TargetResult`` par cible dont le
+    résultat est l'identifiant du mailing créé.
+    """
+
+    def schedule(target: OdooTarget) -> int:
+        service = OdooEmailService(logger, connection=target.connect())
+        return service.schedule_email(
+            subject,
+            body,
+            links,
+            send_datetime,
+            target.mailing_list_ids,
+            already_html=already_html,
+        )
+
+    return fan_out(
+        schedule,
+        targets,
+        max_workers=max_workers,
+        deadline=deadline,
+        label="Programmation de l'email multi-bases",
+    )
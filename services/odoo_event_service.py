@@ -0,0 +1,78 @@
+"""Réactions du bot Telegram aux notifications du bus Odoo."""
+
+from config.odoo_bus import OdooBusListener
+from config.odoo_connect import get_odoo_connection
+from config.log_config import log_execution
+from pos_category_management.manage_pos_categories import update_pos_categories
+
+
+class OdooEventService:
+    """Relie les notifications du bus Odoo au bot en cours d'exécution.
+
+    - ``pos.category/write`` : les catégories POS sont resynchronisées avec
+      les règles du jour (une seule lecture si rien n'a changé) et le bot
+      signale les corrections ;
+    - ``mailing.mailing/write`` portant sur ``state`` : le nouvel état des
+      mailings concernés est envoyé au bot.
+    """
+
+    def __init__(
+        self,
+        logger,
+        telegram_service,
+        listener: OdooBusListener | None = None,
+        update_categories=update_pos_categories,
+        connection: tuple | None = None,
+    ) -> None:
+        self.logger = logger
+        self.telegram_service = telegram_service
+        self.listener = listener or OdooBusListener()
+        self.update_categories = update_categories
+        self.connection = connection
+        self.listener.on("pos.category/write", self._on_categories_changed)
+        self.listener.on("mailing.mailing/write", self._on_mailing_changed)
+
+    @log_execution
+    def start(self) -> None:
+        self.listener.start()
+
+    @log_execution
+    def stop(self) -> None:
+        self.listener.stop(timeout=1)
+
+    def _on_categories_changed(self, payloads: list) -> None:
+        # Nos propres écritures reviennent aussi par le bus : la
+        # resynchronisation suivante ne trouve alors rien à écrire.
+        done = self.update_categories(connection=self.connection)
+        if done["activated"] or done["deactivated"]:
+            self.telegram_service.send_message(
+                "Catégories POS resynchronisées après une modification dans Odoo "
+                f"(activées : {done['activated'] or 'aucune'}, "
+                f"désactivées : {done['deactivated'] or 'aucune'})."
+            )
+
+    def _on_mailing_changed(self, payloads: list) -> None:
+        ids = sorted(
+            {
+                mailing_id
+                for payload in payloads
+                if "state" in (payload or {}).get("fields", [])
+                for mailing_id in payload.get("ids", [])
+            }
+        )
+        if not ids:
+            return
+        db, uid, password, models = self.connection or get_odoo_connection()
+        mailings = models.execute_kw(
+            db,
+            uid,
+            password,
+            "mailing.mailing",
+            "read",
+            [ids],
+            {"fields": ["subject", "state"]},
+        )
+        for mailing in mailings:
+            self.telegram_service.send_message(
+                f"Mailing « {mailing['subject']} » : {mailing['state']}."
+            )
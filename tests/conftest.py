@@ -0,0 +1,71 @@
+"""Shared fixtures for the tests running against ``OdooStubServer``.
+
+A module picks the stub data with a marker and, when needed, the protocol by
+overriding the ``protocol`` fixture::
+
+    pytestmark = pytest.mark.odoo_stub(categories=46)
+
+- ``stub``: a running ``OdooStubServer`` built with the marker's arguments;
+- ``manager``: an ``OdooConnectionManager`` authenticated on the stub;
+- ``connection``: ``(db, uid, password, models)``, as returned by
+  ``get_odoo_connection()``;
+- ``odoo_args``: ``(models, db, uid, password)``, the argument order of the
+  paging and record cache helpers;
+- ``caches``: in-memory metadata cache and category index patched into
+  ``manage_pos_categories``.
+"""
+
+import pytest
+
+from config.odoo_connect import OdooConnectionManager
+from config.odoo_metadata import OdooMetadataCache
+from pos_category_management.category_index import CategoryIndex
+from tests.odoo_stub_server import DB, LOGIN, PASSWORD, OdooStubServer
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "odoo_stub(**kwargs): arguments of the OdooStubServer fixture"
+    )
+
+
+@pytest.fixture
+def stub(request):
+    marker = request.node.get_closest_marker("odoo_stub")
+    with OdooStubServer(**(marker.kwargs if marker else {})) as server:
+        yield server
+
+
+@pytest.fixture
+def protocol():
+    return "xmlrpc"
+
+
+@pytest.fixture
+def manager(stub, protocol):
+    return OdooConnectionManager(stub.url, DB, LOGIN, PASSWORD, protocol)
+
+
+@pytest.fixture
+def connection(manager):
+    return manager.db, manager.uid, manager.password, manager
+
+
+@pytest.fixture
+def odoo_args(manager):
+    return manager, manager.db, manager.uid, manager.password
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    from pos_category_management import manage_pos_categories
+
+    metadata = OdooMetadataCache(None, "stub")
+    index = CategoryIndex(None, "stub")
+    monkeypatch.setattr(
+        manage_pos_categories, "get_metadata_cache", lambda **kwargs: metadata
+    )
+    monkeypatch.setattr(
+        manage_pos_categories, "get_category_index", lambda **kwargs: index
+    )
+    return metadata, index
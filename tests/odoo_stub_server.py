@@ -0,0 +1,615 @@
+"""Serveur Odoo de substitution, local et en mémoire.
+
+``OdooStubServer`` expose les mêmes points d'entrée qu'une instance Odoo
+(``/xmlrpc/2/common``, ``/xmlrpc/2/object`` et ``/jsonrpc``) sur
+``127.0.0.1`` afin de tester et mesurer le code client sans serveur réel.
+Seule une petite partie de l'ORM est reproduite : ``search``,
+``search_read``, ``read``, ``write``, ``create``, ``unlink``,
+``search_count``, ``read_group``, ``fields_get``, ``action_schedule`` et
+``action_put_in_queue`` sur les modèles ``pos.category``, ``pos.config``,
+``product.template``, ``product.product``, ``pos.order``,
+``pos.order.line``, ``ir.model``, ``mailing.list`` et ``mailing.mailing``. Les domaines acceptent les chemins
+pointés à travers les many2one (``order_id.state``).
+
+Le bus de notifications est simulé par ``/web/session/authenticate`` et
+``/longpolling/poll`` : ``notify()`` publie une notification, et les
+écritures sur les modèles listés dans ``bus_models`` publient
+``<modèle>/write`` sur le canal ``odoo_automation``, comme le ferait une
+action automatisée.
+
+La latence simulée (``latency`` en secondes, appliquée à chaque requête), le
+volume de données (``categories``, ``pos_configs``, ``products``) et la compression
+(``gzip_threshold`` pour les réponses, ``accept_gzip`` pour les requêtes)
+sont configurables ::
+
+    with OdooStubServer(latency=0.02, categories=500) as server:
+        os.environ["ODOO_URL"] = server.url
+"""
+
+import gzip
+import itertools
+import json
+import socketserver
+import threading
+import time
+import xmlrpc.client
+from collections import Counter
+from datetime import datetime, timezone
+from xmlrpc.server import (
+    MultiPathXMLRPCServer,
+    SimpleXMLRPCDispatcher,
+    SimpleXMLRPCRequestHandler,
+)
+
+
+DB = "stub"
+LOGIN = "admin"
+PASSWORD = "admin"
+UID = 2
+SERVER_VERSION = {
+    "server_version": "17.0",
+    "server_version_info": [17, 0, 0, "final", 0, ""],
+    "server_serie": "17.0",
+    "protocol_version": 1,
+}
+
+# Catégories gérées par ``pos_category_management`` (IDs de production).
+# ``write_date`` des données initiales.
+SEED_WRITE_DATE = "2024-01-01 00:00:00"
+MANAGED_CATEGORIES = {79: "BUVETTE", 72: "EPICERIE", 53: "BUREAU", 58: "FOURNIL"}
+
+FIELD_TYPES = {
+    "pos.category": {
+        "id": "integer",
+        "name": "char",
+        "available_in_pos": "boolean",
+        "parent_id": "many2one",
+        "write_date": "datetime",
+    },
+    "pos.config": {
+        "id": "integer",
+        "name": "char",
+        "iface_available_categ_ids": "many2many",
+        "write_date": "datetime",
+    },
+    "product.template": {
+        "id": "integer",
+        "name": "char",
+        "available_in_pos": "boolean",
+        "pos_categ_ids": "many2many",
+        "write_date": "datetime",
+    },
+    "product.product": {
+        "id": "integer",
+        "name": "char",
+        "product_tmpl_id": "many2one",
+        "pos_categ_ids": "many2many",
+        "write_date": "datetime",
+    },
+    "pos.order": {
+        "id": "integer",
+        "name": "char",
+        "date_order": "datetime",
+        "state": "selection",
+        "write_date": "datetime",
+    },
+    "pos.order.line": {
+        "id": "integer",
+        "order_id": "many2one",
+        "product_id": "many2one",
+        "qty": "float",
+        "price_subtotal_incl": "float",
+        "write_date": "datetime",
+    },
+    "ir.model": {"id": "integer", "model": "char", "name": "char"},
+    "mailing.list": {"id": "integer", "name": "char", "write_date": "datetime"},
+    "mailing.mailing": {
+        "id": "integer",
+        "name": "char",
+        "subject": "char",
+        "body_arch": "html",
+        "body_html": "html",
+        "body_plaintext": "text",
+        "mailing_type": "selection",
+        "schedule_type": "selection",
+        "schedule_date": "datetime",
+        "email_from": "char",
+        "mailing_model_id": "many2one",
+        "contact_list_ids": "many2many",
+        "state": "selection",
+        "write_date": "datetime",
+    },
+}
+
+# Modèle cible des champs many2one utilisés dans les chemins pointés et les
+# regroupements.
+RELATIONS = {
+    ("pos.category", "parent_id"): "pos.category",
+    ("product.product", "product_tmpl_id"): "product.template",
+    ("pos.order.line", "order_id"): "pos.order",
+    ("pos.order.line", "product_id"): "product.product",
+}
+
+_OPERATORS = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "in": lambda a, b: a in b,
+    "not in": lambda a, b: a not in b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "ilike": lambda a, b: str(b).lower() in str(a or "").lower(),
+}
+
+
+class _Table:
+    """Enregistrements d'un modèle, indexés par ID."""
+
+    def __init__(self, server: "OdooStubServer", name: str) -> None:
+        self.server = server
+        self.name = name
+        self.records: dict[int, dict] = {}
+        self._ids = itertools.count(1)
+
+    def insert(self, vals: dict, record_id: int | None = None) -> int:
+        record_id = record_id or next(self._ids)
+        while record_id in self.records:
+            record_id = next(self._ids)
+        record = {field: False for field in FIELD_TYPES[self.name]}
+        for field, ftype in FIELD_TYPES[self.name].items():
+            if ftype in ("one2many", "many2many"):
+                record[field] = []
+        record.update(self._apply_commands(record, vals))
+        record["id"] = record_id
+        record["write_date"] = self.server.tick()
+        self.records[record_id] = record
+        return record_id
+
+    def _apply_commands(self, record: dict, vals: dict) -> dict:
+        result = {}
+        for field, value in vals.items():
+            ftype = FIELD_TYPES[self.name].get(field)
+            if ftype in ("one2many", "many2many") and isinstance(value, list):
+                current = list(record.get(field) or [])
+                for command in value:
+                    code = command[0]
+                    if code == 4 and command[1] not in current:
+                        current.append(command[1])
+                    elif code == 3 and command[1] in current:
+                        current.remove(command[1])
+                    elif code == 6:
+                        current = list(command[2])
+                    elif code == 5:
+                        current = []
+                result[field] = current
+            else:
+                result[field] = value
+        return result
+
+    def _match(self, record: dict, domain: list) -> bool:
+        for leaf in domain:
+            if not isinstance(leaf, (list, tuple)) or len(leaf) != 3:
+                continue  # opérateurs '&' implicites
+            field, operator, value = leaf
+            if operator not in _OPERATORS:
+                raise ValueError(f"Opérateur non supporté : {operator}")
+            if "." in field:
+                field, path = field.split(".", 1)
+                target = self.server.tables[RELATIONS[(self.name, field)]]
+                related = target.records.get(record.get(field))
+                if related is None or not target._match(related, [(path, operator, value)]):
+                    return False
+                continue
+            actual = record.get(field)
+            if isinstance(actual, list) and operator in ("=", "in", "!=", "not in"):
+                values = value if isinstance(value, (list, tuple)) else [value]
+                if bool(set(actual) & set(values)) != (operator in ("=", "in")):
+                    return False
+                continue
+            if operator in ("in", "not in"):
+                value = list(value)
+            if not _OPERATORS[operator](actual, value):
+                return False
+        return True
+
+    def search(self, domain=None, offset=0, limit=None, order=None, count=False):
+        ids = [
+            record_id
+            for record_id, record in sorted(self.records.items())
+            if self._match(record, domain or [])
+        ]
+        if order and order.strip().lower().endswith("desc"):
+            ids.reverse()
+        ids = ids[offset:]
+        if limit:
+            ids = ids[:limit]
+        return len(ids) if count else ids
+
+    def read(self, ids, fields=None):
+        fields = fields or list(FIELD_TYPES[self.name])
+        return [
+            {field: self.records[i].get(field, False) for field in ["id", *fields]}
+            for i in ids
+            if i in self.records
+        ]
+
+    def read_group(self, domain, fields, groupby):
+        """``read_group`` non paresseux : une ligne par combinaison de clés."""
+        groupby = [groupby] if isinstance(groupby, str) else list(groupby)
+        aggregates = [spec.split(":")[0] for spec in fields if spec.split(":")[0] not in groupby]
+        groups: dict[tuple, dict] = {}
+        for record_id in self.search(domain):
+            record = self.records[record_id]
+            key = tuple(record.get(field) for field in groupby)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {"__count": 0, **{f: 0 for f in aggregates}}
+                for field, value in zip(groupby, key):
+                    relation = RELATIONS.get((self.name, field))
+                    if relation and value:
+                        value = [value, self.server.tables[relation].records[value]["name"]]
+                    group[field] = value
+            group["__count"] += 1
+            for field in aggregates:
+                group[field] += record.get(field) or 0
+        return list(groups.values())
+
+    def write(self, ids, vals):
+        stamp = self.server.tick()
+        for record_id in ids:
+            record = self.records[record_id]
+            record.update(self._apply_commands(record, vals))
+            record["write_date"] = stamp
+        if self.name in self.server.bus_models:
+            self.server.notify(
+                "odoo_automation", f"{self.name}/write", {"ids": list(ids), "fields": list(vals)}
+            )
+        return True
+
+
+class _Handler(SimpleXMLRPCRequestHandler):
+    rpc_paths = ("/xmlrpc/2/common", "/xmlrpc/2/object")
+    protocol_version = "HTTP/1.1"
+    # Les réponses ne sont compressées que si le serveur le demande.
+    encode_threshold = None
+
+    def log_message(self, format, *args):  # pragma: no cover - silence
+        pass
+
+    def do_POST(self):
+        stub = self.server.stub
+        stub.before_request()
+        self.encode_threshold = stub.gzip_threshold
+        encoding = self.headers.get("content-encoding", "identity").lower()
+        if encoding == "gzip" and not stub.accept_gzip:
+            self.rfile.read(int(self.headers.get("content-length", 0)))
+            self.send_response(415)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/jsonrpc":
+            self._do_jsonrpc()
+            return
+        if self.path in ("/web/session/authenticate", "/longpolling/poll"):
+            self._do_web()
+            return
+        super().do_POST()
+
+    def _do_web(self):
+        stub = self.server.stub
+        payload = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+        params = payload.get("params", {})
+        reply = {"jsonrpc": "2.0", "id": payload.get("id")}
+        cookie = None
+        if self.path == "/web/session/authenticate":
+            uid = stub.authenticate(params.get("db"), params.get("login"), params.get("password"), {})
+            if uid:
+                cookie = stub.open_session()
+                reply["result"] = {"uid": uid, "db": params.get("db")}
+            else:
+                reply["error"] = {
+                    "code": 200,
+                    "message": "Odoo Server Error",
+                    "data": {"name": "odoo.exceptions.AccessDenied", "message": "Access Denied"},
+                }
+        else:
+            session = self.headers.get("cookie", "").partition("session_id=")[2].split(";")[0]
+            if session not in stub.sessions:
+                reply["error"] = {
+                    "code": 100,
+                    "message": "Odoo Session Expired",
+                    "data": {"name": "odoo.http.SessionExpiredException", "message": "Session expired"},
+                }
+            else:
+                reply["result"] = stub.poll(params.get("channels", []), params.get("last", 0))
+        body = json.dumps(reply).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if cookie:
+            self.send_header("Set-Cookie", f"session_id={cookie}; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _do_jsonrpc(self):
+        length = int(self.headers.get("content-length", 0))
+        data = self.rfile.read(length)
+        if self.headers.get("content-encoding", "").lower() == "gzip":
+            data = gzip.decompress(data)
+        payload = json.loads(data)
+        params = payload.get("params", {})
+        reply = {"jsonrpc": "2.0", "id": payload.get("id")}
+        try:
+            reply["result"] = self.server.stub.dispatch(
+                params.get("service"), params.get("method"), params.get("args", [])
+            )
+        except Exception as err:
+            message = err.faultString if isinstance(err, xmlrpc.client.Fault) else str(err)
+            name = (
+                "odoo.exceptions.AccessDenied"
+                if message == "Access Denied"
+                else f"builtins.{type(err).__name__}"
+            )
+            reply["error"] = {
+                "code": 200,
+                "message": "Odoo Server Error",
+                "data": {"name": name, "message": message},
+            }
+        body = json.dumps(reply).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if (
+            self.encode_threshold is not None
+            and len(body) > self.encode_threshold
+            and "gzip" in self.headers.get("accept-encoding", "")
+        ):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(socketserver.ThreadingMixIn, MultiPathXMLRPCServer):
+    daemon_threads = True
+
+
+class OdooStubServer:
+    """Instance Odoo simulée servie dans un thread local."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        categories: int = 20,
+        pos_configs: int = 1,
+        products: int = 0,
+        gzip_threshold: int | None = None,
+        accept_gzip: bool = True,
+        bus_models: tuple[str, ...] = (),
+        bus_timeout: float = 50.0,
+    ) -> None:
+        self.latency = latency
+        self.bus_models = tuple(bus_models)
+        self.bus_timeout = bus_timeout
+        self.notifications: list[dict] = []
+        self.sessions: set[str] = set()
+        self._bus = threading.Condition()
+        self.gzip_threshold = gzip_threshold
+        self.accept_gzip = accept_gzip
+        self.calls: Counter = Counter()
+        self._lock = threading.RLock()
+        self.tables = {name: _Table(self, name) for name in FIELD_TYPES}
+        self._seed(categories, pos_configs, products)
+        # Les données initiales sont réputées écrites bien avant les tests.
+        for table in self.tables.values():
+            for record in table.records.values():
+                record["write_date"] = SEED_WRITE_DATE
+
+        self._server = _Server(
+            ("127.0.0.1", 0), requestHandler=_Handler, logRequests=False, allow_none=True
+        )
+        self._server.stub = self
+        common = SimpleXMLRPCDispatcher(allow_none=True, encoding=None)
+        common.register_function(self.authenticate, "authenticate")
+        common.register_function(self.version, "version")
+        obj = SimpleXMLRPCDispatcher(allow_none=True, encoding=None)
+        obj.register_function(self.execute_kw, "execute_kw")
+        self._server.add_dispatcher("/xmlrpc/2/common", common)
+        self._server.add_dispatcher("/xmlrpc/2/object", obj)
+        self._thread: threading.Thread | None = None
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OdooStubServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "OdooStubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Données
+    # ------------------------------------------------------------------
+    def _seed(self, categories: int, pos_configs: int, products: int) -> None:
+        pos_category = self.tables["pos.category"]
+        for record_id, name in MANAGED_CATEGORIES.items():
+            pos_category.insert({"name": name, "available_in_pos": False}, record_id)
+        for index in range(max(0, categories - len(MANAGED_CATEGORIES))):
+            pos_category.insert({"name": f"Catégorie {index + 1}", "available_in_pos": True})
+        for index in range(pos_configs):
+            self.tables["pos.config"].insert({"name": f"Caisse {index + 1}"})
+        # Produits répartis à tour de rôle entre toutes les catégories.
+        category_ids = sorted(pos_category.records)
+        for index in range(products):
+            category_id = category_ids[index % len(category_ids)]
+            template_id = self.tables["product.template"].insert(
+                {
+                    "name": f"Produit {index + 1}",
+                    "available_in_pos": pos_category.records[category_id]["available_in_pos"],
+                    "pos_categ_ids": [(6, 0, [category_id])],
+                }
+            )
+            # Une variante par modèle de produit, de même ID.
+            self.tables["product.product"].insert(
+                {
+                    "name": f"Produit {index + 1}",
+                    "product_tmpl_id": template_id,
+                    "pos_categ_ids": [(6, 0, [category_id])],
+                },
+                template_id,
+            )
+        for model in FIELD_TYPES:
+            self.tables["ir.model"].insert({"model": model, "name": model})
+        self.tables["mailing.list"].insert({"name": "Newsletter"}, 2)
+
+    def add_order(self, date_order: str, lines: list[tuple[int, float, float]], state="paid") -> int:
+        """Enregistre une commande POS ; ``lines`` : ``(produit, qté, montant TTC)``."""
+        order_id = self.tables["pos.order"].insert(
+            {"name": f"Commande {date_order}", "date_order": date_order, "state": state}
+        )
+        for product_id, qty, amount in lines:
+            self.tables["pos.order.line"].insert(
+                {
+                    "order_id": order_id,
+                    "product_id": product_id,
+                    "qty": qty,
+                    "price_subtotal_incl": amount,
+                }
+            )
+        return order_id
+
+    def open_session(self) -> str:
+        session = f"stub-{len(self.sessions) + 1}"
+        self.sessions.add(session)
+        return session
+
+    def notify(self, channel: str, event_type: str, payload) -> None:
+        """Publie une notification sur le bus."""
+        with self._bus:
+            self.notifications.append(
+                {
+                    "id": len(self.notifications) + 1,
+                    "channel": channel,
+                    "message": {"type": event_type, "payload": payload},
+                }
+            )
+            self._bus.notify_all()
+
+    def poll(self, channels: list[str], last: int) -> list[dict]:
+        """Notifications postérieures à ``last``, attendues au plus ``bus_timeout``."""
+        self.calls[("bus", "poll")] += 1
+
+        def pending():
+            return [
+                n for n in self.notifications if n["id"] > last and n["channel"] in channels
+            ]
+
+        with self._bus:
+            self._bus.wait_for(pending, timeout=self.bus_timeout)
+            return pending()
+
+    def tick(self) -> str:
+        """Horodatage d'une écriture : l'heure UTC à la seconde, comme Odoo.
+
+        Deux écritures faites dans la même seconde portent donc le même
+        ``write_date``.
+        """
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    def before_request(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    # ------------------------------------------------------------------
+    # Services Odoo
+    # ------------------------------------------------------------------
+    def dispatch(self, service: str, method: str, args: list):
+        if service == "common" and method in ("authenticate", "version"):
+            return getattr(self, method)(*args)
+        if service == "object" and method == "execute_kw":
+            return self.execute_kw(*args)
+        raise Exception(f"Service inconnu : {service}.{method}")
+
+    def authenticate(self, db, login, password, user_agent_env):
+        self.calls[("common", "authenticate")] += 1
+        return UID if (db, login, password) == (DB, LOGIN, PASSWORD) else False
+
+    def version(self):
+        self.calls[("common", "version")] += 1
+        return SERVER_VERSION
+
+    def execute_kw(self, db, uid, password, model, method, args=None, kwargs=None):
+        self.calls[(model, method)] += 1
+        if (db, uid, password) != (DB, UID, PASSWORD):
+            raise xmlrpc.client.Fault(3, "Access Denied")
+        if model not in self.tables:
+            raise xmlrpc.client.Fault(2, f"Object {model} doesn't exist")
+        args = list(args or [])
+        kwargs = dict(kwargs or {})
+        kwargs.pop("context", None)
+        with self._lock:
+            return self._execute(self.tables[model], method, args, kwargs)
+
+    def _execute(self, table: _Table, method: str, args: list, kwargs: dict):
+        if method == "search":
+            return table.search(*args, **kwargs)
+        if method == "search_count":
+            return table.search(*args, count=True)
+        if method == "search_read":
+            domain = args[0] if args else kwargs.pop("domain", [])
+            fields = args[1] if len(args) > 1 else kwargs.pop("fields", None)
+            ids = table.search(domain, **kwargs)
+            return table.read(ids, fields)
+        if method == "read":
+            fields = args[1] if len(args) > 1 else kwargs.get("fields")
+            return table.read(args[0], fields)
+        if method == "write":
+            return table.write(*args)
+        if method == "create":
+            vals = args[0]
+            if isinstance(vals, list):
+                return [table.insert(v) for v in vals]
+            return table.insert(vals)
+        if method == "unlink":
+            for record_id in args[0]:
+                table.records.pop(record_id, None)
+            return True
+        if method == "read_group":
+            domain = args[0] if args else kwargs.get("domain", [])
+            fields = args[1] if len(args) > 1 else kwargs.get("fields", [])
+            groupby = args[2] if len(args) > 2 else kwargs.get("groupby", [])
+            return table.read_group(domain, fields, groupby)
+        if method == "fields_get":
+            return {
+                field: {"type": ftype, "string": field}
+                for field, ftype in FIELD_TYPES[table.name].items()
+            }
+        if method == "action_schedule" and table.name == "mailing.mailing":
+            if len(args[0]) != 1:
+                raise ValueError(f"Expected singleton: mailing.mailing{tuple(args[0])}")
+            return table.write(args[0], {"state": "in_queue"})
+        if method == "action_put_in_queue" and table.name == "mailing.mailing":
+            table.write(args[0], {"state": "in_queue"})
+            return None
+        raise xmlrpc.client.Fault(
+            2, f"The method '{method}' does not exist on the model '{table.name}'"
+        )
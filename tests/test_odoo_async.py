@@ -0,0 +1,119 @@
+"""Tests for the asyncio-native Odoo client."""
+
+import asyncio
+import json
+import xmlrpc.client
+
+import httpx
+import pytest
+
+from config.odoo_async import AsyncOdooClient
+from config.odoo_transport import OdooTimeout
+
+
+def _xmlrpc_handler(calls, denied_once=False):
+    state = {"denied": denied_once}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params, method = xmlrpc.client.loads(request.content)
+        calls.append((request.url.path, method, params))
+        if method == "authenticate":
+            result = 5
+        elif state["denied"]:
+            state["denied"] = False
+            body = xmlrpc.client.dumps(xmlrpc.client.Fault(3, "Access Denied"), methodresponse=True)
+            return httpx.Response(200, content=body.encode())
+        else:
+            result = [{"id": 79, "name": "BUVETTE"}]
+        body = xmlrpc.client.dumps((result,), methodresponse=True, allow_none=True)
+        return httpx.Response(200, content=body.encode())
+
+    return handler
+
+
+def _client(handler, **kwargs):
+    return AsyncOdooClient(
+        "https://odoo",
+        "db",
+        "user",
+        "pwd",
+        auth_cache=None,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        **kwargs,
+    )
+
+
+def test_execute_kw_over_xmlrpc():
+    calls = []
+
+    async def scenario():
+        async with _client(_xmlrpc_handler(calls), protocol="xmlrpc") as client:
+            db, uid, password, models = await client.connect()
+            return await models.execute_kw(
+                db, uid, password, "pos.category", "search_read", [[], ["id", "name"]]
+            )
+
+    assert asyncio.run(scenario()) == [{"id": 79, "name": "BUVETTE"}]
+    assert calls[0] == ("/xmlrpc/2/common", "authenticate", ("db", "user", "pwd", {}))
+    assert calls[1][0] == "/xmlrpc/2/object"
+    assert calls[1][2][3:5] == ("pos.category", "search_read")
+
+
+def test_reauthenticates_on_access_denied():
+    calls = []
+
+    async def scenario():
+        async with _client(_xmlrpc_handler(calls, denied_once=True), protocol="xmlrpc") as client:
+            db, uid, password, models = await client.connect()
+            return await models.execute_kw(db, uid, password, "pos.category", "search", [[]])
+
+    assert asyncio.run(scenario()) == [{"id": 79, "name": "BUVETTE"}]
+    assert [method for _, method, _ in calls].count("authenticate") == 2
+
+
+def test_jsonrpc_fault_and_bounded_concurrency():
+    in_flight = {"current": 0, "max": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        in_flight["current"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["current"])
+        await asyncio.sleep(0.01)
+        in_flight["current"] -= 1
+        if payload["params"]["args"][4] == "unlink":
+            return httpx.Response(
+                200,
+                json={"id": payload["id"], "error": {"code": 200, "data": {"message": "boom"}}},
+            )
+        return httpx.Response(200, json={"id": payload["id"], "result": True})
+
+    async def scenario():
+        async with _client(handler, protocol="jsonrpc", max_concurrency=2) as client:
+            results = await asyncio.gather(
+                *(client.execute_kw("db", 1, "pwd", "pos.category", "write", [[i], {}]) for i in range(6))
+            )
+            with pytest.raises(xmlrpc.client.Fault):
+                await client.execute_kw("db", 1, "pwd", "pos.category", "unlink", [[1]])
+            return results
+
+    assert asyncio.run(scenario()) == [True] * 6
+    assert in_flight["max"] == 2
+
+
+def test_default_client_is_bounded_by_odoo_timeout():
+    client = AsyncOdooClient(
+        "https://odoo", "db", "user", "pwd", auth_cache=None, timeout=7
+    )
+    assert client._client.timeout == httpx.Timeout(7)
+
+
+def test_timeout_is_raised_as_odoo_timeout():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("figé", request=request)
+
+    async def scenario():
+        async with _client(handler) as client:
+            await client.call("common", "version")
+
+    with pytest.raises(OdooTimeout):
+        asyncio.run(scenario())
@@ -0,0 +1,155 @@
+"""Tests for the batching layer on top of ``execute_kw``."""
+
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from config.odoo_batch import OdooBatch
+from config.odoo_connect import EXECUTOR_WORKERS
+from config.odoo_metadata import OdooMetadataCache
+from pos_category_management.category_index import CategoryIndex
+
+
+def test_identical_writes_are_coalesced():
+    models = MagicMock()
+    models.execute_kw.return_value = True
+    batch = OdooBatch("db", 1, "pwd", models)
+
+    first = batch.write("pos.category", [79], {"available_in_pos": True})
+    second = batch.write("pos.category", [72, 79], {"available_in_pos": True})
+    other = batch.write("pos.category", [58], {"available_in_pos": False})
+    batch.flush()
+
+    assert first.result() is True and second.result() is True and other.result()
+    models.execute_kw.assert_any_call(
+        "db", 1, "pwd", "pos.category", "write", [[79, 72], {"available_in_pos": True}]
+    )
+    models.execute_kw.assert_any_call(
+        "db", 1, "pwd", "pos.category", "write", [[58], {"available_in_pos": False}]
+    )
+    assert models.execute_kw.call_count == 2
+    assert (batch.requested, batch.round_trips, batch.saved) == (3, 2, 1)
+
+
+def test_conflicting_writes_keep_submission_order():
+    sent = []
+    models = MagicMock()
+
+    def execute_kw(db, uid, password, model, method, args, kwargs=None):
+        sent.append((args[0], args[1]["x"]))
+        return True
+
+    models.execute_kw.side_effect = execute_kw
+    with OdooBatch("db", 1, "pwd", models, max_workers=4) as batch:
+        batch.write("res.partner", [1], {"x": 1})
+        batch.write("res.partner", [1, 2], {"x": 2})
+        batch.write("res.partner", [1], {"x": 1})
+        batch.write("res.partner", [3], {"x": 2})
+
+    # Le dernier ``x=1`` n'est pas fusionné avec le premier ; ``[3]`` ne
+    # touche aucun ID commun et rejoint l'écriture ``x=2``.
+    assert sent == [([1], 1), ([1, 2, 3], 2), ([1], 1)]
+    assert batch.round_trips == 3
+
+
+def test_failed_group_is_reported_on_each_future():
+    models = MagicMock()
+    models.execute_kw.side_effect = RuntimeError("boom")
+    batch = OdooBatch("db", 1, "pwd", models)
+
+    futures = [
+        batch.write("pos.category", [cid], {"available_in_pos": True}) for cid in (1, 2)
+    ]
+    batch.flush()
+
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result()
+
+
+def test_independent_calls_are_pipelined():
+    barrier = threading.Barrier(2, timeout=5)
+    models = MagicMock()
+
+    def execute_kw(db, uid, password, model, method, args, kwargs=None):
+        barrier.wait()
+        return [model]
+
+    models.execute_kw.side_effect = execute_kw
+    with OdooBatch("db", 1, "pwd", models, max_workers=2) as batch:
+        configs = batch.call("pos.config", "search", [[]], {"limit": 1})
+        categories = batch.call("pos.category", "search", [[]])
+
+    assert configs.result() == ["pos.config"]
+    assert categories.result() == ["pos.category"]
+
+
+def test_pipelined_calls_reuse_the_shared_pool():
+    threads = set()
+    models = MagicMock()
+
+    def execute_kw(db, uid, password, model, method, args, kwargs=None):
+        threads.add(threading.current_thread().name)
+        return True
+
+    models.execute_kw.side_effect = execute_kw
+    for _ in range(5):
+        with OdooBatch("db", 1, "pwd", models, max_workers=4) as batch:
+            for model in ("pos.config", "pos.category", "res.partner"):
+                batch.call(model, "search", [[]])
+
+    # Aucun thread créé pour un seul lot : leurs proxies (et connexions)
+    # servent d'un lot à l'autre.
+    threads.discard(threading.current_thread().name)
+    assert threads and all(name.startswith("odoo-pool") for name in threads)
+    assert len(threads) <= EXECUTOR_WORKERS
+
+
+def test_update_pos_categories_writes_once_per_state(monkeypatch):
+    from pos_category_management import manage_pos_categories
+
+    models = MagicMock()
+    names = {79: "BUVETTE", 72: "EPICERIE", 53: "BUREAU", 58: "FOURNIL"}
+    state = {79: False, 72: False, 53: False, 58: True}
+
+    def execute_kw(db, uid, password, model, method, args, kwargs=None):
+        if method == "fields_get":
+            return {"available_in_pos": {"type": "boolean"}}
+        if method == "search_read" and model == "product.template":
+            return []
+        if method == "search_read":
+            return [
+                {"id": i, "name": names[i], "available_in_pos": available}
+                for i, available in state.items()
+            ]
+        return True
+
+    models.execute_kw.side_effect = execute_kw
+    monkeypatch.setattr(
+        manage_pos_categories,
+        "get_odoo_connection",
+        lambda: ("db", 1, "pwd", models),
+    )
+    metadata = OdooMetadataCache(None, "test")
+    monkeypatch.setattr(
+        manage_pos_categories, "get_metadata_cache", lambda **kwargs: metadata
+    )
+    index = CategoryIndex(None, "test")
+    monkeypatch.setattr(
+        manage_pos_categories, "get_category_index", lambda **kwargs: index
+    )
+
+    manage_pos_categories.update_pos_categories(datetime(2024, 9, 6, 7, 0))
+
+    writes = [
+        c.args for c in models.execute_kw.call_args_list if c.args[4] == "write"
+    ]
+    assert len(writes) == 2
+    assert (
+        "db", 1, "pwd", "pos.category", "write", [[79, 72, 53], {"available_in_pos": True}]
+    ) in writes
+    assert (
+        "db", 1, "pwd", "pos.category", "write", [[58], {"available_in_pos": False}]
+    ) in writes
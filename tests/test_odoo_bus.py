@@ -0,0 +1,111 @@
+"""Tests for the Odoo bus listener and the bot reactions."""
+
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from config.odoo_bus import OdooBusError, OdooBusListener
+from tests.odoo_stub_server import DB, LOGIN, PASSWORD
+
+
+pytestmark = pytest.mark.odoo_stub(
+    categories=6, bus_models=("pos.category", "mailing.mailing"), bus_timeout=0.2
+)
+
+
+def _listener(stub, **kwargs):
+    return OdooBusListener(
+        stub.url, DB, LOGIN, PASSWORD, ["odoo_automation"], timeout=5, **kwargs
+    )
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.02)
+
+
+def test_notifications_of_one_type_are_grouped(stub):
+    listener = _listener(stub)
+    received = []
+    listener.on("pos.category/write", received.append)
+    stub.notify("odoo_automation", "pos.category/write", {"ids": [79]})
+    stub.notify("odoo_automation", "pos.category/write", {"ids": [58]})
+    stub.notify("other_channel", "pos.category/write", {"ids": [53]})
+
+    assert len(listener.poll_once()) == 2
+    assert received == [[{"ids": [79]}, {"ids": [58]}]]
+    assert listener.last == 2
+    # Nothing new: the request is held open by the server, then empty.
+    assert listener.poll_once() == []
+    assert stub.calls[("common", "authenticate")] == 1
+
+
+def test_expired_session_is_renewed(stub):
+    listener = _listener(stub)
+    listener.poll_once()
+    stub.sessions.clear()
+    with pytest.raises(OdooBusError):
+        listener.poll_once()
+    stub.notify("odoo_automation", "mailing.mailing/write", {"ids": [1]})
+    assert len(listener.poll_once()) == 1
+    assert stub.calls[("common", "authenticate")] == 2
+
+
+def test_failing_callback_does_not_stop_the_others(stub):
+    listener = _listener(stub)
+    received = []
+    listener.on("pos.category/write", MagicMock(side_effect=ValueError("boom")))
+    listener.on("pos.category/write", received.append)
+    stub.notify("odoo_automation", "pos.category/write", {"ids": [79]})
+    listener.poll_once()
+    assert received == [[{"ids": [79]}]]
+
+
+def test_manual_category_edit_is_reverted_within_seconds(stub, connection, caches):
+    from pos_category_management import manage_pos_categories
+    from services.odoo_event_service import OdooEventService
+
+    friday = datetime(2024, 9, 6, 7, 0)
+
+    def update_categories(connection):
+        return manage_pos_categories.update_pos_categories(friday, connection)
+
+    telegram = MagicMock()
+    service = OdooEventService(
+        MagicMock(), telegram, _listener(stub), update_categories, connection
+    )
+    update_categories(connection)
+    service.start()
+    try:
+        # Someone re-enables the Sunday-only category by hand.
+        db, uid, password, models = connection
+        models.execute_kw(
+            db, uid, password, "pos.category", "write", [[58], {"available_in_pos": True}]
+        )
+        records = stub.tables["pos.category"].records
+        _wait_for(lambda: records[58]["available_in_pos"] is False)
+        _wait_for(lambda: telegram.send_message.called)
+    finally:
+        service.stop()
+    assert "désactivées : [58]" in telegram.send_message.call_args.args[0]
+
+
+def test_mailing_state_changes_are_sent_to_the_bot(stub, connection):
+    from services.odoo_event_service import OdooEventService
+
+    db, uid, password, models = connection
+    mailing_id = models.execute_kw(
+        db, uid, password, "mailing.mailing", "create", [{"subject": "Promo"}]
+    )
+    telegram = MagicMock()
+    listener = _listener(stub)
+    OdooEventService(MagicMock(), telegram, listener, MagicMock(), connection)
+    models.execute_kw(
+        db, uid, password, "mailing.mailing", "write", [[mailing_id], {"state": "done"}]
+    )
+    listener.poll_once()
+    telegram.send_message.assert_called_once_with("Mailing « Promo » : done.")
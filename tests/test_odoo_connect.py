@@ -1,8 +1,12 @@
 """Tests for establishing a connection to Odoo via XML-RPC."""
 
+import os
+import tempfile
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 import importlib
+import xmlrpc.client
 
 class TestOdooConnect(unittest.TestCase):
     def setUp(self):
@@ -12,6 +16,7 @@ class TestOdooConnect(unittest.TestCase):
             return 1
 
         common.authenticate.side_effect = _authenticate
+        self.common = common
         models = MagicMock()
 
         def _execute_kw(db, uid, password, model, method, args=None, kwargs=None):
@@ -31,13 +36,30 @@ class TestOdooConnect(unittest.TestCase):
         self.patcher = patch("xmlrpc.client.ServerProxy", side_effect=server_proxy)
         self.patcher.start()
 
+        self.addCleanup(self._reload_config)
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+        env = patch.dict(os.environ, {"ODOO_CACHE_DIR": self.cache_dir})
+        env.start()
+        self.addCleanup(env.stop)
+
         import config
         importlib.reload(config)
         import config.odoo_connect as odoo_connect
         importlib.reload(odoo_connect)
+        self.odoo_connect = odoo_connect
         self.get_odoo_connection = odoo_connect.get_odoo_connection
+        self.models = models
         self.addCleanup(self.patcher.stop)
 
+    @staticmethod
+    def _reload_config():
+        import config
+        import config.odoo_connect as odoo_connect
+        importlib.reload(config)
+        importlib.reload(odoo_connect)
+
     def test_connection(self):
         db, uid, password, models = self.get_odoo_connection()
         self.assertIsNotNone(uid, "L'UID utilisateur ne doit pas être None après connexion.")
@@ -47,5 +69,71 @@ class TestOdooConnect(unittest.TestCase):
         count = models.execute_kw(db, uid, password, 'product.template', 'search_count', [[]])
         self.assertIsInstance(count, int, "Le nombre de produits doit être un entier.")
 
+    def test_session_is_reused(self):
+        first = self.get_odoo_connection()
+        second = self.get_odoo_connection()
+        self.assertIs(first[3], second[3])
+        self.assertEqual(self.common.authenticate.call_count, 1)
+
+    def test_proxies_are_thread_local(self):
+        created = []
+
+        def server_proxy(url, *args, **kwargs):
+            proxy = MagicMock()
+            created.append(proxy)
+            return proxy
+
+        with patch("xmlrpc.client.ServerProxy", side_effect=server_proxy):
+            manager = self.odoo_connect.OdooConnectionManager("u", "d", "l", "p")
+            self.assertIs(manager.object_proxy(), manager.object_proxy())
+            threads = [
+                threading.Thread(target=manager.object_proxy) for _ in range(3)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(len(created), 4)
+
+    def test_reauthenticates_on_access_denied(self):
+        db, uid, password, manager = self.get_odoo_connection()
+        fault = xmlrpc.client.Fault(3, "Access Denied")
+        self.models.execute_kw.side_effect = [fault, [5]]
+        result = manager.execute_kw(db, uid, password, "pos.category", "search", [[]])
+        self.assertEqual(result, [5])
+        self.assertEqual(self.common.authenticate.call_count, 2)
+
+    def test_other_faults_are_raised(self):
+        db, uid, password, manager = self.get_odoo_connection()
+        self.models.execute_kw.side_effect = xmlrpc.client.Fault(1, "ValueError")
+        with self.assertRaises(xmlrpc.client.Fault):
+            manager.execute_kw(db, uid, password, "pos.category", "search", [[]])
+        self.assertEqual(self.common.authenticate.call_count, 1)
+
+    def test_authentication_is_cached_across_runs(self):
+        self.get_odoo_connection()
+        self.odoo_connect.reset_connections()
+        db, uid, password, models = self.get_odoo_connection()
+        self.assertEqual(uid, 1)
+        self.assertEqual(self.common.authenticate.call_count, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, "auth.json")))
+
+    def test_access_denied_invalidates_cached_uid(self):
+        self.get_odoo_connection()
+        self.odoo_connect.reset_connections()
+        db, uid, password, manager = self.get_odoo_connection()
+        self.models.execute_kw.side_effect = [xmlrpc.client.Fault(3, "Access Denied"), 42]
+        manager.execute_kw(db, uid, password, "product.template", "search_count", [[]])
+        self.assertEqual(self.common.authenticate.call_count, 2)
+
+    def test_server_version_is_cached(self):
+        self.common.version.return_value = {"server_version": "17.0"}
+        _, _, _, manager = self.get_odoo_connection()
+        self.assertEqual(manager.server_version(), {"server_version": "17.0"})
+        self.odoo_connect.reset_connections()
+        _, _, _, manager = self.get_odoo_connection()
+        self.assertEqual(manager.server_version(), {"server_version": "17.0"})
+        self.assertEqual(self.common.version.call_count, 1)
+
 if __name__ == "__main__":
     unittest.main()
@@ -4,6 +4,7 @@ from unittest.mock import MagicMock
 from zoneinfo import ZoneInfo
 import xmlrpc.client
 
+from config.odoo_metadata import OdooMetadataCache
 from services.odoo_email_service import OdooEmailService, DEFAULT_LINKS
 
 
@@ -16,6 +17,10 @@ def _setup_service(monkeypatch):
 
     monkeypatch.setattr("services.odoo_email_service.get_odoo_connection", fake_connect)
     monkeypatch.setattr("services.odoo_email_service.ODOO_EMAIL_FROM", "sender@example.com")
+    metadata = OdooMetadataCache(None, "test")
+    monkeypatch.setattr(
+        "services.odoo_email_service.get_metadata_cache", lambda **kwargs: metadata
+    )
     service = OdooEmailService(logging.getLogger("test"))
     return service, mock_models
 
@@ -85,7 +90,6 @@ def test_schedule_email_accepts_html(monkeypatch):
                 "subject": "Sujet",
                 "body_arch": expected_html,
                 "body_html": expected_html,
-                "body_plaintext": html,
                 "mailing_type": "mail",
                 "schedule_type": "scheduled",
                 "email_from": "sender@example.com",
@@ -125,7 +129,6 @@ def test_schedule_email_inserts_links_into_html(monkeypatch):
                 "subject": "Sujet",
                 "body_arch": expected_html,
                 "body_html": expected_html,
-                "body_plaintext": html,
                 "mailing_type": "mail",
                 "schedule_type": "scheduled",
                 "email_from": "sender@example.com",
@@ -177,3 +180,66 @@ def test_schedule_email_handles_none_fault(monkeypatch):
     dt = datetime(2024, 5, 29, 8, 0, tzinfo=ZoneInfo("Europe/Paris"))
     mailing_id = service.schedule_email("Sujet", "Corps", [], dt)
     assert mailing_id == 1
+
+
+def test_schedule_emails_creates_and_queues_in_two_calls(monkeypatch):
+    service, mock_models = _setup_service(monkeypatch)
+    fault = xmlrpc.client.Fault(
+        1, "TypeError: cannot marshal None unless allow_none is enabled"
+    )
+    mock_models.execute_kw.reset_mock()
+    mock_models.execute_kw.side_effect = [[11, 12], fault]
+    first = datetime(2024, 6, 3, 8, 0, tzinfo=ZoneInfo("Europe/Paris"))
+    second = datetime(2024, 6, 10, 8, 0, tzinfo=ZoneInfo("Europe/Paris"))
+    mailing_ids = service.schedule_emails(
+        [
+            ("Semaine 1", "Corps 1", [], first, [7]),
+            ("Semaine 2", "Corps 2", [], second, None),
+        ]
+    )
+    assert mailing_ids == [11, 12]
+    assert mock_models.execute_kw.call_count == 2
+
+    create, queue = mock_models.execute_kw.call_args_list
+    vals_list = create.args[5][0]
+    assert [vals["subject"] for vals in vals_list] == ["Semaine 1", "Semaine 2"]
+    assert vals_list[0]["schedule_date"] == "2024-06-03 06:00:00"
+    assert vals_list[0]["contact_list_ids"] == [(6, 0, [7])]
+    assert queue.args[3:6] == ("mailing.mailing", "action_put_in_queue", [[11, 12]])
+
+
+def test_schedule_emails_without_drafts(monkeypatch):
+    service, mock_models = _setup_service(monkeypatch)
+    mock_models.execute_kw.reset_mock()
+    assert service.schedule_emails([]) == []
+    mock_models.execute_kw.assert_not_called()
+
+
+UNSUBSCRIBE = (
+    '<p><a href="/unsubscribe_from_list" style="color:#1a0dab;">Se désabonner</a></p>'
+)
+
+
+def test_assemble_html_inserts_before_trailing_div(monkeypatch):
+    service, _ = _setup_service(monkeypatch)
+    links_html = service._build_links_section([("Nom", "http://ex")])
+    html = service._assemble_html("<div><p>Corps</p></div>\n  ", [("Nom", "http://ex")])
+    assert html == "<div><p>Corps</p>" + links_html + UNSUBSCRIBE + "</div>"
+
+
+def test_assemble_html_without_closing_tag(monkeypatch):
+    service, _ = _setup_service(monkeypatch)
+    html = service._assemble_html("<p>Corps</p>", [("Nom", "ex.fr")])
+    assert html == (
+        "<p>Corps</p><div><p>Liens utiles :</p>"
+        '<p>Nom : <a href="https://ex.fr" style="color:#1a0dab;">https://ex.fr</a></p>'
+        + UNSUBSCRIBE
+        + "</div>"
+    )
+    assert service._assemble_html("<p>Corps</p>", []) == "<p>Corps</p>" + UNSUBSCRIBE
+
+
+def test_assemble_html_prefers_body_over_inner_div(monkeypatch):
+    service, _ = _setup_service(monkeypatch)
+    html = service._assemble_html("<BODY><div>Corps</div></BODY>", [])
+    assert html == "<BODY><div>Corps</div>" + UNSUBSCRIBE + "</BODY>"
@@ -74,7 +74,9 @@ class DummyOdooEmailService:
     def format_links_preview(self, links):
         return ""
 
-    def schedule_email(self, subject, body, links, dt, list_ids, already_html=True):
+    def schedule_email(
+        self, subject, body, links, dt, list_ids, already_html=True, deadline=None
+    ):
         self.scheduled = True
         return 1
 
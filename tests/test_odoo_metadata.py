@@ -0,0 +1,103 @@
+"""Tests for the Odoo metadata cache."""
+
+import json
+import threading
+from unittest.mock import MagicMock
+
+from config.odoo_metadata import OdooMetadataCache
+
+
+def test_model_id_is_fetched_once_and_persisted(tmp_path):
+    path = tmp_path / "metadata.json"
+    models = MagicMock()
+    models.execute_kw.return_value = [12]
+
+    cache = OdooMetadataCache(str(path), "https://odoo|db")
+    assert cache.model_id(models, "db", 1, "pwd", "mailing.list") == 12
+    assert cache.model_id(models, "db", 1, "pwd", "mailing.list") == 12
+    assert models.execute_kw.call_count == 1
+
+    reloaded = OdooMetadataCache(str(path), "https://odoo|db")
+    assert reloaded.model_id(models, "db", 1, "pwd", "mailing.list") == 12
+    assert models.execute_kw.call_count == 1
+    assert json.loads(path.read_text())["https://odoo|db"]["model_ids"] == {
+        "mailing.list": 12
+    }
+
+
+def test_missing_model_is_not_cached():
+    models = MagicMock()
+    models.execute_kw.side_effect = [[], [4]]
+    cache = OdooMetadataCache(None, "ns")
+    assert cache.model_id(models, "db", 1, "pwd", "mailing.list") is None
+    assert cache.model_id(models, "db", 1, "pwd", "mailing.list") == 4
+
+
+def test_fields_get_and_invalidation(tmp_path):
+    models = MagicMock()
+    models.execute_kw.return_value = {"available_in_pos": {"type": "boolean"}}
+    cache = OdooMetadataCache(str(tmp_path / "metadata.json"), "ns")
+
+    fields = cache.fields_get(models, "db", 1, "pwd", "pos.category")
+    assert fields == {"available_in_pos": {"type": "boolean"}}
+    models.execute_kw.assert_called_once_with(
+        "db", 1, "pwd", "pos.category", "fields_get", [], {"attributes": ["type"]}
+    )
+    cache.fields_get(models, "db", 1, "pwd", "pos.category")
+    assert models.execute_kw.call_count == 1
+
+    cache.invalidate("pos.category")
+    cache.fields_get(models, "db", 1, "pwd", "pos.category")
+    assert models.execute_kw.call_count == 2
+
+
+def test_fields_get_is_read_again_after_an_upgrade():
+    models = MagicMock()
+    models.execute_kw.return_value = {"pos_categ_ids": {"type": "many2many"}}
+    cache = OdooMetadataCache(None, "ns")
+    for version in ("16.0", "16.0", "17.0"):
+        cache.fields_get(
+            models, "db", 1, "pwd", "product.template", server_version=version
+        )
+    assert models.execute_kw.call_count == 2
+
+    cache.invalidate("product.template")
+    cache.fields_get(models, "db", 1, "pwd", "product.template", server_version="17.0")
+    assert models.execute_kw.call_count == 3
+
+
+def test_capability_is_detected_once_per_key(tmp_path):
+    path = str(tmp_path / "metadata.json")
+    detect = MagicMock(side_effect=["pos.category", "pos.config"])
+    cache = OdooMetadataCache(path, "ns")
+    assert cache.capability("pos_category_api@16.0", detect) == "pos.category"
+    assert cache.capability("pos_category_api@16.0", detect) == "pos.category"
+    assert OdooMetadataCache(path, "ns").capability(
+        "pos_category_api@16.0", detect
+    ) == "pos.category"
+    assert detect.call_count == 1
+
+    assert cache.capability("pos_category_api@17.0", detect) == "pos.config"
+    assert detect.call_count == 2
+
+
+def test_namespaces_sharing_a_file_do_not_overwrite_each_other(tmp_path):
+    path = str(tmp_path / "metadata.json")
+    caches = [OdooMetadataCache(path, f"https://odoo{i}|db") for i in range(8)]
+
+    def fill(cache):
+        models = MagicMock()
+        models.execute_kw.return_value = [12]
+        for name in ("mailing.list", "mailing.mailing", "pos.category"):
+            cache.model_id(models, "db", 1, "pwd", name)
+
+    threads = [threading.Thread(target=fill, args=(cache,)) for cache in caches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    data = json.loads((tmp_path / "metadata.json").read_text())
+    assert sorted(data) == sorted(cache.namespace for cache in caches)
+    assert all(len(entry["model_ids"]) == 3 for entry in data.values())
+    assert caches[0].store is caches[1].store
@@ -0,0 +1,42 @@
+"""Tests for the per-(model, method) Odoo call instrumentation."""
+
+import xmlrpc.client
+from unittest.mock import MagicMock
+
+import pytest
+
+from config.odoo_connect import OdooConnectionManager
+from config.odoo_metrics import InstrumentedProxy, OdooMetrics
+from tests.odoo_stub_server import DB, LOGIN, PASSWORD, OdooStubServer
+
+
+def test_records_calls_and_faults():
+    models = MagicMock()
+    models.execute_kw.side_effect = [[1, 2], xmlrpc.client.Fault(1, "boom")]
+    metrics = OdooMetrics()
+    proxy = InstrumentedProxy(models, metrics)
+
+    assert proxy.execute_kw("db", 1, "pwd", "pos.category", "search", [[]]) == [1, 2]
+    with pytest.raises(xmlrpc.client.Fault):
+        proxy.execute_kw("db", 1, "pwd", "pos.category", "search", [[]])
+
+    stats = metrics.snapshot()["pos.category.search"]
+    assert stats["count"] == 2
+    assert stats["faults"] == 1
+    assert stats["fault_rate"] == 0.5
+    assert sum(stats["latency_histogram"].values()) == 2
+    assert "pos.category.search" in metrics.report()
+
+
+@pytest.mark.parametrize("protocol", ["xmlrpc", "jsonrpc"])
+def test_records_exchanged_bytes(protocol):
+    metrics = OdooMetrics()
+    with OdooStubServer(categories=50) as stub:
+        manager = OdooConnectionManager(stub.url, DB, LOGIN, PASSWORD, protocol)
+        proxy = InstrumentedProxy(manager, metrics)
+        proxy.execute_kw(DB, manager.uid, PASSWORD, "pos.category", "search_read", [[], ["name"]])
+
+    stats = metrics.snapshot()["pos.category.search_read"]
+    assert stats["request_bytes"] > 0
+    assert stats["response_bytes"] > stats["request_bytes"]
+    assert proxy.uid == manager.uid
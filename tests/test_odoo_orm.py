@@ -0,0 +1,76 @@
+"""Tests for the client-side record layer."""
+
+import xmlrpc.client
+
+import pytest
+
+from config.odoo_orm import OdooEnv
+
+
+pytestmark = pytest.mark.odoo_stub(categories=10)
+
+
+@pytest.fixture
+def env(connection):
+    return OdooEnv(*connection)
+
+
+def test_field_access_prefetches_whole_set(stub, env):
+    categories = env["pos.category"].search([("id", "in", [79, 72, 53, 58])])
+    names = [category.name for category in categories]
+    assert names == ["BUREAU", "FOURNIL", "EPICERIE", "BUVETTE"]
+    assert stub.calls[("pos.category", "read")] == 1
+    assert categories.mapped("available_in_pos") == [False] * 4
+    assert stub.calls[("pos.category", "read")] == 2
+
+
+def test_read_fetches_all_missing_fields_at_once(stub, env):
+    categories = env["pos.category"].search([("id", "in", [79, 58])], fields=["name"])
+    rows = categories.read(["name", "available_in_pos", "write_date"])
+    assert [row["available_in_pos"] for row in rows] == [False, False]
+    # ``name`` est déjà connu : un seul ``read`` pour les deux autres champs.
+    assert stub.calls[("pos.category", "read")] == 1
+    assert categories[0].write_date and categories[1].available_in_pos is False
+    assert stub.calls[("pos.category", "read")] == 1
+
+
+def test_search_with_fields_needs_no_read(stub, env):
+    categories = env["pos.category"].search([("id", "in", [79, 58])], fields=["name"])
+    assert categories.read(["name"]) == [
+        {"id": 58, "name": "FOURNIL"},
+        {"id": 79, "name": "BUVETTE"},
+    ]
+    assert stub.calls[("pos.category", "read")] == 0
+
+
+def test_writes_are_buffered_and_coalesced(stub, env):
+    categories = env["pos.category"].browse([79, 72, 53])
+    for category in categories:
+        category.write({"available_in_pos": False})
+    assert stub.calls[("pos.category", "write")] == 0
+
+    env.flush()
+    assert stub.calls[("pos.category", "write")] == 1
+    records = stub.tables["pos.category"].records
+    assert [records[i]["available_in_pos"] for i in (79, 72, 53)] == [False] * 3
+
+
+def test_read_after_write_flushes_first(stub, env):
+    category = env["pos.category"].browse(79)
+    assert category.name == "BUVETTE"
+    category.write({"name": "BAR"})
+    assert category.name == "BAR"
+    assert stub.calls[("pos.category", "write")] == 1
+
+
+def test_flush_raises_write_errors(env):
+    env["pos.category"].browse(99999).write({"name": "X"})
+    with pytest.raises(xmlrpc.client.Fault):
+        env.flush()
+
+
+def test_create_and_call(stub, env):
+    with env:
+        mailing = env["mailing.mailing"].create({"name": "Promo", "subject": "Promo"})
+        mailing.call("action_schedule")
+        assert mailing.state == "in_queue"
@@ -0,0 +1,97 @@
+"""Tests for the paginated search_read helpers."""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from config.odoo_paging import iter_pages, iter_search_read
+
+
+pytestmark = pytest.mark.odoo_stub(categories=46)
+
+
+@pytest.mark.parametrize("cursor", ["id", "offset"])
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_search_read_pages_through_model(stub, odoo_args, cursor, prefetch):
+    rows = list(
+        iter_search_read(
+            *odoo_args,
+            "pos.category",
+            fields=["name"],
+            page_size=20,
+            cursor=cursor,
+            prefetch=prefetch,
+        )
+    )
+    assert [row["id"] for row in rows] == sorted(stub.tables["pos.category"].records)
+    assert set(rows[0]) == {"id", "name"}
+    # 46 enregistrements par pages de 20 : 20 + 20 + 6.
+    assert stub.calls[("pos.category", "search_read")] == 3
+
+
+def test_iter_pages_applies_domain(stub, odoo_args):
+    pages = list(
+        iter_pages(
+            *odoo_args,
+            "pos.category",
+            domain=[("id", "in", [79, 72, 53, 58])],
+            fields=["name"],
+            page_size=2,
+        )
+    )
+    assert [[row["id"] for row in page] for page in pages] == [[53, 58], [72, 79]]
+
+
+def test_id_cursor_survives_deletions(stub, odoo_args):
+    table = stub.tables["pos.category"]
+    seen = []
+    for row in iter_search_read(*odoo_args, "pos.category", page_size=10, prefetch=False):
+        seen.append(row["id"])
+        if len(seen) == 5:
+            # Supprimer des lignes déjà lues ne décale pas les pages suivantes.
+            for record_id in seen:
+                table.records.pop(record_id)
+    assert len(seen) == 46
+
+
+def test_prefetch_overlaps_consumer():
+    fetched = threading.Event()
+    models = MagicMock()
+
+    def search_read(db, uid, password, model, method, args, kwargs):
+        if len(args[0]) == 1:  # deuxième page : curseur ``id > 2``
+            fetched.set()
+            return [{"id": 3}]
+        return [{"id": 1}, {"id": 2}]
+
+    models.execute_kw.side_effect = search_read
+    pages = iter_pages(models, "db", 1, "pwd", "res.partner", page_size=2)
+    assert next(pages) == [{"id": 1}, {"id": 2}]
+    # La page suivante est demandée pendant le traitement de la première.
+    assert fetched.wait(1)
+    assert next(pages) == [{"id": 3}]
+    assert list(pages) == []
+
+
+def test_invalid_cursor():
+    with pytest.raises(ValueError):
+        list(iter_pages(MagicMock(), "db", 1, "pwd", "res.partner", cursor="page"))
+
+
+def test_prefetch_runs_on_the_shared_pool():
+    threads = set()
+    models = MagicMock()
+
+    def search_read(db, uid, password, model, method, args, kwargs):
+        threads.add(threading.current_thread().name)
+        after = args[0][0][2] if args[0] else 0
+        return [{"id": i} for i in range(after + 1, min(after + 2, 6) + 1)]
+
+    models.execute_kw.side_effect = search_read
+    for _ in range(3):
+        rows = iter_search_read(models, "db", 1, "pwd", "res.partner", page_size=2)
+        assert len(list(rows)) == 6
+
+    threads.discard(threading.current_thread().name)
+    assert threads and all(name.startswith("odoo-pool") for name in threads)
@@ -0,0 +1,105 @@
+"""Tests for the write_date-revalidated record cache."""
+
+import time
+
+import pytest
+
+from config.odoo_records import OdooRecordCache
+
+
+IDS = [79, 72, 53, 58]
+
+
+pytestmark = pytest.mark.odoo_stub(categories=10)
+
+
+def _names(rows):
+    return [row["name"] for row in rows]
+
+
+def test_revalidates_with_write_date_only(stub, odoo_args):
+    cache = OdooRecordCache()
+    first = cache.read(*odoo_args, "pos.category", IDS, ["name"])
+    assert _names(first) == ["BUVETTE", "EPICERIE", "BUREAU", "FOURNIL"]
+    assert stub.calls[("pos.category", "read")] == 1
+
+    assert cache.read(*odoo_args, "pos.category", IDS, ["name"]) == first
+    # Seul l'appel de revalidation (write_date) a été émis.
+    assert stub.calls[("pos.category", "read")] == 2
+    assert cache.stats()["hits"] == 4
+    assert cache.stats()["misses"] == 4
+
+
+def test_refetches_only_modified_records(stub, odoo_args):
+    cache = OdooRecordCache()
+    cache.read(*odoo_args, "pos.category", IDS, ["name"])
+    stub.tables["pos.category"].write([72], {"name": "ÉPICERIE"})
+
+    rows = cache.read(*odoo_args, "pos.category", IDS, ["name"])
+    assert _names(rows) == ["BUVETTE", "ÉPICERIE", "BUREAU", "FOURNIL"]
+    assert stub.calls[("pos.category", "read")] == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale"]) == (3, 1)
+
+
+def test_deleted_records_are_dropped(stub, odoo_args):
+    cache = OdooRecordCache()
+    cache.read(*odoo_args, "pos.category", IDS, ["name"])
+    del stub.tables["pos.category"].records[53]
+
+    rows = cache.read(*odoo_args, "pos.category", IDS, ["name"])
+    assert [row["id"] for row in rows] == [79, 72, 58]
+    assert cache.stats()["size"] == 3
+
+
+def test_fields_are_part_of_the_key(stub, odoo_args):
+    cache = OdooRecordCache()
+    cache.read(*odoo_args, "pos.category", [79], ["name"])
+    rows = cache.read(*odoo_args, "pos.category", [79], ["name", "available_in_pos"])
+    assert set(rows[0]) == {"id", "name", "available_in_pos"}
+    assert cache.stats()["misses"] == 2
+
+
+def test_lru_eviction(stub, odoo_args):
+    cache = OdooRecordCache(max_records=2)
+    rows = cache.read(*odoo_args, "pos.category", IDS, ["name"])
+    assert len(rows) == 4
+    stats = cache.stats()
+    assert (stats["size"], stats["evictions"]) == (2, 2)
+    cache.read(*odoo_args, "pos.category", [53, 58], ["name"])
+    assert cache.stats()["hits"] == 2
+
+
+def test_persisted_between_runs(stub, odoo_args, tmp_path):
+    path = str(tmp_path / "records.json")
+    OdooRecordCache(path, "stub").read(*odoo_args, "pos.category", IDS, ["name"])
+
+    cache = OdooRecordCache(path, "stub")
+    rows = cache.read(*odoo_args, "pos.category", IDS, ["name"])
+    assert _names(rows) == ["BUVETTE", "EPICERIE", "BUREAU", "FOURNIL"]
+    assert cache.stats()["hits"] == 4
+
+    cache.invalidate("pos.category")
+    assert OdooRecordCache(path, "stub").stats()["size"] == 0
+
+
+def test_write_in_the_same_second_as_the_fill_is_detected(stub, odoo_args):
+    # ``write_date`` n'est qu'à la seconde : une valeur lue dans la seconde
+    # de sa dernière écriture n'est pas tenue pour sûre avant d'être relue.
+    table = stub.tables["pos.category"]
+    table.write([72], {"name": "ÉPICERIE"})
+    cache = OdooRecordCache()
+    cache.read(*odoo_args, "pos.category", [72], ["name"])
+    table.write([72], {"name": "ÉPICERIE FINE"})
+
+    rows = cache.read(*odoo_args, "pos.category", [72], ["name"])
+    assert _names(rows) == ["ÉPICERIE FINE"]
+
+
+def test_fill_older_than_a_second_is_trusted(stub, odoo_args):
+    cache = OdooRecordCache(clock=lambda: time.time() + 2)
+    stub.tables["pos.category"].write([72], {"name": "ÉPICERIE"})
+    cache.read(*odoo_args, "pos.category", [72], ["name"])
+
+    cache.read(*odoo_args, "pos.category", [72], ["name"])
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,281 @@
+"""End-to-end tests of the Odoo client against the local stand-in server."""
+
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from config.odoo_connect import OdooConnectionManager
+from config.odoo_metadata import OdooMetadataCache
+from tests.odoo_stub_server import DB, FIELD_TYPES, LOGIN
+
+
+pytestmark = pytest.mark.odoo_stub(categories=10, pos_configs=2, products=400)
+
+
+@pytest.fixture(params=["xmlrpc", "jsonrpc"])
+def protocol(request):
+    return request.param
+
+
+def test_execute_kw_roundtrip(stub, connection):
+    db, uid, password, models = connection
+    rows = models.execute_kw(
+        db, uid, password, "pos.category", "search_read", [[("id", "in", [79, 58])], ["name"]]
+    )
+    assert sorted(row["name"] for row in rows) == ["BUVETTE", "FOURNIL"]
+    assert stub.calls[("common", "authenticate")] == 1
+
+
+def test_update_pos_categories_against_stub(stub, connection, caches, monkeypatch):
+    from pos_category_management import manage_pos_categories
+
+    monkeypatch.setattr(manage_pos_categories, "get_odoo_connection", lambda: connection)
+    records = stub.tables["pos.category"].records
+    records[58]["available_in_pos"] = True
+    manage_pos_categories.update_pos_categories(datetime(2024, 9, 6, 7, 0))
+
+    assert [records[i]["available_in_pos"] for i in (79, 72, 53, 58)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert stub.calls[("pos.category", "write")] == 2
+
+    # Nothing left to change: the next run costs a single read.
+    stub.calls.clear()
+    manage_pos_categories.update_pos_categories(datetime(2024, 9, 6, 8, 0))
+    assert sum(stub.calls.values()) == 1
+    assert stub.calls[("pos.category", "search_read")] == 1
+
+
+def test_schedule_email_against_stub(stub, connection, monkeypatch):
+    from services import odoo_email_service
+
+    monkeypatch.setattr(odoo_email_service, "get_odoo_connection", lambda: connection)
+    monkeypatch.setattr(odoo_email_service, "ODOO_EMAIL_FROM", "sender@example.com")
+    metadata = OdooMetadataCache(None, "stub")
+    monkeypatch.setattr(odoo_email_service, "get_metadata_cache", lambda **kwargs: metadata)
+
+    service = odoo_email_service.OdooEmailService(logging.getLogger("test"))
+    send_at = datetime(2024, 5, 29, 8, 0, tzinfo=ZoneInfo("Europe/Paris"))
+    mailing_id = service.schedule_email("Sujet", "Corps", [], send_at, [2])
+
+    mailing = stub.tables["mailing.mailing"].records[mailing_id]
+    assert mailing["state"] == "in_queue"
+    assert mailing["schedule_date"] == "2024-05-29 06:00:00"
+    assert mailing["contact_list_ids"] == [2]
+    assert mailing["mailing_model_id"] == service.mailing_model_id
+
+
+def test_schedule_emails_against_stub(stub, connection, monkeypatch):
+    from services import odoo_email_service
+
+    monkeypatch.setattr(odoo_email_service, "get_odoo_connection", lambda: connection)
+    monkeypatch.setattr(odoo_email_service, "ODOO_EMAIL_FROM", "sender@example.com")
+    metadata = OdooMetadataCache(None, "stub")
+    monkeypatch.setattr(odoo_email_service, "get_metadata_cache", lambda **kwargs: metadata)
+
+    service = odoo_email_service.OdooEmailService(logging.getLogger("test"))
+    stub.calls.clear()
+    paris = ZoneInfo("Europe/Paris")
+    month = [
+        (f"Lettre {day}", "Corps", [], datetime(2024, 6, day, 8, 0, tzinfo=paris), [2])
+        for day in range(1, 31)
+    ]
+    mailing_ids = service.schedule_emails(month)
+
+    assert len(mailing_ids) == 30
+    mailings = stub.tables["mailing.mailing"].records
+    assert all(mailings[i]["state"] == "in_queue" for i in mailing_ids)
+    assert mailings[mailing_ids[-1]]["schedule_date"] == "2024-06-30 06:00:00"
+    assert sum(stub.calls.values()) == 2
+
+
+def test_wrong_credentials_are_denied(stub):
+    manager = OdooConnectionManager(stub.url, DB, LOGIN, "wrong")
+    with pytest.raises(Exception):
+        manager.uid
+
+
+def test_pos_config_fallback_updates_every_register(
+    stub, connection, caches, monkeypatch
+):
+    from pos_category_management import manage_pos_categories
+
+    def refuse(ids, vals):
+        raise ValueError("Invalid field 'available_in_pos' on model 'pos.category'")
+
+    monkeypatch.setattr(stub.tables["pos.category"], "write", refuse)
+    monkeypatch.setattr(manage_pos_categories, "get_odoo_connection", lambda: connection)
+    stub.tables["pos.category"].records[58]["available_in_pos"] = True
+    manage_pos_categories.update_pos_categories(datetime(2024, 9, 6, 7, 0))
+
+    configs = stub.tables["pos.config"].records.values()
+    assert len(configs) == 2
+    for config in configs:
+        assert set(config["iface_available_categ_ids"]) >= {79, 72, 53}
+        assert 58 not in config["iface_available_categ_ids"]
+    # Toutes les commandes partent en une seule écriture par point de vente.
+    assert stub.calls[("pos.config", "write")] == 2
+
+
+def test_servers_without_available_in_pos_use_pos_config_directly(
+    stub, connection, caches, monkeypatch, caplog
+):
+    from pos_category_management import manage_pos_categories
+
+    monkeypatch.delitem(FIELD_TYPES["pos.category"], "available_in_pos")
+    monkeypatch.setattr(manage_pos_categories, "get_odoo_connection", lambda: connection)
+    done = manage_pos_categories.update_pos_categories(datetime(2024, 9, 6, 7, 0))
+
+    assert done == {"activated": [79, 72, 53], "deactivated": []}
+    for config in stub.tables["pos.config"].records.values():
+        assert config["iface_available_categ_ids"] == [79, 72, 53]
+    assert stub.calls[("pos.category", "write")] == 0
+    assert stub.calls[("pos.config", "write")] == 2
+    # The registers do not report names: the logs use the rule names.
+    assert "Catégorie POS activée : BUVETTE (79)" in caplog.text
+
+    # The API is detected once: the next run only reads the registers and
+    # checks that the managed categories still exist.
+    stub.calls.clear()
+    manage_pos_categories.update_pos_categories(datetime(2024, 9, 6, 8, 0))
+    assert dict(stub.calls) == {
+        ("pos.config", "search_read"): 1,
+        ("pos.category", "search"): 1,
+    }
+
+
+def test_products_follow_their_categories(stub, connection, caches, monkeypatch):
+    from pos_category_management import manage_pos_categories
+
+    monkeypatch.setattr(manage_pos_categories, "get_odoo_connection", lambda: connection)
+    products = stub.tables["product.template"].records.values()
+    stub.tables["pos.category"].records[58]["available_in_pos"] = True
+    for product in products:
+        if product["pos_categ_ids"] == [58]:
+            product["available_in_pos"] = True
+    # Shared with BUVETTE, which stays active on Fridays.
+    shared = next(p for p in products if p["pos_categ_ids"] == [79])
+    shared["pos_categ_ids"] = [79, 58]
+
+    manage_pos_categories.update_pos_categories(datetime(2024, 9, 6, 7, 0))
+
+    for product in products:
+        categ_ids = set(product["pos_categ_ids"])
+        if categ_ids & {79, 72, 53}:
+            assert product["available_in_pos"] is True
+        elif 58 in categ_ids:
+            assert product["available_in_pos"] is False
+    # One page and one bulk write per target state.
+    assert stub.calls[("product.template", "search_read")] == 2
+    assert stub.calls[("product.template", "write")] == 2
+
+
+def test_full_pass_reconciles_products_of_categories_up_to_date(
+    stub, connection, caches, monkeypatch
+):
+    from pos_category_management import manage_pos_categories
+
+    monkeypatch.setattr(manage_pos_categories, "get_odoo_connection", lambda: connection)
+    categories = stub.tables["pos.category"].records
+    for category_id in (79, 72, 53):
+        categories[category_id]["available_in_pos"] = True
+    categories[58]["available_in_pos"] = False
+    # FOURNIL products left available, e.g. added since the last switch, and
+    # a BUVETTE product hidden on purpose.
+    products = stub.tables["product.template"].records.values()
+    fournil = [p for p in products if p["pos_categ_ids"] == [58]]
+    for product in fournil:
+        product["available_in_pos"] = True
+    hidden = next(p for p in products if p["pos_categ_ids"] == [79])
+    hidden["available_in_pos"] = False
+
+    # A regular run leaves the products of unchanged categories alone.
+    done = manage_pos_categories.update_pos_categories(datetime(2024, 9, 6, 7, 0))
+    assert done == {"activated": [], "deactivated": []}
+    assert stub.calls[("product.template", "search_read")] == 0
+    assert all(p["available_in_pos"] is True for p in fournil)
+    assert hidden["available_in_pos"] is False
+
+    done = manage_pos_categories.update_pos_categories(
+        datetime(2024, 9, 6, 7, 0), reconcile_products=True
+    )
+    assert done == {"activated": [], "deactivated": []}
+    assert stub.calls[("pos.category", "write")] == 0
+    assert fournil and all(p["available_in_pos"] is False for p in fournil)
+    assert hidden["available_in_pos"] is True
+
+
+def test_products_are_written_in_chunks(stub, connection, caches):
+    from config.odoo_orm import OdooEnv
+    from pos_category_management.manage_pos_categories import _set_products_available
+
+    db, uid, password, models = connection
+    updated = _set_products_available(
+        OdooEnv(db, uid, password, models), [79, 72, 53], True, chunk_size=50
+    )
+    assert updated == 120
+    assert stub.calls[("product.template", "write")] == 3
+    assert all(
+        product["available_in_pos"]
+        for product in stub.tables["product.template"].records.values()
+        if set(product["pos_categ_ids"]) & {79, 72, 53}
+    )
+
+
+def test_pos_config_rollout_isolates_failing_register(stub, connection):
+    from config.odoo_orm import OdooEnv
+    from pos_category_management.manage_pos_categories import _update_pos_config_category
+
+    table = stub.tables["pos.config"]
+    broken, healthy = sorted(table.records)
+    original_write = table.write
+
+    def write(ids, vals):
+        if broken in ids:
+            raise ValueError("Caisse verrouillée")
+        return original_write(ids, vals)
+
+    table.write = write
+    db, uid, password, models = connection
+    updated = _update_pos_config_category(
+        OdooEnv(db, uid, password, models), [(4, 79), (3, 58)]
+    )
+    assert updated == [healthy]
+    assert table.records[healthy]["iface_available_categ_ids"] == [79]
+
+
+def test_recreated_category_is_resolved_again(stub, connection, caches):
+    from pos_category_management import manage_pos_categories
+
+    friday = datetime(2024, 9, 6, 7, 0)
+    manage_pos_categories.update_pos_categories(friday, connection)
+    table = stub.tables["pos.category"]
+    del table.records[58]
+    fournil = table.insert({"name": "FOURNIL", "available_in_pos": True})
+
+    done = manage_pos_categories.update_pos_categories(friday, connection)
+    assert done == {"activated": [], "deactivated": [fournil]}
+    assert table.records[fournil]["available_in_pos"] is False
+
+
+def test_recreated_category_is_resolved_again_through_pos_config(
+    stub, connection, caches, monkeypatch
+):
+    from pos_category_management import manage_pos_categories
+
+    monkeypatch.delitem(FIELD_TYPES["pos.category"], "available_in_pos")
+    friday = datetime(2024, 9, 6, 7, 0)
+    manage_pos_categories.update_pos_categories(friday, connection)
+    table = stub.tables["pos.category"]
+    del table.records[79]
+    buvette = table.insert({"name": "BUVETTE"})
+
+    done = manage_pos_categories.update_pos_categories(friday, connection)
+    assert done == {"activated": [buvette], "deactivated": []}
+    for config in stub.tables["pos.config"].records.values():
+        assert buvette in config["iface_available_categ_ids"]
@@ -0,0 +1,138 @@
+"""Tests for the multi-database fan-out."""
+
+import logging
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from config import odoo_connect
+from config.auth import AuthCache
+from config.odoo_batch import OdooBatch
+from config.odoo_metadata import OdooMetadataCache
+from config.odoo_paging import iter_search_read
+from config.odoo_targets import OdooTarget, fan_out, format_report, load_targets
+from config.odoo_transport import _call_timeout
+from pos_category_management.category_index import CategoryIndex
+from tests.odoo_stub_server import DB, LOGIN, PASSWORD, OdooStubServer
+
+
+@pytest.fixture
+def shops(monkeypatch, tmp_path):
+    monkeypatch.setattr(odoo_connect, "_auth_cache", AuthCache(str(tmp_path / "auth.json"), 0))
+    odoo_connect.reset_connections()
+    with OdooStubServer(latency=0.05) as north, OdooStubServer(latency=0.05) as south:
+        yield {"north": north, "south": south}
+    odoo_connect.reset_connections()
+
+
+def _targets(shops, broken=False):
+    targets = [
+        OdooTarget(name, stub.url, DB, LOGIN, PASSWORD, [2])
+        for name, stub in shops.items()
+    ]
+    if broken:
+        targets.append(OdooTarget("closed", shops["north"].url, DB, LOGIN, "wrong"))
+    return targets
+
+
+def test_load_targets_from_environment(monkeypatch):
+    monkeypatch.setenv("ODOO_NORTH_URL", "https://north.example.com")
+    monkeypatch.setenv("ODOO_NORTH_DB", "north")
+    monkeypatch.setenv("ODOO_NORTH_MAILING_LIST_IDS", "4, 5")
+    north, south = load_targets(["north", "south"])
+    assert (north.url, north.db, north.mailing_list_ids) == (
+        "https://north.example.com",
+        "north",
+        [4, 5],
+    )
+    assert south.name == "south"
+    assert [target.name for target in load_targets([])] == ["default"]
+
+
+def test_fan_out_reports_each_target(shops):
+    results = fan_out(lambda target: target.connect()[1], _targets(shops, broken=True))
+    assert [(r.target.name, r.ok) for r in results] == [
+        ("north", True),
+        ("south", True),
+        ("closed", False),
+    ]
+    assert results[0].result == 2
+    assert all(r.seconds > 0 for r in results)
+    report = format_report(results)
+    assert "closed" in report and "2 cible(s) réussie(s), 1 en échec." in report
+
+
+def test_update_pos_categories_on_targets(shops, monkeypatch):
+    from pos_category_management import manage_pos_categories
+
+    caches, indexes = {}, {}
+    monkeypatch.setattr(
+        manage_pos_categories,
+        "get_metadata_cache",
+        lambda url=None, db=None: caches.setdefault(url, OdooMetadataCache(None, url)),
+    )
+    monkeypatch.setattr(
+        manage_pos_categories,
+        "get_category_index",
+        lambda url=None, db=None: indexes.setdefault(url, CategoryIndex(None, url)),
+    )
+    results = manage_pos_categories.update_pos_categories_on_targets(
+        datetime(2024, 9, 6, 7, 0), _targets(shops), max_workers=2
+    )
+    assert all(r.ok for r in results)
+    assert results[0].result == {"activated": [79, 72, 53], "deactivated": []}
+    for stub in shops.values():
+        records = stub.tables["pos.category"].records
+        assert [records[i]["available_in_pos"] for i in (79, 72, 53, 58)] == [
+            True,
+            True,
+            True,
+            False,
+        ]
+
+
+def test_schedule_email_on_targets(shops, monkeypatch):
+    from services import odoo_email_service
+
+    monkeypatch.setattr(odoo_email_service, "ODOO_EMAIL_FROM", "sender@example.com")
+    monkeypatch.setattr(
+        odoo_email_service,
+        "get_metadata_cache",
+        lambda **kwargs: OdooMetadataCache(None, "test"),
+    )
+    send_at = datetime(2024, 5, 29, 8, 0, tzinfo=ZoneInfo("Europe/Paris"))
+    results = odoo_email_service.schedule_email_on_targets(
+        logging.getLogger("test"), "Promo", "Corps", [], send_at, _targets(shops)
+    )
+    assert all(r.ok for r in results)
+    for result, stub in zip(results, shops.values()):
+        mailing = stub.tables["mailing.mailing"].records[result.result]
+        assert mailing["state"] == "in_queue"
+        assert mailing["contact_list_ids"] == [2]
+
+
+def test_deadline_bounds_worker_threads():
+    seen = []
+
+    class Models:
+        def execute_kw(self, db, uid, password, model, method, args, kwargs=None):
+            seen.append((threading.current_thread().name, _call_timeout(30)[1]))
+            if method == "search_read":
+                after = args[0][0][2] if args[0] else 0
+                return [{"id": after + 1}] if after < 3 else []
+            return True
+
+    def operation(target):
+        models = Models()
+        with OdooBatch("db", 1, "pwd", models, max_workers=3) as batch:
+            for model in ("pos.category", "pos.config", "product.template"):
+                batch.call(model, "search", [[]])
+        return list(iter_search_read(models, "db", 1, "pwd", "res.partner", page_size=1))
+
+    [result] = fan_out(operation, [OdooTarget("north", "", "", "", "")], deadline=5)
+    assert result.ok
+    assert any(name.startswith("odoo-pool") for name, _ in seen)
+    # Les threads du pool respectent l'échéance de la cible, pas le seul délai.
+    assert all(from_deadline for _, from_deadline in seen)
@@ -0,0 +1,145 @@
+"""Tests for the pluggable Odoo transports."""
+
+import json
+import xmlrpc.client
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from config.auth import authenticate_odoo
+from config.odoo_transport import (
+    JsonRpcServerProxy,
+    OdooDeadlineExceeded,
+    OdooTimeout,
+    exchange_size,
+    exchange_timings,
+    odoo_deadline,
+    reset_exchange,
+    server_proxy,
+)
+from tests.odoo_stub_server import OdooStubServer
+
+
+def _json_response(payload):
+    response = MagicMock()
+    response.json.return_value = payload
+    return response
+
+
+@patch("config.odoo_transport.requests.Session")
+def test_jsonrpc_execute_kw_posts_call(mock_session):
+    session = mock_session.return_value
+    session.post.return_value = _json_response({"jsonrpc": "2.0", "id": 1, "result": [3]})
+
+    proxy = JsonRpcServerProxy("https://odoo", "object")
+    result = proxy.execute_kw("db", 1, "pwd", "pos.category", "search", [[]], {"limit": 1})
+
+    assert result == [3]
+    url = session.post.call_args.args[0]
+    body = json.loads(session.post.call_args.kwargs["data"])
+    assert url == "https://odoo/jsonrpc"
+    assert body["params"] == {
+        "service": "object",
+        "method": "execute_kw",
+        "args": ["db", 1, "pwd", "pos.category", "search", [[]], {"limit": 1}],
+    }
+
+
+@patch("config.odoo_transport.requests.Session")
+def test_jsonrpc_error_becomes_fault(mock_session):
+    session = mock_session.return_value
+    session.post.return_value = _json_response(
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "error": {
+                "code": 200,
+                "message": "Odoo Server Error",
+                "data": {"name": "odoo.exceptions.AccessDenied", "message": "Access Denied"},
+            },
+        }
+    )
+
+    proxy = JsonRpcServerProxy("https://odoo", "object")
+    with pytest.raises(xmlrpc.client.Fault) as info:
+        proxy.execute_kw("db", 1, "pwd", "pos.category", "search", [[]])
+    assert info.value.faultCode == 200
+    assert info.value.faultString == "odoo.exceptions.AccessDenied: Access Denied"
+
+
+@patch("config.odoo_transport.requests.Session")
+def test_authenticate_over_jsonrpc(mock_session):
+    session = mock_session.return_value
+    session.post.return_value = _json_response({"jsonrpc": "2.0", "id": 1, "result": 7})
+
+    assert authenticate_odoo("https://odoo", "db", "user", "pwd", "jsonrpc") == 7
+    body = json.loads(session.post.call_args.kwargs["data"])
+    assert body["params"]["service"] == "common"
+    assert body["params"]["args"] == ["db", "user", "pwd", {}]
+
+
+def test_server_proxy_selects_protocol():
+    assert isinstance(server_proxy("https://odoo", "object", "jsonrpc"), JsonRpcServerProxy)
+    assert isinstance(
+        server_proxy("https://odoo", "object", "xmlrpc"), xmlrpc.client.ServerProxy
+    )
+    with pytest.raises(ValueError):
+        server_proxy("https://odoo", "object", "soap")
+
+
+@pytest.mark.parametrize("protocol", ["xmlrpc", "jsonrpc"])
+def test_per_call_timeout(protocol):
+    with OdooStubServer(latency=0.3) as stub:
+        common = server_proxy(stub.url, "common", protocol, timeout=0.05)
+        with pytest.raises(OdooTimeout):
+            common.version()
+        reset_exchange()
+        assert server_proxy(stub.url, "common", protocol, timeout=2).version()
+        timings = exchange_timings()
+        assert timings["send"] + timings["receive"] >= 0.3
+
+
+@pytest.mark.parametrize("protocol", ["xmlrpc", "jsonrpc"])
+def test_overall_deadline(protocol):
+    with OdooStubServer(latency=0.1) as stub:
+        common = server_proxy(stub.url, "common", protocol, timeout=5)
+        with odoo_deadline(0.25):
+            common.version()
+            common.version()
+            with pytest.raises(OdooDeadlineExceeded):
+                common.version()
+        assert common.version()
+
+
+def _create_large_mailing(models):
+    body = "<p>Offre de la semaine</p>" * 400
+    return models.execute_kw(
+        "stub", 2, "admin", "mailing.mailing", "create", [{"name": "Promo", "body_html": body}]
+    )
+
+
+@pytest.mark.parametrize("protocol", ["xmlrpc", "jsonrpc"])
+def test_gzip_compresses_large_requests(protocol):
+    with OdooStubServer(gzip_threshold=1024) as stub:
+        reset_exchange()
+        _create_large_mailing(server_proxy(stub.url, "object", protocol))
+        plain_sent, _ = exchange_size()
+
+        reset_exchange()
+        models = server_proxy(stub.url, "object", protocol, gzip_threshold=1024)
+        mailing_id = _create_large_mailing(models)
+        gzip_sent, _ = exchange_size()
+
+        assert gzip_sent * 5 < plain_sent
+        stored = stub.tables["mailing.mailing"].records[mailing_id]["body_html"]
+        assert stored.count("Offre de la semaine") == 400
+
+
+@pytest.mark.parametrize("protocol", ["xmlrpc", "jsonrpc"])
+def test_gzip_refused_falls_back_to_plain(protocol):
+    with OdooStubServer(accept_gzip=False) as stub:
+        models = server_proxy(stub.url, "object", protocol, gzip_threshold=1024)
+        first = _create_large_mailing(models)
+        second = _create_large_mailing(models)
+        assert first != second
+        assert stub.calls[("mailing.mailing", "create")] == 2
@@ -0,0 +1,92 @@
+"""Tests for the streaming XML-RPC decoder."""
+
+import datetime
+import xmlrpc.client
+
+import pytest
+
+from config.odoo_transport import server_proxy
+from config.odoo_xmlrpc_decoder import getparser
+from tests.odoo_stub_server import DB, PASSWORD, UID, OdooStubServer
+
+
+ROWS = [
+    {
+        "id": 1,
+        "name": "BUVETTE & Café <été>",
+        "parent_id": False,
+        "child_ids": [2, 3],
+        "available_in_pos": True,
+        "sequence": 2**30,
+        "ratio": 0.25,
+        "note": None,
+        "image": xmlrpc.client.Binary(b"\x89PNG\x00"),
+        "write_date": xmlrpc.client.DateTime(datetime.datetime(2024, 9, 6, 7, 0)),
+        "nested": {"empty": {}, "lists": [[], [[]]]},
+    },
+    "",
+]
+
+UNTYPED = (
+    "<?xml version='1.0'?><methodResponse><params>"
+    "<param><value>plain</value></param><param><value/></param>"
+    "<param><value><struct><member><name>k</name><value>v</value></member>"
+    "</struct></value></param><param><value><i8>99999999999</i8></value></param>"
+    "</params></methodResponse>"
+)
+
+
+def _decode(factory, payload: bytes, chunk: int, use_builtin_types: bool):
+    parser, unmarshaller = factory(use_builtin_types=use_builtin_types)
+    for start in range(0, len(payload), chunk):
+        parser.feed(payload[start : start + chunk])
+    parser.close()
+    return unmarshaller.close()
+
+
+@pytest.mark.parametrize("use_builtin_types", [False, True])
+@pytest.mark.parametrize("chunk", [7, 65536])
+@pytest.mark.parametrize(
+    "payload",
+    [
+        xmlrpc.client.dumps((ROWS,), methodresponse=True, allow_none=True),
+        UNTYPED,
+    ],
+)
+def test_decoder_matches_stdlib(payload, chunk, use_builtin_types):
+    payload = payload.encode("utf-8")
+    expected = _decode(xmlrpc.client.getparser, payload, chunk, use_builtin_types)
+    assert _decode(getparser, payload, chunk, use_builtin_types) == expected
+
+
+def test_decoder_raises_fault():
+    payload = xmlrpc.client.dumps(
+        xmlrpc.client.Fault(2, "Access Denied"), methodresponse=True
+    ).encode("utf-8")
+    with pytest.raises(xmlrpc.client.Fault) as err:
+        _decode(getparser, payload, 16, False)
+    assert err.value.faultCode == 2
+    assert err.value.faultString == "Access Denied"
+
+
+def test_decoder_rejects_truncated_response():
+    payload = xmlrpc.client.dumps((ROWS,), methodresponse=True, allow_none=True)
+    parser, unmarshaller = getparser()
+    parser.feed(payload[: len(payload) // 2].encode("utf-8"))
+    with pytest.raises(Exception):
+        parser.close()
+        unmarshaller.close()
+
+
+@pytest.mark.parametrize("gzip_threshold", [None, 512])
+def test_fast_decoder_against_stub(gzip_threshold):
+    with OdooStubServer(categories=50, gzip_threshold=gzip_threshold) as stub:
+        args = [[], ["id", "name", "parent_id", "available_in_pos", "write_date"]]
+        rows = {}
+        for fast in (False, True):
+            models = server_proxy(stub.url, "object", fast_decoder=fast)
+            rows[fast] = models.execute_kw(
+                DB, UID, PASSWORD, "pos.category", "search_read", args
+            )
+        assert len(rows[True]) == 50
+        assert rows[True] == rows[False]
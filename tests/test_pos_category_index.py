@@ -0,0 +1,99 @@
+"""Tests for the POS category name to ID index."""
+
+from unittest.mock import MagicMock
+
+from pos_category_management.category_index import CategoryIndex
+
+
+CATEGORIES = [
+    {"id": 79, "name": "BUVETTE"},
+    {"id": 72, "name": "EPICERIE"},
+    {"id": 53, "name": "BUREAU"},
+    {"id": 58, "name": "FOURNIL"},
+]
+
+
+def test_index_is_persisted_between_runs(tmp_path):
+    path = str(tmp_path / "pos_categories.json")
+    fetch = MagicMock(return_value=CATEGORIES)
+
+    index = CategoryIndex(path, "https://odoo|db")
+    assert index.resolve(["BUVETTE", "BUREAU"], fetch) == {"BUVETTE": 79, "BUREAU": 53}
+    assert index.resolve(["FOURNIL"], fetch) == {"FOURNIL": 58}
+    assert fetch.call_count == 1
+
+    reloaded = CategoryIndex(path, "https://odoo|db")
+    assert reloaded.resolve(["EPICERIE"], fetch) == {"EPICERIE": 72}
+    assert fetch.call_count == 1
+
+
+def test_missing_name_refreshes_the_index():
+    fetch = MagicMock(
+        side_effect=[CATEGORIES, CATEGORIES + [{"id": 90, "name": "TERRASSE"}]]
+    )
+    index = CategoryIndex(None, "ns")
+    index.resolve(["BUVETTE"], fetch)
+    assert index.resolve(["BUVETTE", "TERRASSE"], fetch) == {
+        "BUVETTE": 79,
+        "TERRASSE": 90,
+    }
+    assert fetch.call_count == 2
+
+
+def test_unknown_names_are_left_out():
+    index = CategoryIndex(None, "ns")
+    assert index.resolve(["BUVETTE", "MEMBRES"], lambda: CATEGORIES) == {"BUVETTE": 79}
+
+
+def test_duplicate_names_resolve_to_the_oldest_category():
+    categories = [{"id": 120, "name": "BUREAU"}, *CATEGORIES]
+    index = CategoryIndex(None, "ns")
+    assert index.resolve(["BUREAU"], lambda: categories) == {"BUREAU": 53}
+
+
+def test_discarded_ids_are_resolved_again():
+    recreated = [c for c in CATEGORIES if c["id"] != 58] + [{"id": 91, "name": "FOURNIL"}]
+    fetch = MagicMock(side_effect=[CATEGORIES, recreated])
+    index = CategoryIndex(None, "ns")
+    assert index.resolve(["FOURNIL", "BUVETTE"], fetch) == {"FOURNIL": 58, "BUVETTE": 79}
+
+    index.discard([58])
+    assert index.resolve(["FOURNIL", "BUVETTE"], fetch) == {"FOURNIL": 91, "BUVETTE": 79}
+    assert fetch.call_count == 2
+
+
+def test_unknown_names_are_not_looked_up_on_every_run(tmp_path, caplog):
+    path = str(tmp_path / "pos_categories.json")
+    now = [1000.0]
+    fetch = MagicMock(return_value=CATEGORIES)
+
+    index = CategoryIndex(path, "ns", unknown_ttl=3600, clock=lambda: now[0])
+    assert index.resolve(["BUVETTE", "MEMBRES"], fetch) == {"BUVETTE": 79}
+    assert fetch.call_count == 1
+    assert "MEMBRES introuvable" in caplog.text
+
+    # Remembered across runs: no full read and no new warning.
+    caplog.clear()
+    reloaded = CategoryIndex(path, "ns", unknown_ttl=3600, clock=lambda: now[0])
+    assert reloaded.resolve(["BUVETTE", "MEMBRES"], fetch) == {"BUVETTE": 79}
+    assert fetch.call_count == 1
+    assert "MEMBRES" not in caplog.text
+
+    now[0] += 3600
+    reloaded.resolve(["MEMBRES"], fetch)
+    assert fetch.call_count == 2
+
+
+def test_discard_forgets_unknown_names():
+    fetch = MagicMock(
+        side_effect=[CATEGORIES, CATEGORIES + [{"id": 90, "name": "MEMBRES"}]]
+    )
+    index = CategoryIndex(None, "ns")
+    assert index.resolve(["BUVETTE", "MEMBRES"], fetch) == {"BUVETTE": 79}
+
+    index.discard([79])
+    assert index.resolve(["BUVETTE", "MEMBRES"], fetch) == {
+        "BUVETTE": 79,
+        "MEMBRES": 90,
+    }
+    assert fetch.call_count == 2
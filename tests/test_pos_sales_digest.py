@@ -0,0 +1,91 @@
+"""Tests for the POS sales digest."""
+
+from datetime import date, datetime
+from unittest.mock import MagicMock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from config.cache_store import JsonFileStore
+from pos_category_management.sales_digest import (
+    daily_category_sales,
+    format_digest,
+    send_sales_digest,
+)
+
+
+PARIS = ZoneInfo("Europe/Paris")
+
+pytestmark = pytest.mark.odoo_stub(categories=4, products=8)
+
+
+@pytest.fixture
+def stub(stub, caches):
+    # Produits 1 et 5 : BUREAU (53), 2 et 6 : FOURNIL (58),
+    # 3 et 7 : EPICERIE (72), 4 et 8 : BUVETTE (79).
+    stub.add_order("2024-09-06 08:30:00", [(1, 2, 5.0), (2, 1, 3.5), (4, 3, 6.0)])
+    stub.add_order("2024-09-06 16:00:00", [(5, 1, 2.0), (4, 1, 2.0)])
+    # 23h30 à Paris le 5 : hors de la journée du 6.
+    stub.add_order("2024-09-05 21:30:00", [(1, 10, 50.0)])
+    stub.add_order("2024-09-06 10:00:00", [(2, 4, 14.0)], state="cancel")
+    return stub
+
+
+def test_sales_are_grouped_by_category_server_side(stub, connection, tmp_path):
+    store = JsonFileStore(str(tmp_path / "sales_digest.json"))
+    totals = daily_category_sales(
+        date(2024, 9, 6), connection, store, now=datetime(2024, 9, 6, 18, 0, tzinfo=PARIS)
+    )
+    assert totals == {
+        "BUREAU": {"qty": 3, "amount": 7.0},
+        "FOURNIL": {"qty": 1, "amount": 3.5},
+        "BUVETTE": {"qty": 4, "amount": 8.0},
+    }
+    assert stub.calls[("pos.order.line", "read_group")] == 1
+    assert stub.calls[("pos.order.line", "search_read")] == 0
+    assert stub.calls[("pos.order.line", "read")] == 0
+
+
+def test_closed_days_are_served_from_the_cache(stub, connection, tmp_path):
+    store = JsonFileStore(str(tmp_path / "sales_digest.json"))
+    today = datetime(2024, 9, 6, 18, 0, tzinfo=PARIS)
+    tomorrow = datetime(2024, 9, 7, 9, 0, tzinfo=PARIS)
+
+    daily_category_sales(date(2024, 9, 6), connection, store, now=today)
+    daily_category_sales(date(2024, 9, 6), connection, store, now=today)
+    # The day is still open: every digest queries Odoo.
+    assert stub.calls[("pos.order.line", "read_group")] == 2
+
+    closed = daily_category_sales(date(2024, 9, 6), connection, store, now=tomorrow)
+    stub.calls.clear()
+    assert daily_category_sales(date(2024, 9, 6), connection, store, now=tomorrow) == closed
+    assert sum(stub.calls.values()) == 0
+
+
+def test_format_digest_sorts_by_amount():
+    text = format_digest(
+        date(2024, 9, 6),
+        {"FOURNIL": {"qty": 1, "amount": 3.5}, "BUVETTE": {"qty": 4, "amount": 8.0}},
+    )
+    assert text == (
+        "Ventes POS du 06/09/2024 :\n"
+        "- BUVETTE : 8.00 € (4 articles)\n"
+        "- FOURNIL : 3.50 € (1 article)\n"
+        "Total : 11.50 €"
+    )
+    assert format_digest(date(2024, 9, 6), {}) == "Ventes POS du 06/09/2024 : aucune vente."
+
+
+def test_send_sales_digest_uses_telegram(monkeypatch):
+    from pos_category_management import sales_digest
+
+    monkeypatch.setattr(
+        sales_digest,
+        "daily_category_sales",
+        lambda day, connection: {"BUREAU": {"qty": 3, "amount": 7.0}},
+    )
+    telegram = MagicMock()
+    send_sales_digest(telegram, date(2024, 9, 6))
+    telegram.send_message.assert_called_once_with(
+        "Ventes POS du 06/09/2024 :\n- BUREAU : 7.00 € (3 articles)\nTotal : 7.00 €"
+    )
@@ -0,0 +1,62 @@
+"""Tests for the resident POS category scheduler."""
+
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from pos_category_management import scheduler
+from pos_category_management.scheduler import run_scheduler, transition_timeline
+
+
+PARIS = ZoneInfo("Europe/Paris")
+
+
+def test_timeline_lists_weekly_transitions():
+    start = datetime(2024, 9, 4, 12, 0, tzinfo=PARIS)  # Wednesday
+    timeline = transition_timeline(start, PARIS)
+    assert [(instant.strftime("%a %H:%M"), add, remove) for instant, add, remove in timeline] == [
+        ("Fri 06:00", ["BUVETTE", "EPICERIE", "BUREAU"], ["FOURNIL"]),
+        ("Sat 00:00", [], ["BUVETTE", "EPICERIE", "BUREAU", "FOURNIL"]),
+        ("Sun 06:00", ["BUVETTE", "EPICERIE", "BUREAU", "FOURNIL"], []),
+        ("Mon 00:00", [], ["BUVETTE", "EPICERIE", "BUREAU", "FOURNIL"]),
+    ]
+    assert all(instant.tzinfo is PARIS for instant, _, _ in timeline)
+
+
+def test_timeline_uses_explicit_timezone():
+    # 03:30 UTC on Friday is already 05:30 in Paris: next transition 30 min later.
+    start = datetime(2024, 9, 6, 3, 30, tzinfo=ZoneInfo("UTC"))
+    instant, add, _ = transition_timeline(start, PARIS)[0]
+    assert instant == datetime(2024, 9, 6, 6, 0, tzinfo=PARIS)
+    assert instant - start == timedelta(minutes=30)
+
+
+def test_timeline_across_daylight_saving_change():
+    # Clocks go back on Sunday 27 October 2024: 06:00 is still a transition.
+    start = datetime(2024, 10, 26, 12, 0, tzinfo=PARIS)
+    instants = [instant for instant, _, _ in transition_timeline(start, PARIS)]
+    assert datetime(2024, 10, 27, 6, 0, tzinfo=PARIS) in instants
+
+
+def test_run_scheduler_applies_transitions(monkeypatch):
+    monkeypatch.setattr(scheduler, "HORIZON", timedelta(days=3))
+    clock = [datetime(2024, 9, 6, 5, 59, 59, tzinfo=PARIS)]
+    applied = []
+    stop = threading.Event()
+
+    def apply(current_dt):
+        applied.append(current_dt)
+        if len(applied) == 3:
+            stop.set()
+
+    def fake_wait(timeout=None):
+        clock[0] += timedelta(seconds=timeout)
+        return stop.is_set()
+
+    monkeypatch.setattr(stop, "wait", fake_wait)
+    run_scheduler(apply, PARIS, stop, now=lambda tz: clock[0])
+    assert [dt.strftime("%a %H:%M") for dt in applied] == [
+        "Fri 05:59",
+        "Fri 06:00",
+        "Sat 00:00",
+    ]